@@ -0,0 +1,155 @@
+"""
+IndustriGuard AI — Overlay Microbenchmark
+=========================================
+Renders typical overlay scenes (scanning with several worker cards,
+countdown, checking, result card) on a synthetic frame and reports:
+
+  - time per scene and per translucent primitive (mean / p50 / p95)
+  - the largest temporary allocation made while rendering a scene,
+    measured with tracemalloc after a warm-up frame
+
+The second number is the point: translucent primitives blend on their
+clipped ROI in reused scratch buffers, so no scene should allocate
+anything close to a full frame.  The script exits with code 1 if one
+does.  A reference full-frame-copy glass rectangle is timed alongside
+for comparison.
+
+Usage:
+  python benchmark_overlay.py
+  python benchmark_overlay.py --width 1920 --height 1080 --frames 300
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+import ui_overlay as ui
+
+EMPLOYEE = {"name": "Ana Lopez", "id": "EMP-017", "department": "Welding"}
+STATUS = {"status": "NOT READY", "message": "Missing PPE: Gloves, Boots",
+          "has_helmet": True, "has_vest": True, "has_goggles": True}
+PERF_LINES = ["stage       p50   p95   p99 ms", "detect     18.2  21.0  25.3",
+              "render      1.1   1.6   2.0", "frame      24.0  29.8  33.1"]
+
+
+def _persons(w, h, n=4):
+    """n evenly spaced person boxes with info card lines."""
+    out = []
+    slot = w // n
+    for i in range(n):
+        x1 = i * slot + slot // 6
+        out.append(((x1, h // 5, x1 + slot // 2, h - h // 8),
+                    [f"Worker {i + 1}", "EMP-%03d" % (i + 1), "Helmet: YES", "Vest: NO"]))
+    return out
+
+
+def _scene_scanning(frame):
+    h, w = frame.shape[:2]
+    bar_h = ui.draw_top_banner(frame)
+    ui.draw_scanning_state(frame, bar_h)
+    for bbox, lines in _persons(w, h):
+        ui.draw_person_bbox(frame, bbox, ui.ACCENT_GREEN, is_identified=True)
+        ui.draw_worker_info_card(frame, lines, bbox, ui.ACCENT_GREEN, w, h)
+    ui.draw_debug_panel(frame, PERF_LINES)
+
+
+def _scene_countdown(frame):
+    ui.draw_top_banner(frame)
+    ui.draw_countdown(frame, EMPLOYEE, 3, 2.0, 5)
+
+
+def _scene_checking(frame):
+    bar_h = ui.draw_top_banner(frame)
+    ui.draw_checking_banner(frame, EMPLOYEE["name"], 4, 10, bar_h)
+
+
+def _scene_result(frame):
+    ui.draw_top_banner(frame, subtitle="Check complete")
+    ui.draw_result_overlay(frame, STATUS, EMPLOYEE)
+    ui.draw_next_check_timer(frame, 3)
+
+
+SCENES = [("scanning", _scene_scanning), ("countdown", _scene_countdown),
+          ("checking", _scene_checking), ("result", _scene_result)]
+
+
+def _glass_full_frame(img, pt1, pt2, alpha=0.78, color=ui.CARD_BG, radius=8):
+    """Reference: the full-frame copy + blend that _glass_rect used to do."""
+    overlay = img.copy()
+    ui._rounded_rect(overlay, pt1, pt2, color, radius, -1)
+    cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0, img)
+
+
+def _timings(fn, base, frames):
+    frame = base.copy()
+    fn(frame)                                   # warm caches
+    samples = []
+    for _ in range(frames):
+        np.copyto(frame, base)
+        t0 = time.perf_counter()
+        fn(frame)
+        samples.append(time.perf_counter() - t0)
+    ms = np.asarray(samples) * 1000.0
+    return float(ms.mean()), float(np.percentile(ms, 50)), float(np.percentile(ms, 95))
+
+
+def _peak_alloc(fn, base, frames=5):
+    """Largest traced memory above the starting point while rendering, in bytes."""
+    frame = base.copy()
+    fn(frame)                                   # warm caches
+    tracemalloc.start()
+    try:
+        peak = 0
+        for _ in range(frames):
+            np.copyto(frame, base)
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+            fn(frame)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - start)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark overlay rendering and its allocations.")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=200, help="Timed frames per scene")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    frame_bytes = base.nbytes
+
+    print(f"[Benchmark] Overlay at {args.width}x{args.height} "
+          f"(one frame = {frame_bytes / 1024:.0f} KiB), {args.frames} frames per scene\n")
+    print(f"  {'scene':<22} {'mean':>8} {'p50':>8} {'p95':>8}   {'peak alloc':>12}")
+
+    card = ((args.width // 3, args.height // 3), (args.width // 3 + 190, args.height // 3 + 108))
+    rows = SCENES + [
+        ("glass_rect (ROI)", lambda f: ui._glass_rect(f, *card, alpha=0.78, radius=8)),
+        ("glass_rect (full copy)", lambda f: _glass_full_frame(f, *card)),
+    ]
+
+    ok = True
+    for name, fn in rows:
+        mean, p50, p95 = _timings(fn, base, args.frames)
+        peak = _peak_alloc(fn, base)
+        reference = name.endswith("(full copy)")
+        flag = ""
+        if peak >= frame_bytes:
+            flag = "  <- full-frame allocation" + (" (expected)" if reference else "")
+            ok = ok and reference
+        print(f"  {name:<22} {mean:7.3f}ms {p50:7.3f}ms {p95:7.3f}ms   {peak / 1024:9.1f} KiB{flag}")
+
+    print(f"\n[Benchmark] {'OK — no scene allocates a full frame' if ok else 'FAIL — full-frame allocations found'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""
+IndustriGuard AI — Replay Benchmark
+===================================
+Feeds recorded clips frame-by-frame through the full check pipeline
+(capture → QR → detection → compliance → association → reporting) as
+fast as the machine allows, and reports:
+
+  - p50 / p95 / p99 latency per stage and per frame
+  - throughput (frames per second, wall clock)
+  - peak resident memory of the process
+  - decision parity against a golden results file
+
+Runs are deterministic: time comes from the clip's frame clock instead of
+the wall clock, QR codes are decoded synchronously, the inference stride
+is fixed and the Excel / backend reporters are replaced by in-memory
+recorders.  The same clip therefore produces the same reports on every
+run, and any change in them shows up as a parity failure.
+
+Usage:
+  python benchmark_pipeline.py clip.mp4 --write-golden golden.json
+  python benchmark_pipeline.py clip.mp4 --golden golden.json --json bench.json
+  python benchmark_pipeline.py a.mp4 b.mp4 --warmup 10 --max-frames 600
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from config import (
+    MODEL_PATH,
+    EMPLOYEES_FILE,
+    INFERENCE_EVERY_N_FRAMES,
+    INFERENCE_IMG_SIZE,
+    TARGET_DISPLAY_FPS,
+    MAX_RESULT_STALENESS_MS,
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+# ── Stubbed I/O ────────────────────────────────────────────────────────
+class RecordingReporter:
+    """Stands in for ExcelReporter and Reporter; keeps calls in memory."""
+
+    def __init__(self):
+        self.calls = []
+
+    def update_employee(self, employee, status_data):
+        self.calls.append(("excel", employee["id"], status_data["status"]))
+
+    def send_check_result(self, employee, status_data, camera_id="CAM-01"):
+        self.calls.append(("backend", employee["id"], status_data["status"]))
+
+
+# ── Measurement helpers ────────────────────────────────────────────────
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return round(peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0, 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024.0 * 1024.0), 1)
+    except ImportError:
+        return None
+
+
+def latency_summary(samples_s):
+    """{"count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"} for a list of seconds."""
+    if not samples_s:
+        return {"count": 0}
+    ms = np.asarray(samples_s, dtype=np.float64) * 1000.0
+    out = {"count": int(ms.size), "mean_ms": round(float(ms.mean()), 3)}
+    for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+        out[f"p{p}_ms"] = round(float(v), 3)
+    out["max_ms"] = round(float(ms.max()), 3)
+    return out
+
+
+# ── Decision parity ────────────────────────────────────────────────────
+def compare_decisions(expected, actual):
+    """
+    Compares two decision records ({"events": [...], "states": [...]}).
+    Events are matched in order; the first frame where they diverge is
+    reported so the change can be replayed and inspected.
+    """
+    exp_events = [tuple(e) for e in expected.get("events", [])]
+    act_events = [tuple(e) for e in actual.get("events", [])]
+    first_divergence = None
+    for i in range(max(len(exp_events), len(act_events))):
+        e = exp_events[i] if i < len(exp_events) else None
+        a = act_events[i] if i < len(act_events) else None
+        if e != a:
+            first_divergence = {"index": i, "expected": e, "actual": a}
+            break
+
+    exp_set, act_set = set(exp_events), set(act_events)
+    return {
+        "match": first_divergence is None and expected.get("states") == actual.get("states"),
+        "events_expected": len(exp_events),
+        "events_actual": len(act_events),
+        "missing": len(exp_set - act_set),
+        "unexpected": len(act_set - exp_set),
+        "states_match": expected.get("states") == actual.get("states"),
+        "first_divergence": first_divergence,
+    }
+
+
+# ── Replay ─────────────────────────────────────────────────────────────
+def replay_clip(path, detector, scanner, stride, imgsz, max_frames=None, warmup=0):
+    """
+    Runs one clip through a fresh Pipeline, with the detector's tracker
+    reset, so results do not depend on which clips ran before it.
+    Returns (metrics, decisions). `warmup` leading frames are processed but
+    left out of the latency stats.
+    """
+    from pipeline import Pipeline
+    from cadence import InferenceCadence
+    from stage_timer import StageTimer
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"cannot open clip: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    clip_time = [0.0]   # frame clock: frame N happens at N / fps seconds
+    recorder = RecordingReporter()
+    pipeline = Pipeline(
+        detector=detector,
+        scanner=scanner,
+        reporter=recorder,
+        backend_reporter=recorder,
+        headless=True,
+        qr_worker=False,
+        cadence=InferenceCadence(
+            initial_stride=stride, initial_imgsz=imgsz,
+            target_fps=TARGET_DISPLAY_FPS, max_staleness_ms=MAX_RESULT_STALENESS_MS,
+            min_stride=stride, max_stride=stride, adapt_imgsz=False,
+        ),
+        timer=StageTimer(report_every_seconds=0),
+        clock=lambda: clip_time[0],
+    )
+    scanner.reset()
+    detector.reset_tracking()
+
+    stage_samples = {}
+    frame_samples = []
+    events = []
+    states = []
+    frames = 0
+    inferences = 0
+    t_start = time.perf_counter()
+    try:
+        while max_frames is None or frames < max_frames:
+            t0 = time.perf_counter()
+            ok, frame = cap.read()
+            if not ok:
+                break
+            t_capture = time.perf_counter() - t0
+
+            clip_time[0] = frames / fps
+            result = pipeline.step(frame)
+            t_frame = time.perf_counter() - t0
+            frames += 1
+            inferences += result["inferred"]
+
+            for report in result["reports"]:
+                events.append([result["frame_index"], report["source"],
+                               report["employee_id"], report["status"]])
+            if not states or states[-1][1] != result["state"]:
+                states.append([result["frame_index"], result["state"]])
+
+            if frames > warmup:
+                frame_samples.append(t_frame)
+                stage_samples.setdefault("capture", []).append(t_capture)
+                for stage, seconds in result["timings"].items():
+                    stage_samples.setdefault(stage, []).append(seconds)
+    finally:
+        wall = time.perf_counter() - t_start
+        cap.release()
+
+    metrics = {
+        "clip": os.path.basename(path),
+        "frames": frames,
+        "clip_fps": round(fps, 2),
+        "wall_seconds": round(wall, 3),
+        "throughput_fps": round(frames / wall, 2) if wall > 0 else None,
+        "realtime_factor": round(frames / wall / fps, 2) if wall > 0 else None,
+        "inferences": inferences,
+        "frame": latency_summary(frame_samples),
+        "stages": {stage: latency_summary(s) for stage, s in stage_samples.items()},
+        "reporter_calls": len(recorder.calls),
+    }
+    decisions = {"frames": frames, "events": events, "states": states}
+    return metrics, decisions
+
+
+def _print_table(metrics):
+    print(f"\n[Benchmark] {metrics['clip']}: {metrics['frames']} frames in "
+          f"{metrics['wall_seconds']:.2f}s → {metrics['throughput_fps']} FPS "
+          f"({metrics['realtime_factor']}x real time, {metrics['inferences']} inferences)")
+    print(f"  {'stage':<10} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}   (ms)")
+    rows = list(metrics["stages"].items()) + [("frame", metrics["frame"])]
+    for stage, s in rows:
+        if not s.get("count"):
+            continue
+        print(f"  {stage:<10} {s['p50_ms']:9.2f} {s['p95_ms']:9.2f} {s['p99_ms']:9.2f} {s['max_ms']:9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay clips through the pipeline and benchmark it.")
+    parser.add_argument("clips", nargs="+", help="Recorded video files")
+    parser.add_argument("--model", default=MODEL_PATH, help="YOLO weights")
+    parser.add_argument("--employees", default=EMPLOYEES_FILE, help="Employee database JSON")
+    parser.add_argument("--stride", type=int, default=INFERENCE_EVERY_N_FRAMES,
+                        help="Fixed inference stride (adaptive cadence is off for determinism)")
+    parser.add_argument("--imgsz", type=int, default=INFERENCE_IMG_SIZE, help="Inference image size")
+    parser.add_argument("--max-frames", type=int, default=None, help="Stop each clip after N frames")
+    parser.add_argument("--warmup", type=int, default=5,
+                        help="Leading frames excluded from latency stats (model warm-up)")
+    parser.add_argument("--golden", default=None, help="Golden decisions file to compare against")
+    parser.add_argument("--write-golden", default=None, help="Write this run's decisions as the golden file")
+    parser.add_argument("--json", default=None, help="Write machine-readable results here ('-' = stdout)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"[ERROR] Model file not found: {args.model}")
+        return 2
+
+    from ppe_detector import PPEDetector
+    from qr_scanner_opencv import QRScanner
+
+    detector = PPEDetector(model_path=args.model)
+    scanner = QRScanner(employees_file=args.employees)
+
+    golden = None
+    if args.golden:
+        with open(args.golden, encoding="utf-8") as f:
+            golden = json.load(f)
+
+    report = {"clips": [], "parity": None, "peak_rss_mb": None}
+    all_decisions = {}
+    parity_ok = True
+    # With --json - keep stdout clean for the JSON document
+    log_stream = sys.stderr if args.json == "-" else sys.stdout
+    for path in args.clips:
+        with contextlib.redirect_stdout(log_stream):
+            metrics, decisions = replay_clip(
+                path, detector, scanner, stride=max(1, args.stride), imgsz=args.imgsz,
+                max_frames=args.max_frames, warmup=max(0, args.warmup),
+            )
+        all_decisions[metrics["clip"]] = decisions
+        if golden is not None:
+            expected = golden.get(metrics["clip"])
+            if expected is None:
+                metrics["parity"] = {"match": False, "error": "clip not in golden file"}
+            else:
+                metrics["parity"] = compare_decisions(expected, decisions)
+            parity_ok = parity_ok and metrics["parity"]["match"]
+        report["clips"].append(metrics)
+        if args.json != "-":
+            _print_table(metrics)
+            if "parity" in metrics:
+                p = metrics["parity"]
+                print(f"  parity: {'OK' if p['match'] else 'MISMATCH'}  {p}")
+
+    report["peak_rss_mb"] = peak_rss_mb()
+    if golden is not None:
+        report["parity"] = parity_ok
+    if args.json != "-":
+        print(f"\n[Benchmark] Peak RSS: {report['peak_rss_mb']} MB")
+
+    if args.write_golden:
+        with open(args.write_golden, "w", encoding="utf-8") as f:
+            json.dump(all_decisions, f, indent=1)
+        if args.json != "-":
+            print(f"[Benchmark] Golden decisions written → {args.write_golden}")
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[Benchmark] Results written → {args.json}")
+
+    return 0 if parity_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
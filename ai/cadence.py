@@ -0,0 +1,153 @@
+"""
+cadence.py  —  Adaptive inference cadence controller
+
+Replaces the fixed INFERENCE_EVERY_N_FRAMES / INFERENCE_IMG_SIZE pair.
+Measures how long YOLO and the rest of the loop actually take and picks
+the inference stride (and optionally imgsz) that keeps the display near
+TARGET_DISPLAY_FPS while results are never older than
+MAX_RESULT_STALENESS_MS.
+"""
+
+import math
+import time
+
+
+class InferenceCadence:
+    def __init__(self, initial_stride=3, initial_imgsz=480, target_fps=20.0,
+                 max_staleness_ms=400.0, min_stride=1, max_stride=8,
+                 adapt_imgsz=False, imgsz_ladder=(320, 416, 480, 640),
+                 ema=0.2, adjust_every=5):
+        self.min_stride   = max(1, int(min_stride))
+        self.max_stride   = max(self.min_stride, int(max_stride))
+        self.stride       = min(max(int(initial_stride), self.min_stride), self.max_stride)
+        self.imgsz        = initial_imgsz
+        self.target_fps   = float(target_fps)
+        self.max_staleness = float(max_staleness_ms) / 1000.0
+        self.adapt_imgsz  = bool(adapt_imgsz) and initial_imgsz is not None
+        self.imgsz_ladder = sorted(set(imgsz_ladder) | ({initial_imgsz} if initial_imgsz else set()))
+        self.ema          = float(ema)
+        self.adjust_every = max(1, int(adjust_every))
+
+        self.infer_s      = None   # EMA of one inference
+        self.base_s       = None   # EMA of loop work on frames without inference
+        self.interval_s   = None   # EMA of frame-to-frame interval (display rate)
+        self.limited_by   = "warmup"
+        self._upsize_hold = 0      # adjustments to wait before growing imgsz again
+
+        self._frames_since_infer = self.stride   # infer on the first frame
+        self._inferences  = 0
+        self._t_begin     = None
+        self._t_prev      = None
+
+    def _smooth(self, old, new):
+        return new if old is None else old + self.ema * (new - old)
+
+    # ── Per-frame hooks ───────────────────────────────────────────────
+    def begin_frame(self, now=None):
+        now = time.perf_counter() if now is None else now
+        if self._t_prev is not None:
+            dt = now - self._t_prev
+            if 0 < dt < 1.0:   # ignore gaps from state changes / stalls
+                self.interval_s = self._smooth(self.interval_s, dt)
+        self._t_prev = now
+        self._t_begin = now
+        self._frames_since_infer += 1
+
+    def should_infer(self):
+        return self._frames_since_infer >= self.stride
+
+    def record_inference(self, seconds):
+        self.infer_s = self._smooth(self.infer_s, seconds)
+        self._frames_since_infer = 0
+        self._inferences += 1
+        if self._inferences % self.adjust_every == 0:
+            self._adjust()
+
+    def end_frame(self, inferred, now=None):
+        if self._t_begin is None or inferred:
+            return
+        now = time.perf_counter() if now is None else now
+        self.base_s = self._smooth(self.base_s, now - self._t_begin)
+
+    # ── Controller ─────────────────────────────────────────────────────
+    def _adjust(self):
+        if self.infer_s is None or self.base_s is None:
+            return
+        if self._upsize_hold > 0:
+            self._upsize_hold -= 1
+
+        budget   = 1.0 / self.target_fps
+        headroom = budget - self.base_s
+
+        # Smallest stride whose amortized inference cost fits the frame budget
+        if headroom <= 0:
+            fps_stride = self.max_stride
+        else:
+            fps_stride = int(math.ceil(self.infer_s / headroom))
+
+        # Largest stride whose result age stays within the staleness limit
+        period = max(budget, self.base_s + self.infer_s / max(1, fps_stride))
+        stale_stride = int((self.max_staleness - self.infer_s) / period) if period > 0 else self.max_stride
+        stale_stride = max(self.min_stride, stale_stride)
+
+        if fps_stride > stale_stride:
+            # Both targets cannot be met at this imgsz: try a cheaper input size
+            if self._step_imgsz(-1):
+                self.limited_by = "imgsz-down"
+                self._upsize_hold = 6   # avoid bouncing straight back up
+                return
+            self.limited_by = "staleness"
+            stride = stale_stride
+        elif (fps_stride <= self.min_stride and self._upsize_hold == 0
+              and self.infer_s < 0.5 * max(headroom, 0.0)):
+            # Plenty of spare budget — spend it on a larger input size
+            if self._step_imgsz(+1):
+                self.limited_by = "imgsz-up"
+                return
+            self.limited_by = "ok"
+            stride = fps_stride
+        else:
+            self.limited_by = "fps"
+            stride = fps_stride
+
+        self.stride = min(max(stride, self.min_stride), self.max_stride)
+
+    def _step_imgsz(self, direction):
+        if not self.adapt_imgsz or self.imgsz not in self.imgsz_ladder:
+            return False
+        idx = self.imgsz_ladder.index(self.imgsz) + direction
+        if idx < 0 or idx >= len(self.imgsz_ladder):
+            return False
+        self.imgsz = self.imgsz_ladder[idx]
+        self.infer_s = None   # cost differs per size → re-measure
+        return True
+
+    # ── Instrumentation ────────────────────────────────────────────────
+    def staleness_ms(self):
+        if self.interval_s is None or self.infer_s is None:
+            return None
+        return (self.stride * self.interval_s + self.infer_s) * 1000.0
+
+    def snapshot(self):
+        stale = self.staleness_ms()
+        return {
+            "stride":          self.stride,
+            "imgsz":           self.imgsz,
+            "inference_ms":    round(self.infer_s * 1000.0, 1) if self.infer_s is not None else None,
+            "loop_ms":         round(self.base_s * 1000.0, 1) if self.base_s is not None else None,
+            "display_fps":     round(1.0 / self.interval_s, 1) if self.interval_s else None,
+            "target_fps":      self.target_fps,
+            "staleness_ms":    round(stale, 0) if stale is not None else None,
+            "max_staleness_ms": self.max_staleness * 1000.0,
+            "limited_by":      self.limited_by,
+        }
+
+    def hud_lines(self):
+        s = self.snapshot()
+        fmt = lambda v, unit="": "--" if v is None else f"{v:g}{unit}"
+        return [
+            f"Infer every {s['stride']} fr @ {fmt(s['imgsz'], 'px')}  ({s['limited_by']})",
+            f"FPS {fmt(s['display_fps'])}/{fmt(s['target_fps'])}  "
+            f"YOLO {fmt(s['inference_ms'], 'ms')}  loop {fmt(s['loop_ms'], 'ms')}",
+            f"Result age {fmt(s['staleness_ms'], 'ms')} (max {fmt(s['max_staleness_ms'], 'ms')})",
+        ]
@@ -1,13 +1,34 @@
 import cv2
-import time
+import sys
+import threading
 from config import (
+    CAMERA_ID,
     CAMERA_MODE,
     USB_CAMERA_INDEX,
     USB_TETHER_IP,
     USB_TETHER_PORT,
     WIFI_CAMERA_URL,
     VIDEO_FILE_PATH,
+    CAMERA_DISCOVERY_FILE,
+    STREAM_READER,
+    CAMERA_RECONNECT_MIN_SECONDS,
+    CAMERA_RECONNECT_MAX_SECONDS,
+    CAMERA_RECONNECT_JITTER,
+    CAMERA_OFFLINE_AFTER_SECONDS,
+    CAMERA_OFFLINE_FRAME_INTERVAL,
 )
+from camera_health import Backoff, CameraHealth, offline_frame
+
+
+def local_capture_api():
+    """
+    OpenCV backend for local cameras (device indices). DirectShow is the
+    most reliable one on Windows (laptop webcams, USB capture devices,
+    DroidCam / Iriun virtual cams); elsewhere OpenCV picks (V4L2 on Linux,
+    AVFoundation on macOS). Shared by find_cameras and diagnose_camera so
+    they open devices the same way.
+    """
+    return cv2.CAP_DSHOW if sys.platform.startswith("win") else cv2.CAP_ANY
 
 
 class CameraFeed:
@@ -18,17 +39,36 @@ class CameraFeed:
       - wifi        : Phone via WiFi + IP Webcam app
       - webcam      : Laptop built-in webcam
       - video       : Recorded video file (testing)
+      - auto        : Best camera ranked by find_cameras.py
+
+    When a live camera drops out, get_frame() keeps returning "camera
+    offline" frames (see `online`) while a background thread reconnects
+    with exponential backoff. Only a video file ever ends (None).
     """
 
-    def __init__(self, source=None):
+    def __init__(self, source=None, camera_id=CAMERA_ID):
         self.mode   = CAMERA_MODE
+        self.capture_size = (640, 480)     # requested from local cameras
         self.source = source or self._resolve_source()
-        self.is_stream = isinstance(self.source, str) and self.source.startswith("http")
+        self.is_stream = isinstance(self.source, str) and self.source.startswith(("http", "rtsp"))
+        self.is_live = isinstance(self.source, int) or self.is_stream   # files end, cameras come back
         self.cap    = None
-        self.reconnect_attempts = 0
+        self.reader = None     # SubprocessStreamReader when STREAM_READER is ffmpeg / gstreamer
+        self.health = CameraHealth(camera_id)
+
+        self._frame_shape = (480, 640, 3)     # size of the offline frame until a real one arrives
+        self._online = threading.Event()
+        self._online.set()
+        self._closing = threading.Event()
+        self._reconnect_thread = None
 
         self._connect()
 
+    @property
+    def online(self):
+        """False while get_frame() returns offline placeholder frames."""
+        return self.health.online
+
     # ── Resolve source from config mode ───────────────────────
     def _resolve_source(self):
         mode = CAMERA_MODE.lower().strip()
@@ -51,6 +91,18 @@ class CameraFeed:
         elif mode == "video":
             return VIDEO_FILE_PATH
 
+        elif mode == "auto":
+            # Ranked by  python find_cameras.py
+            from find_cameras import load_best_camera
+
+            best = load_best_camera(CAMERA_DISCOVERY_FILE)
+            if best is None:
+                print(f"[CameraFeed] ⚠ No camera in {CAMERA_DISCOVERY_FILE} "
+                      f"(run  python find_cameras.py), falling back to USB_CAMERA_INDEX")
+                return USB_CAMERA_INDEX
+            self.capture_size = (best["width"], best["height"])
+            return best["source"]
+
         else:
             print(f"[CameraFeed] ⚠ Unknown CAMERA_MODE '{CAMERA_MODE}', falling back to webcam")
             return 0
@@ -63,6 +115,7 @@ class CameraFeed:
             "wifi":       f"WiFi Mobile Camera ({self.source})",
             "webcam":     "Laptop Webcam",
             "video":      f"Video File ({self.source})",
+            "auto":       f"Auto-discovered Camera ({self.source})",
         }
         return labels.get(self.mode, str(self.source))
 
@@ -72,30 +125,48 @@ class CameraFeed:
         print(f"[CameraFeed] Source : {self._source_label()}")
         print(f"[CameraFeed] Connecting...")
 
-        # On Windows, DirectShow is usually the most reliable backend for
-        # local cameras (laptop webcam, USB capture devices, DroidCam/Iriun virtual cams).
+        if self.is_stream and STREAM_READER != "opencv":
+            self._connect_reader()
+            return
+
+        self.cap = self._open_capture()
+        if not self.cap.isOpened():
+            self._raise_connection_error()
+
+        print(f"[CameraFeed] ✅ Connected → {self._source_label()}")
+
+    def _open_capture(self):
         if isinstance(self.source, int):
-            self.cap = cv2.VideoCapture(self.source, cv2.CAP_DSHOW)
+            cap = cv2.VideoCapture(self.source, local_capture_api())
         else:
-            self.cap = cv2.VideoCapture(self.source)
+            cap = cv2.VideoCapture(self.source)
 
         # Apply settings based on mode
         if self.is_stream:
             # HTTP streams need small buffer to reduce latency
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         else:
             # USB camera or webcam — optimise for low latency
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)              # minimal buffer
-            self.cap.set(cv2.CAP_PROP_FOURCC,
-                         cv2.VideoWriter_fourcc(*"MJPG"))          # MJPEG is faster than H264
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            self.cap.set(cv2.CAP_PROP_FPS, 30)
-
-        if not self.cap.isOpened():
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)              # minimal buffer
+            cap.set(cv2.CAP_PROP_FOURCC,
+                    cv2.VideoWriter_fourcc(*"MJPG"))          # MJPEG is faster than H264
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.capture_size[0])
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.capture_size[1])
+            cap.set(cv2.CAP_PROP_FPS, 30)
+        return cap
+
+    def _connect_reader(self):
+        from stream_reader import SubprocessStreamReader
+
+        self.reader = SubprocessStreamReader(self.source, backend=STREAM_READER, health=self.health)
+        if not self.reader.open():
+            error = self.reader.last_error
+            self.reader.close()
+            self.reader = None
+            if error:
+                print(f"[CameraFeed] {STREAM_READER}: {error}")
             self._raise_connection_error()
-
-        print(f"[CameraFeed] ✅ Connected → {self._source_label()}")
+        print(f"[CameraFeed] ✅ Connected → {self._source_label()} ({STREAM_READER})")
 
     # ── Detailed error messages per mode ──────────────────────
     def _raise_connection_error(self):
@@ -134,6 +205,13 @@ class CameraFeed:
                 f"   4. Update WIFI_CAMERA_URL in config.py\n"
             )
 
+        elif self.mode == "auto":
+            raise RuntimeError(
+                f"\n[CameraFeed] ❌ Cannot open the auto-discovered camera ({self.source})\n"
+                f"   The cameras attached to this PC may have changed since the last scan.\n"
+                f"   Run  python find_cameras.py  again to refresh {CAMERA_DISCOVERY_FILE}\n"
+            )
+
         else:
             raise RuntimeError(
                 f"[CameraFeed] ❌ Cannot open camera (source={self.source})"
@@ -142,53 +220,96 @@ class CameraFeed:
     # ── Read frame ────────────────────────────────────────────
     def get_frame(self):
         """
-        Returns a frame. Auto-reconnects for stream-based sources.
+        Returns a frame, or an offline placeholder while a live camera is
+        reconnecting (check `online`). None only at the end of a video file.
         """
-        ret, frame = self.cap.read()
+        if self.reader is not None:
+            return self._get_reader_frame()
 
-        if not ret:
-            # For stream/network sources, try reconnecting
-            if self.is_stream:
-                print("[CameraFeed] ⚠ Frame dropped — attempting reconnect...")
-                time.sleep(1)
-                self._connect()
-                self.reconnect_attempts += 1
-
-                if self.reconnect_attempts > 10:
-                    print("[CameraFeed] ❌ Too many failed reconnects. Exiting.")
-                    return None
-
-                ret, frame = self.cap.read()
-                if ret:
-                    self.reconnect_attempts = 0
-                    print("[CameraFeed] ✅ Reconnected successfully")
-                    return frame
-
-            # For USB mobile, try reopening the device
-            elif self.mode == "usb_mobile":
-                print("[CameraFeed] ⚠ USB frame dropped — reopening device...")
-                time.sleep(0.5)
-                self.cap.release()
-                self._connect()
-                self.reconnect_attempts += 1
-
-                if self.reconnect_attempts > 5:
-                    print("[CameraFeed] ❌ USB camera not responding. Exiting.")
-                    return None
-
-                ret, frame = self.cap.read()
-                if ret:
-                    self.reconnect_attempts = 0
-                    return frame
+        if not self._online.is_set():
+            return self._offline_frame()
 
+        ret, frame = self.cap.read()
+        if ret:
+            self.health.frame_received()
+            self._frame_shape = frame.shape
+            return frame
+
+        if not self.is_live:
+            return None                      # end of the video file
+        self._go_offline("frame read failed")
+        self.cap.release()
+        if self._reconnect_thread is None or not self._reconnect_thread.is_alive():
+            self._reconnect_thread = threading.Thread(target=self._reconnect_loop,
+                                                      name="camera-reconnect", daemon=True)
+            self._reconnect_thread.start()
+        return self._offline_frame()
+
+    def _get_reader_frame(self):
+        # The reader reconnects in its own thread; only the on/offline view lives here
+        timeout = 1.0 if self.health.online else CAMERA_OFFLINE_FRAME_INTERVAL
+        frame = self.reader.get_frame(timeout=timeout)
+        if frame is not None and self.reader.stale_seconds < CAMERA_OFFLINE_AFTER_SECONDS:
+            if not self.health.online:
+                self._came_online()
+            self.health.frame_received()
+            self._frame_shape = frame.shape
+            return frame
+        if self.reader.state == "closed":
             return None
-
-        self.reconnect_attempts = 0
-        return frame
+        self._go_offline(self.reader.last_error or "no frames")
+        return offline_frame(self._frame_shape)
+
+    def _offline_frame(self):
+        # Paces the caller's loop; returns early once the camera is back
+        self._online.wait(CAMERA_OFFLINE_FRAME_INTERVAL)
+        return offline_frame(self._frame_shape)
+
+    def _go_offline(self, reason):
+        self._online.clear()
+        if self.health.went_offline(reason):
+            print(f"[CameraFeed] ⚠ Camera offline ({reason}) — reconnecting in the background")
+
+    def _came_online(self):
+        down = self.health.came_online()
+        self._online.set()
+        print(f"[CameraFeed] ✅ Reconnected → {self._source_label()} after {down:.1f}s offline")
+
+    # ── Background reconnect ──────────────────────────────────
+    def _reconnect_loop(self):
+        backoff = Backoff(CAMERA_RECONNECT_MIN_SECONDS, CAMERA_RECONNECT_MAX_SECONDS,
+                          jitter=CAMERA_RECONNECT_JITTER)
+        while True:
+            delay = backoff.next_delay()
+            self.health.retry_scheduled(delay)
+            if self._closing.wait(delay):
+                return
+            cap = self._open_capture()
+            opened = cap.isOpened()
+            ok = opened and cap.read()[0]
+            if self._closing.is_set():
+                cap.release()
+                return
+            if ok:
+                self.cap = cap                 # get_frame() does not touch cap while offline
+                self._came_online()
+                return
+            cap.release()
+            self.health.attempt_failed("no frames" if opened else "cannot open camera")
 
     # ── Camera info ───────────────────────────────────────────
     def get_info(self):
         """Returns camera info for display"""
+        if self.reader is not None:
+            info = self.reader.get_info()
+            return {
+                "source": self.source,
+                "mode":   self.mode,
+                "type":   self._source_label(),
+                "width":  info["width"],
+                "height": info["height"],
+                "fps":    info["fps"],
+            }
         return {
             "source": self.source,
             "mode":   self.mode,
@@ -200,6 +321,11 @@ class CameraFeed:
 
     # ── Release ───────────────────────────────────────────────
     def release(self):
+        self._closing.set()
+        if self._reconnect_thread is not None:
+            self._reconnect_thread.join(timeout=2.0)
+        if self.reader is not None:
+            self.reader.close()
         if self.cap:
             self.cap.release()
         cv2.destroyAllWindows()
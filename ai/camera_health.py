@@ -0,0 +1,226 @@
+"""
+camera_health.py  —  Camera connection state, reconnect backoff and metrics
+
+A phone camera on WiFi or a USB cable drops out now and then.  CameraFeed
+keeps going through it:
+
+  - while the camera is down, get_frame() returns a placeholder frame
+    (offline_frame) at a slow pace instead of blocking or giving up
+  - a background thread retries the connection with exponential backoff
+    and jitter (Backoff), so several stations coming back after a router
+    restart do not all retry at the same moment
+  - CameraHealth records the state, outages and retries.  The pipeline shows
+    it on screen, and prometheus_text() adds it to the local /metrics endpoint
+  - RemoteCameraHealth shows the same for a camera in the capture process
+    of the multi-process station, from the snapshots it sends
+"""
+
+import random
+import threading
+import time
+
+import numpy as np
+
+ONLINE = "online"
+OFFLINE = "offline"
+
+_STATE_VALUES = {ONLINE: 1, OFFLINE: 0}
+
+
+class Backoff:
+    """Exponential backoff with "equal jitter": half fixed, half random."""
+
+    def __init__(self, base=0.5, maximum=30.0, factor=2.0, jitter=0.5, rng=None):
+        """
+        base, maximum : first and largest delay in seconds
+        jitter        : fraction of each delay that is randomised (0 = none)
+        """
+        self.base = float(base)
+        self.maximum = float(maximum)
+        self.factor = float(factor)
+        self.jitter = float(jitter)
+        self.rng = rng or random.Random()
+        self.attempt = 0
+
+    def next_delay(self):
+        """Delay before the next attempt; grows with each call until reset()."""
+        delay = min(self.maximum, self.base * self.factor ** self.attempt)
+        self.attempt += 1
+        return delay * (1.0 - self.jitter) + delay * self.jitter * self.rng.random()
+
+    def reset(self):
+        self.attempt = 0
+
+
+class CameraHealth:
+    """Thread-safe connection state of one camera."""
+
+    def __init__(self, camera_id, clock=time.monotonic):
+        self.camera_id = camera_id
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.state = ONLINE
+        self.frames = 0
+        self.outages = 0              # online → offline transitions
+        self.reconnect_attempts = 0   # total, across all outages
+        self.reconnects = 0           # attempts that succeeded
+        self.offline_seconds = 0.0    # total time offline, finished outages only
+        self.last_error = ""
+        self._offline_since = None
+        self._last_frame_time = None
+        self._next_retry_at = None
+        self._outage_attempts = 0     # attempts during the current outage
+
+    # ── Updates ───────────────────────────────────────────────────────
+    def frame_received(self):
+        with self._lock:
+            self.frames += 1
+            self._last_frame_time = self.clock()
+
+    def went_offline(self, reason):
+        """Marks the camera offline. Returns False if it already was."""
+        with self._lock:
+            self.last_error = reason
+            if self.state == OFFLINE:
+                return False
+            self.state = OFFLINE
+            self.outages += 1
+            self._offline_since = self.clock()
+            self._outage_attempts = 0
+            return True
+
+    def retry_scheduled(self, delay):
+        with self._lock:
+            self._next_retry_at = self.clock() + delay
+
+    def attempt_failed(self, reason):
+        with self._lock:
+            self.reconnect_attempts += 1
+            self._outage_attempts += 1
+            self.last_error = reason
+
+    def came_online(self):
+        """Marks the camera online. Returns the outage length in seconds."""
+        with self._lock:
+            self.reconnect_attempts += 1
+            self.reconnects += 1
+            down = self.clock() - self._offline_since if self._offline_since is not None else 0.0
+            self.offline_seconds += down
+            self.state = ONLINE
+            self._offline_since = None
+            self._next_retry_at = None
+            return down
+
+    # ── Views ─────────────────────────────────────────────────────────
+    @property
+    def online(self):
+        return self.state == ONLINE
+
+    def snapshot(self):
+        with self._lock:
+            now = self.clock()
+            return {
+                "camera_id": self.camera_id,
+                "state": self.state,
+                "frames": self.frames,
+                "outages": self.outages,
+                "reconnect_attempts": self.reconnect_attempts,
+                "reconnects": self.reconnects,
+                "offline_for_s": now - self._offline_since if self._offline_since is not None else 0.0,
+                "outage_attempts": self._outage_attempts,
+                "next_retry_in_s": (max(0.0, self._next_retry_at - now)
+                                    if self._next_retry_at is not None else None),
+                "last_frame_age_s": (now - self._last_frame_time
+                                     if self._last_frame_time is not None else None),
+                "offline_seconds_total": self.offline_seconds + (
+                    now - self._offline_since if self._offline_since is not None else 0.0),
+                "last_error": self.last_error,
+            }
+
+    def status_lines(self):
+        """Short lines for the offline screen."""
+        s = self.snapshot()
+        down = int(s["offline_for_s"])
+        lines = [f"Offline for {down // 60}:{down % 60:02d}"]
+        retry = s["next_retry_in_s"]
+        if retry is not None and retry > 0.05:
+            lines.append(f"Reconnect attempt {s['outage_attempts'] + 1} in {retry:.0f}s")
+        else:
+            lines.append(f"Reconnecting (attempt {s['outage_attempts'] + 1})...")
+        return lines
+
+    def prometheus_text(self, prefix="industriguard_ai"):
+        s = self.snapshot()
+        label = f'camera="{self.camera_id}"'
+        rows = [
+            ("camera_up", "gauge", "1 while the camera delivers frames, 0 while reconnecting.",
+             _STATE_VALUES[s["state"]]),
+            ("camera_frames_total", "counter", "Frames received from the camera.", s["frames"]),
+            ("camera_outages_total", "counter", "Times the camera went offline.", s["outages"]),
+            ("camera_reconnect_attempts_total", "counter", "Reconnect attempts made.",
+             s["reconnect_attempts"]),
+            ("camera_offline_seconds_total", "counter", "Time spent offline.",
+             round(s["offline_seconds_total"], 3)),
+        ]
+        lines = []
+        for name, kind, help_text, value in rows:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.append(f"{prefix}_{name}{{{label}}} {value}")
+        if s["last_frame_age_s"] is not None:
+            name = f"{prefix}_camera_last_frame_age_seconds"
+            lines += [f"# HELP {name} Seconds since the last camera frame.",
+                      f"# TYPE {name} gauge",
+                      f"{name}{{{label}}} {s['last_frame_age_s']:.3f}"]
+        return "\n".join(lines) + "\n"
+
+
+class RemoteCameraHealth(CameraHealth):
+    """
+    Read-only CameraHealth for a camera in another process (the capture
+    process of multiprocess_station). update() takes that camera's
+    snapshot(); views age the time-based fields until the next one.
+    """
+
+    def __init__(self, camera_id, clock=time.monotonic):
+        super().__init__(camera_id, clock)
+        self._remote = None
+        self._remote_time = 0.0
+
+    def update(self, snapshot):
+        with self._lock:
+            self._remote = dict(snapshot)
+            self._remote_time = self.clock()
+            self.state = snapshot["state"]
+
+    def snapshot(self):
+        with self._lock:
+            remote, received = self._remote, self._remote_time
+        if remote is None:
+            return super().snapshot()
+        s = dict(remote)
+        age = self.clock() - received
+        if s["state"] == OFFLINE:
+            s["offline_for_s"] += age
+            s["offline_seconds_total"] += age
+        if s["next_retry_in_s"] is not None:
+            s["next_retry_in_s"] = max(0.0, s["next_retry_in_s"] - age)
+        if s["last_frame_age_s"] is not None:
+            s["last_frame_age_s"] += age
+        return s
+
+
+# ── Placeholder frame ──────────────────────────────────────────────────
+_offline_frames = {}
+
+
+def offline_frame(shape):
+    """Dark frame of `shape` shown while the camera is down (a fresh copy)."""
+    base = _offline_frames.get(shape)
+    if base is None:
+        h, w = shape[:2]
+        # Subtle vertical gradient so the screen does not look frozen-black
+        column = np.linspace(34, 18, h, dtype=np.float32)[:, None, None]
+        tint = np.array([1.0, 0.85, 0.8], dtype=np.float32)[None, None, :]
+        base = _offline_frames[shape] = np.broadcast_to(column * tint, (h, w, 3)).astype(np.uint8)
+    return base.copy()
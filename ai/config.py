@@ -10,6 +10,8 @@
 #   "wifi"         → Mobile camera over WiFi (IP Webcam app)
 #   "webcam"       → Laptop built-in webcam
 #   "video"        → Recorded video file (for testing)
+#   "auto"         → Best camera ranked by  python find_cameras.py
+#                    (read from CAMERA_DISCOVERY_FILE)
 
 # Default to laptop webcam so the app works out-of-the-box.
 # Switch to "usb_mobile" / "usb_tether" / "wifi" when using a phone camera.
@@ -37,6 +39,34 @@ WIFI_CAMERA_URL = "http://192.168.0.101:8080/video"
 # ── Video File (testing mode) ─────────────────────────────
 VIDEO_FILE_PATH = "test_video.mp4"
 
+# ── Camera Reconnect ────────────────────────────────────────
+# When a live camera drops out, the station keeps running and shows a
+# "camera offline" screen while a background thread reconnects with
+# exponential backoff (each delay partly randomised by the jitter
+# fraction). Camera health is exported on the /metrics endpoint
+# (PROFILING_METRICS_PORT).
+CAMERA_RECONNECT_MIN_SECONDS  = 0.5    # first retry delay, doubled after each failure
+CAMERA_RECONNECT_MAX_SECONDS  = 30.0
+CAMERA_RECONNECT_JITTER       = 0.5
+CAMERA_OFFLINE_AFTER_SECONDS  = 2.0    # stream readers: no frame for this long = offline
+CAMERA_OFFLINE_FRAME_INTERVAL = 0.2    # pace of the offline screen
+
+# ── Network Stream Reader (usb_tether / wifi / rtsp URLs) ───
+# "opencv"    → cv2.VideoCapture(url)
+# "ffmpeg"    → ffmpeg subprocess with buffering off; lower latency and
+#               reconnects in the background (needs ffmpeg on PATH)
+# "gstreamer" → same with gst-launch-1.0 (needs STREAM_DECODE_SIZE,
+#               else 640x480)
+# Test without a phone:  python fake_ip_camera.py
+STREAM_READER              = "opencv"
+STREAM_DECODE_SIZE         = None     # (width, height) to scale to while decoding
+STREAM_MJPEG_LOWRES        = 0        # ffmpeg: decode MJPEG at 1/2 (1) or 1/4 (2) size
+STREAM_STALL_SECONDS       = 3.0      # restart the decoder when no frame arrives for this long
+STREAM_BACKOFF_MIN_SECONDS = 0.5      # first retry delay, doubled after each failure
+STREAM_BACKOFF_MAX_SECONDS = 10.0
+FFMPEG_BINARY              = "ffmpeg"
+GST_LAUNCH_BINARY          = "gst-launch-1.0"
+
 # ── Backend Settings ──────────────────────────────────────
 BACKEND_URL = "http://localhost:5000"
 
@@ -56,6 +86,121 @@ INFERENCE_EVERY_N_FRAMES = 3
 # Set to None to use original frame size.
 INFERENCE_IMG_SIZE = 480
 
+# ── Adaptive Inference Cadence ──────────────────────────────
+# When enabled, the two settings above are only starting values: the
+# stride (and optionally imgsz) is re-tuned from measured latencies to
+# hold TARGET_DISPLAY_FPS without results getting older than
+# MAX_RESULT_STALENESS_MS.
+ADAPTIVE_INFERENCE       = True
+TARGET_DISPLAY_FPS       = 20
+MAX_RESULT_STALENESS_MS  = 400
+INFERENCE_STRIDE_MAX     = 8
+ADAPTIVE_IMG_SIZE        = False                 # also step imgsz up/down
+INFERENCE_IMG_SIZES      = (320, 416, 480, 640)  # imgsz ladder when adaptive
+
+# ── Cascaded (person-crop) Inference ───────────────────────
+# Second pass on batched head / hands / feet crops of each detected person
+# for better recall of small PPE (goggles, gloves, boots) without running
+# the whole frame at high resolution.
+CASCADE_INFERENCE      = False
+CASCADE_CROP_IMG_SIZE  = 320     # imgsz for the crop batch
+CASCADE_MAX_PERSONS    = 8       # largest N persons get a second pass
+
+# ── Tiled (SAHI-style) Inference ───────────────────────────
+# For wide-angle 1080p+ gate cameras: slice each frame into overlapping
+# tiles, run them as one batch and merge with cross-tile NMS, so distant
+# workers' helmets and boots are not lost in the downscale.
+# Takes precedence over CASCADE_INFERENCE when both are enabled.
+TILED_INFERENCE          = False
+TILE_SIZE                = 640     # tile edge in source pixels
+TILE_OVERLAP             = 0.2     # fraction of overlap between tiles
+TILE_INCLUDE_FULL_FRAME  = True    # also run the whole frame (large subjects)
+
+# Small on-screen panel with the current cadence trade-off
+SHOW_PERF_HUD = False
+
+# ── Motion Gate ─────────────────────────────────────────────
+# Skip YOLO + QR decoding while the scene is static (empty gate).
+# A tiny grayscale copy of each frame is compared to a running background.
+MOTION_GATE_ENABLED      = True
+MOTION_DOWNSCALE_WIDTH   = 160     # px width used for frame differencing
+MOTION_PIXEL_THRESHOLD   = 25      # gray-level change that counts as motion
+MOTION_MIN_AREA_RATIO    = 0.005   # fraction of changed pixels to open the gate
+MOTION_HOLD_SECONDS      = 2.0     # keep inferring this long after last motion
+MOTION_MAX_IDLE_SECONDS  = 5.0     # force one inference this often while idle
+
+# ── Per-track PPE Voting (multi-person mode) ───────────────
+# Smooth each tracked worker's PPE result over their last N inferences so
+# a single missed detection does not flip READY / NOT READY.
+PPE_VOTE_WINDOW        = 10           # observations kept per track
+PPE_VOTE_MODE          = "majority"   # "majority" or "ema"
+PPE_VOTE_EMA_ALPHA     = 0.3          # EMA weight of the newest observation
+PPE_HISTORY_MAX_TRACKS = 64           # hard cap on tracks held in memory
+
+# ── QR → Person Association ─────────────────────────────────
+# QR badges are matched to tracked persons by optimal assignment.
+QR_MATCH_MIN_IOU        = 0.05   # overlap that counts as "badge on this person"
+QR_MATCH_MAX_DIST_RATIO = 1.0    # fallback gate: max center distance in person-box diagonals
+
+# ── Background QR Decoding ──────────────────────────────────
+# Decode QR codes on a worker thread, searching only the chest area of
+# detected persons and the last known QR boxes (plus a periodic
+# downscaled full-frame search).
+QR_ASYNC_WORKER           = True
+QR_RESULT_MAX_AGE_SECONDS = 0.5    # ignore decode results older than this
+QR_ROI_TARGET_PX          = 400    # ROIs are rescaled to ~this longest side
+QR_FULL_FRAME_EVERY_N     = 5      # full-frame search every N submitted frames
+
+# ── Identity Cache ──────────────────────────────────────────
+# A track bound to an employee is not searched for QR codes again until
+# the track is lost or its confidence (halving every half-life) drops
+# below the minimum. Unknown QR payloads are ignored for a TTL.
+IDENTITY_HALF_LIFE_SECONDS = 20.0
+IDENTITY_MIN_CONFIDENCE    = 0.5
+UNKNOWN_QR_TTL_SECONDS     = 30.0
+
+# ── Headless Mode ───────────────────────────────────────────
+# Server deployments without a display: no overlay rendering and no
+# preview window, just capture → detect → associate → report.
+# Can also be enabled with `python main_ai.py --headless`.
+HEADLESS = False
+STAGE_TIMING_REPORT_SECONDS = 30   # print per-stage timings this often (0 = only at exit)
+
+# ── Profiling ───────────────────────────────────────────────
+# Rolling p50 / p95 / p99 latency histograms for every loop stage
+# (capture, motion, qr, detect, compliance, associate, report, excel,
+# http, state, render, display). Shown in the periodic timing log, on the
+# debug panel and at http://127.0.0.1:<port>/metrics. When off, the
+# loop pays a single `is None` check per frame.
+PROFILING_ENABLED        = False
+PROFILING_WINDOW_SECONDS = 60      # histogram window
+PROFILING_METRICS_PORT   = 9108    # local /metrics endpoint, also camera health (None = off)
+SHOW_PROFILER_PANEL      = False   # on-screen p50/p95/p99 panel
+
+# ── Display Thread ──────────────────────────────────────────
+# Capture, overlay compositing and the preview window run on their own
+# thread at the camera's native rate; detection keeps its own cadence on
+# the newest frame. Person boxes are moved forward between inferences
+# using per-track velocities. Ignored in headless mode and on macOS
+# (OpenCV windows must stay on the main thread there).
+DISPLAY_THREAD                  = True
+DISPLAY_EXTRAPOLATE_MAX_SECONDS = 0.5   # never move boxes further ahead than this
+
+# ── Multi-process Pipeline ──────────────────────────────────
+# Capture, YOLO detection and the check loop (QR, state machine,
+# overlay) in three processes, so each gets its own core instead of
+# sharing the GIL. Frames go through a shared-memory ring; only
+# detection results cross process boundaries. Also `--multiprocess`.
+MULTIPROCESS_PIPELINE = False
+FRAME_RING_SLOTS      = 4        # shared frame buffers (at least readers + 2 = 4)
+
+# ── Overlay Fonts ───────────────────────────────────────────
+# The overlay uses the first of these families found in ai/fonts/
+# (bundled), UI_FONT_DIRS, then the OS font folders. Check the result
+# with `python font_resolver.py`.
+UI_FONT_FAMILIES = ["Segoe UI", "Noto Sans", "Ubuntu", "DejaVu Sans", "Liberation Sans", "Arial"]
+UI_FONT_DIRS     = []              # extra folders searched before the OS ones
+
 # Turn off extra detector box drawing (saves CPU/GPU and avoids clutter)
 DRAW_DETECTOR_BOXES = False
 
@@ -70,6 +215,21 @@ VERBOSE_LOGS = False
 EMPLOYEES_FILE = "../employee_data/employees.json"
 REPORT_PATH    = "../reports/employee_safety.xlsx"
 
+# Saving the workbook rewrites the whole file, so row updates are batched
+# and written at most this often (and on exit). 0 = save on every update.
+EXCEL_SAVE_INTERVAL_SECONDS = 5.0
+
+# Every check sent by Reporter is also appended here (one JSON object per
+# line) so shift_report.py can rebuild a full report without the backend.
+# Set to None to disable the local log.
+CHECK_LOG_PATH = "../reports/check_log.jsonl"
+
+# Ranked camera list written by find_cameras.py (used when CAMERA_MODE = "auto")
+CAMERA_DISCOVERY_FILE = "cameras.json"
+
+# Backend SQLite database (read by shift_report.py --source db)
+BACKEND_DB_PATH = "../backend/instance/industriguard.db"
+
 # ── System Settings ──────────────────────────────────────
 # Seconds to display result before resetting for next worker
 RESULT_DISPLAY_SECONDS = 5
@@ -1,8 +1,33 @@
 """
 Run this script to diagnose camera connection issues.
 Usage: python diagnose_camera.py
+
+Benchmark mode reads N frames from the configured source (or --source)
+with several capture setups and compares them:
+
+    python diagnose_camera.py --benchmark
+    python diagnose_camera.py --benchmark --source 1 --frames 600
+    python diagnose_camera.py --benchmark --source http://192.168.0.101:8080/video --work-ms 40
+
+Local cameras: CameraFeed's setup, then one setting changed at a time
+(CAP_PROP_BUFFERSIZE, FOURCC, resolution). Streams: OpenCV with and
+without BUFFERSIZE=1, plus the ffmpeg / GStreamer readers (stream_reader.py)
+when installed. Each run reports sustained FPS, read latency p50/p95/p99,
+decode time (OpenCV retrieve()), and dropped / duplicate frames. Frames
+from fake_ip_camera.py carry a frame number, so these counts are exact
+and it also shows how many frames behind live the reader ended up; for
+other sources the counts are estimated from frame intervals and content.
+--work-ms simulates inference time between reads, which is where
+buffering readers fall behind.
 """
+import argparse
+import json
+import shutil
+import time
+import zlib
+
 import cv2
+import numpy as np
 import urllib.request
 import socket
 from config import (
@@ -11,7 +36,12 @@ from config import (
     USB_TETHER_IP,
     USB_TETHER_PORT,
     WIFI_CAMERA_URL,
+    VIDEO_FILE_PATH,
+    CAMERA_DISCOVERY_FILE,
+    FFMPEG_BINARY,
+    GST_LAUNCH_BINARY,
 )
+from camera_feed import local_capture_api
 
 
 def check_network():
@@ -39,7 +69,7 @@ def check_opencv_connection(source):
     print(f"   Connecting to: {source}")
 
     if isinstance(source, int):
-        cap = cv2.VideoCapture(source, cv2.CAP_DSHOW)
+        cap = cv2.VideoCapture(source, local_capture_api())
     else:
         cap = cv2.VideoCapture(source)
 
@@ -60,6 +90,272 @@ def check_opencv_connection(source):
     return True
 
 
+# ── Benchmark mode ──────────────────────────────────────────────
+class _OpenCVReader:
+    """VideoCapture with explicit settings; read() splits grab and decode time."""
+
+    def __init__(self, source, buffersize=None, fourcc=None, size=None):
+        if isinstance(source, int):
+            self.cap = cv2.VideoCapture(source, local_capture_api())
+        else:
+            self.cap = cv2.VideoCapture(source)
+        if buffersize is not None:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffersize)
+        if fourcc is not None:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if size is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+            self.cap.set(cv2.CAP_PROP_FPS, 30)
+
+    def opened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        """(frame or None, decode seconds or None)"""
+        if not self.cap.grab():
+            return None, None
+        t = time.perf_counter()
+        ok, frame = self.cap.retrieve()
+        return (frame if ok else None), time.perf_counter() - t
+
+    def close(self):
+        self.cap.release()
+
+
+class _SubprocessReader:
+    """stream_reader.SubprocessStreamReader; decoding happens in the subprocess."""
+
+    def __init__(self, url, backend, lowres=0):
+        from stream_reader import SubprocessStreamReader
+
+        self.reader = SubprocessStreamReader(url, backend=backend, lowres=lowres)
+        self._opened = self.reader.open(timeout=10.0)
+
+    def opened(self):
+        return self._opened
+
+    def read(self):
+        return self.reader.get_frame(timeout=2.0), None
+
+    def close(self):
+        self.reader.close()
+
+
+def benchmark_setups(source):
+    """[(name, factory)] of the capture setups worth comparing for `source`."""
+    if isinstance(source, int):
+        base = {"buffersize": 1, "fourcc": "MJPG", "size": (640, 480)}   # CameraFeed's setup
+        variants = [
+            ("opencv (CameraFeed)",    {}),
+            ("  default buffersize",   {"buffersize": None}),
+            ("  buffersize 4",         {"buffersize": 4}),
+            ("  FOURCC YUYV",          {"fourcc": "YUYV"}),
+            ("  1280x720",             {"size": (1280, 720)}),
+            ("  1920x1080",            {"size": (1920, 1080)}),
+        ]
+        return [(name, lambda o=dict(base, **override): _OpenCVReader(source, **o))
+                for name, override in variants]
+
+    is_stream = isinstance(source, str) and source.startswith(("http", "rtsp"))
+    if not is_stream:
+        return [("opencv", lambda: _OpenCVReader(source))]
+
+    setups = [
+        ("opencv (CameraFeed)",  lambda: _OpenCVReader(source, buffersize=1)),
+        ("  default buffersize", lambda: _OpenCVReader(source)),
+    ]
+    if shutil.which(FFMPEG_BINARY):
+        setups.append(("ffmpeg reader", lambda: _SubprocessReader(source, "ffmpeg")))
+        if source.startswith("http"):
+            setups.append(("  MJPEG lowres 1/2", lambda: _SubprocessReader(source, "ffmpeg", lowres=1)))
+    else:
+        print(f"   (ffmpeg reader skipped: {FFMPEG_BINARY} not found)")
+    if shutil.which(GST_LAUNCH_BINARY):
+        setups.append(("gstreamer reader", lambda: _SubprocessReader(source, "gstreamer")))
+    else:
+        print(f"   (gstreamer reader skipped: {GST_LAUNCH_BINARY} not found)")
+    return setups
+
+
+def _frame_numbers(frames_ids):
+    """Stamped frame numbers if every frame carries a plausible fake_ip_camera stamp."""
+    stamps = [s for s, _ in frames_ids]
+    if not stamps or any(s is None for s in stamps):
+        return None
+    if any(b < a for a, b in zip(stamps, stamps[1:])):
+        return None
+    if stamps[-1] - stamps[0] > 20 * len(stamps):
+        return None
+    # Same number but different content: the "stamp" is just dark / bright pixels
+    if any(a[0] == b[0] and a[1] != b[1] for a, b in zip(frames_ids, frames_ids[1:])):
+        return None
+    return stamps
+
+
+def _count_drops_dups(frame_ids, arrivals):
+    """(dropped, duplicates, exact?) from stamps, else from hashes + frame intervals."""
+    stamps = _frame_numbers(frame_ids)
+    if stamps is not None:
+        dups = sum(1 for a, b in zip(stamps, stamps[1:]) if b == a)
+        dropped = sum(b - a - 1 for a, b in zip(stamps, stamps[1:]) if b > a + 1)
+        return dropped, dups, True
+
+    hashes = [h for _, h in frame_ids]
+    dup_flags = [b == a for a, b in zip(hashes, hashes[1:])]
+    dups = sum(dup_flags)
+    # Intervals between distinct frames; a gap of k typical intervals ≈ k - 1 lost frames
+    distinct_t = [t for t, dup in zip(arrivals[1:], dup_flags) if not dup]
+    gaps = np.diff(distinct_t) if len(distinct_t) > 2 else np.array([])
+    dropped = 0
+    if gaps.size:
+        typical = float(np.median(gaps))
+        if typical > 0:
+            dropped = int(sum(max(0, round(g / typical) - 1) for g in gaps))
+    return dropped, dups, False
+
+
+def _live_stamp(url):
+    """Frame number the fake_ip_camera server is at right now (its /shot.jpg), or None."""
+    from fake_ip_camera import read_stamp
+
+    if not url.startswith("http"):
+        return None
+    try:
+        data = urllib.request.urlopen("/".join(url.split("/")[:3]) + "/shot.jpg", timeout=2).read()
+    except Exception:
+        return None
+    frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    return read_stamp(frame) if frame is not None else None
+
+
+def _run_setup(name, factory, frames, work_ms, source, warmup=10):
+    from fake_ip_camera import read_stamp
+
+    row = {"setup": name.strip()}
+    reader = factory()
+    try:
+        if not reader.opened():
+            row["error"] = "cannot open"
+            return row
+        for _ in range(warmup):
+            reader.read()
+
+        read_s, decode_s, frame_ids, arrivals = [], [], [], []
+        size = None
+        failed = 0
+        t_start = time.perf_counter()
+        for _ in range(frames):
+            t = time.perf_counter()
+            frame, dec = reader.read()
+            now = time.perf_counter()
+            read_s.append(now - t)
+            if frame is None:
+                failed += 1
+                continue
+            arrivals.append(now)
+            if dec is not None:
+                decode_s.append(dec)
+            size = frame.shape[1], frame.shape[0]
+            frame_ids.append((read_stamp(frame), zlib.crc32(frame[::8, ::8].tobytes())))
+            if work_ms:
+                time.sleep(work_ms / 1000.0)
+        elapsed = time.perf_counter() - t_start
+        live = _live_stamp(source) if isinstance(source, str) else None
+    finally:
+        reader.close()
+
+    if not frame_ids:
+        row["error"] = "no frames"
+        return row
+    dropped, dups, exact = _count_drops_dups(frame_ids, arrivals)
+    stamps = _frame_numbers(frame_ids)
+    behind = live - stamps[-1] if live is not None and stamps is not None else None
+    ms = np.asarray(read_s) * 1000.0
+    row.update({
+        "size": f"{size[0]}x{size[1]}",
+        "fps": round((len(frame_ids) - dups) / elapsed, 1),
+        "read_ms_p50": round(float(np.percentile(ms, 50)), 2),
+        "read_ms_p95": round(float(np.percentile(ms, 95)), 2),
+        "read_ms_p99": round(float(np.percentile(ms, 99)), 2),
+        "decode_ms_p50": round(float(np.median(decode_s)) * 1000.0, 2) if decode_s else None,
+        "dropped": dropped,
+        "duplicates": dups,
+        "failed_reads": failed,
+        "counts_exact": exact,
+        "frames_behind": behind,
+    })
+    return row
+
+
+def configured_source():
+    """The source CameraFeed would open for CAMERA_MODE."""
+    mode = CAMERA_MODE.lower().strip()
+    if mode == "usb_mobile":
+        return USB_CAMERA_INDEX
+    if mode == "usb_tether":
+        return f"http://{USB_TETHER_IP}:{USB_TETHER_PORT}/video"
+    if mode == "wifi":
+        return WIFI_CAMERA_URL
+    if mode == "video":
+        return VIDEO_FILE_PATH
+    if mode == "auto":
+        from find_cameras import load_best_camera
+
+        best = load_best_camera(CAMERA_DISCOVERY_FILE)
+        return best["source"] if best else USB_CAMERA_INDEX
+    return 0
+
+
+def run_benchmark(source=None, frames=300, work_ms=0.0, json_path=None):
+    source = configured_source() if source is None else source
+    print("\n" + "=" * 55)
+    print("  IndustriGuard Camera Benchmark")
+    print("=" * 55)
+    print(f"\n   Source : {source}")
+    print(f"   Frames : {frames} per setup" + (f", {work_ms:g} ms simulated work per frame" if work_ms else ""))
+    print()
+
+    rows = []
+    for name, factory in benchmark_setups(source):
+        print(f"   running {name.strip()}...", end="\r", flush=True)
+        rows.append(_run_setup(name, factory, frames, work_ms, source))
+        rows[-1]["label"] = name
+    print(" " * 50, end="\r")
+
+    print(f"\n   {'setup':<22} {'size':>9} {'fps':>6} {'read p50':>9} {'p95':>7} {'p99':>7} "
+          f"{'decode':>7} {'drop':>5} {'dup':>5} {'behind':>7}")
+    for r in rows:
+        if "error" in r:
+            print(f"   {r['label']:<22} {r['error']}")
+            continue
+        decode = f"{r['decode_ms_p50']:.1f}" if r["decode_ms_p50"] is not None else "--"
+        approx = "" if r["counts_exact"] else "~"
+        behind = str(r["frames_behind"]) if r["frames_behind"] is not None else "--"
+        print(f"   {r['label']:<22} {r['size']:>9} {r['fps']:6.1f} {r['read_ms_p50']:8.1f}ms "
+              f"{r['read_ms_p95']:6.1f} {r['read_ms_p99']:6.1f} {decode:>7} "
+              f"{approx + str(r['dropped']):>5} {approx + str(r['duplicates']):>5} {behind:>7}")
+
+    working = [r for r in rows if "error" not in r]
+    if working:
+        # Highest FPS; among equals, the one closest to live, then the steadiest reads
+        best = max(working, key=lambda r: (round(r["fps"]), -(r["frames_behind"] or 0),
+                                           -r["read_ms_p95"]))
+        print(f"\n   Fastest: {best['setup']} ({best['fps']:.1f} fps, read p95 {best['read_ms_p95']:.1f} ms)")
+        if not all(r["counts_exact"] for r in working):
+            print("   ~ dropped / duplicate counts estimated (source has no frame stamps)")
+        print("   drop   : source frames never returned (newest-frame readers skip them on purpose)")
+        print("   behind : frames the last one returned was behind live (fake_ip_camera.py only)")
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"source": source, "frames": frames, "work_ms": work_ms,
+                       "results": [{k: v for k, v in r.items() if k != "label"} for r in rows]},
+                      f, indent=2)
+        print(f"   Results written to {json_path}")
+    print("\n" + "=" * 55 + "\n")
+    return rows
+
+
 def run_diagnostics():
     print("\n" + "=" * 55)
     print("  IndustriGuard Camera Diagnostics")
@@ -103,7 +399,6 @@ def run_diagnostics():
         check_opencv_connection(0)
 
     elif CAMERA_MODE == "video":
-        from config import VIDEO_FILE_PATH
         print(f"   Video file: {VIDEO_FILE_PATH}")
         check_opencv_connection(VIDEO_FILE_PATH)
 
@@ -111,4 +406,18 @@ def run_diagnostics():
 
 
 if __name__ == "__main__":
-    run_diagnostics()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Diagnose or benchmark the camera connection.")
+    parser.add_argument("--benchmark", action="store_true", help="compare capture setups over N frames")
+    parser.add_argument("--source", default=None,
+                        help="camera index, stream URL or video file (default: config CAMERA_MODE)")
+    parser.add_argument("--frames", type=int, default=300, help="frames read per setup")
+    parser.add_argument("--work-ms", type=float, default=0.0,
+                        help="simulated processing time per frame (e.g. inference)")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        src = int(args.source) if args.source is not None and args.source.isdigit() else args.source
+        run_benchmark(src, frames=args.frames, work_ms=args.work_ms, json_path=args.json)
+    else:
+        run_diagnostics()
\ No newline at end of file
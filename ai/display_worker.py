@@ -0,0 +1,133 @@
+"""
+display_worker.py  —  Preview window decoupled from inference
+
+A worker thread reads the camera at its native rate, hands the newest
+frame to the pipeline, and immediately shows that frame with the most
+recent overlay state the pipeline published.  The pipeline takes only the
+newest frame when it is ready for one; frames it is too busy for are
+still displayed, never queued.  Display FPS therefore follows the camera,
+while detection runs at whatever cadence it can sustain.
+
+Overlay state is a plain snapshot (see Pipeline._overlay_state), so the
+display thread never reads the pipeline's mutable state.  While the
+camera is offline (camera.online is False) its placeholder frames are
+shown through `render_offline` and not handed to the pipeline.
+"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class DisplayWorker:
+    def __init__(self, camera, render, window_name, clock=time.time, max_fps=None,
+                 render_offline=None):
+        """
+        camera      : CameraFeed-like (get_frame); only read from this thread
+        render      : render(frame, overlay_state, now) -> frame to show
+        window_name : OpenCV window title
+        clock       : the pipeline's clock (timestamps in overlay state)
+        max_fps     : pacing cap for sources that do not block (video files)
+        render_offline : render_offline(frame) -> frame, for camera-offline frames
+        """
+        self.camera = camera
+        self.render = render
+        self.window_name = window_name
+        self.clock = clock
+        self.render_offline = render_offline
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+
+        self._cond = threading.Condition()
+        self._frame = None         # newest captured frame, not yet taken
+        self._overlay = None       # latest overlay state from the pipeline
+        self._running = True
+        self._canvas = None        # reused display buffer (the raw frame stays untouched)
+        self.camera_ended = False
+        self.quit_requested = False
+        self.frames_shown = 0
+        self.frames_skipped = 0    # captured but superseded before the pipeline took them
+        self.display_fps = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="display", daemon=True)
+        self._thread.start()
+
+    # ── Pipeline side ─────────────────────────────────────────────────
+    @property
+    def finished(self):
+        return self.camera_ended or self.quit_requested
+
+    def next_frame(self, timeout=0.5):
+        """Newest frame not yet handed out, or None on timeout / when finished."""
+        with self._cond:
+            if self._frame is None and not self.finished:
+                self._cond.wait(timeout)
+            frame, self._frame = self._frame, None
+            return frame
+
+    def publish(self, overlay):
+        """Makes `overlay` the state drawn on every following frame."""
+        self._overlay = overlay
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=2.0)
+        print(f"[Display] {self.frames_shown} frames shown at {self.display_fps:.1f} FPS "
+              f"({self.frames_skipped} not processed by the pipeline)")
+
+    # ── Display thread ────────────────────────────────────────────────
+    def _run(self):
+        t_prev = None
+        while self._running:
+            frame = self.camera.get_frame()
+            if frame is None:
+                with self._cond:
+                    self.camera_ended = True
+                    self._cond.notify_all()
+                return
+
+            online = getattr(self.camera, "online", True)
+            if online:
+                with self._cond:
+                    if self._frame is not None:
+                        self.frames_skipped += 1
+                    self._frame = frame
+                    self._cond.notify_all()
+
+            canvas = self._canvas
+            if canvas is None or canvas.shape != frame.shape:
+                canvas = self._canvas = np.empty_like(frame)
+            np.copyto(canvas, frame)
+
+            try:
+                if not online:
+                    if self.render_offline is not None:
+                        canvas = self.render_offline(canvas)
+                elif self._overlay is not None:
+                    canvas = self.render(canvas, self._overlay, self.clock())
+            except Exception as e:
+                # A bad overlay frame must not take the preview down
+                print(f"[Display] Overlay error: {e}")
+
+            cv2.imshow(self.window_name, canvas)
+            key = cv2.waitKey(1) & 0xFF
+            self.frames_shown += 1
+            if key == ord('q'):
+                with self._cond:
+                    self.quit_requested = True
+                    self._cond.notify_all()
+                return
+
+            now = time.perf_counter()
+            if t_prev is not None:
+                dt = now - t_prev
+                if dt < self.min_interval:
+                    time.sleep(self.min_interval - dt)
+                    now = time.perf_counter()
+                    dt = now - t_prev
+                fps = 1.0 / dt if dt > 0 else 0.0
+                self.display_fps = fps if self.display_fps == 0.0 else 0.9 * self.display_fps + 0.1 * fps
+            t_prev = now
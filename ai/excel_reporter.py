@@ -4,13 +4,42 @@ from openpyxl.styles import (
 )
 from datetime import datetime
 import os
-from config import VERBOSE_LOGS
+import time
+from config import VERBOSE_LOGS, EXCEL_SAVE_INTERVAL_SECONDS
+
+# ── Shared cell styles ─────────────────────────────────────────────
+# openpyxl style objects are immutable, so one instance can be shared by
+# every cell instead of being rebuilt per cell on each update.
+_THIN_BORDER = Border(
+    left=Side(style="thin"),
+    right=Side(style="thin"),
+    top=Side(style="thin"),
+    bottom=Side(style="thin")
+)
+_CENTER          = Alignment(horizontal="center", vertical="center")
+_READY_FILL      = PatternFill(fill_type="solid", fgColor="D5F5E3")
+_NOT_READY_FILL  = PatternFill(fill_type="solid", fgColor="FADBD8")
+_BODY_FONT       = Font(name="Calibri", size=11)
+_STATUS_OK_FONT  = Font(name="Calibri", size=11, bold=True, color="1E8449")
+_STATUS_BAD_FONT = Font(name="Calibri", size=11, bold=True, color="C0392B")
+_MARK_OK_FONT    = Font(name="Calibri", size=13, bold=True, color="1E8449")
+_MARK_BAD_FONT   = Font(name="Calibri", size=13, bold=True, color="C0392B")
+
+# First data row (row 1 = title, row 2 = date, row 3 = headers)
+_FIRST_DATA_ROW = 4
 
 class ExcelReporter:
-    def __init__(self, report_path="reports/employee_safety.xlsx"):
+    def __init__(self, report_path="reports/employee_safety.xlsx",
+                 save_interval=EXCEL_SAVE_INTERVAL_SECONDS):
         self.report_path = report_path
         os.makedirs("reports", exist_ok=True)
 
+        # wb.save() rewrites the whole file (O(rows)), so updates only mark
+        # the workbook dirty and it is written at most every save_interval
+        self.save_interval = save_interval
+        self._dirty        = False
+        self._last_save    = 0.0
+
         # Load existing or create new
         if os.path.exists(report_path):
             self.wb = openpyxl.load_workbook(report_path)
@@ -22,6 +51,11 @@ class ExcelReporter:
             if VERBOSE_LOGS:
                 print(f"[ExcelReporter] Created new report → {report_path}")
 
+        # employee_id -> row number, built once and kept in sync on insert
+        self._row_index = {}
+        self._next_row  = _FIRST_DATA_ROW
+        self._build_row_index()
+
     def _create_new_report(self):
         """Creates a fresh Excel file with headers"""
         self.wb = openpyxl.Workbook()
@@ -69,33 +103,37 @@ class ExcelReporter:
         ]
         header_fill = PatternFill(fill_type="solid", fgColor="1A5276")
         header_font = Font(name="Calibri", size=11, bold=True, color="FFFFFF")
-        border      = Border(
-            left=Side(style="thin"),
-            right=Side(style="thin"),
-            top=Side(style="thin"),
-            bottom=Side(style="thin")
-        )
 
         for col_num, header in enumerate(headers, 1):
             cell            = self.ws.cell(row=3, column=col_num, value=header)
             cell.font       = header_font
             cell.fill       = header_fill
-            cell.alignment  = Alignment(horizontal="center", vertical="center")
-            cell.border     = border
+            cell.alignment  = _CENTER
+            cell.border     = _THIN_BORDER
 
         self.ws.row_dimensions[3].height = 25
         self._save()
 
+    def _build_row_index(self):
+        """Scans the Employee ID column once and maps each ID to its row"""
+        self._row_index.clear()
+        last_row = _FIRST_DATA_ROW - 1
+        for row_num, (emp_id,) in enumerate(
+            self.ws.iter_rows(min_row=_FIRST_DATA_ROW, max_col=1, values_only=True),
+            _FIRST_DATA_ROW
+        ):
+            if emp_id is not None:
+                self._row_index.setdefault(emp_id, row_num)
+                last_row = row_num
+        self._next_row = max(last_row, self.ws.max_row) + 1
+
     def _find_employee_row(self, employee_id):
-        """Searches for existing row with this employee ID"""
-        for row in self.ws.iter_rows(min_row=4):
-            if row[0].value == employee_id:
-                return row[0].row
-        return None
+        """Returns the existing row for this employee ID (O(1) lookup)"""
+        return self._row_index.get(employee_id)
 
     def _get_next_empty_row(self):
         """Returns the next empty row after all data"""
-        return self.ws.max_row + 1
+        return self._next_row
 
     def update_employee(self, employee, status_data):
         """
@@ -116,6 +154,8 @@ class ExcelReporter:
         row_num = self._find_employee_row(emp_id)
         if not row_num:
             row_num = self._get_next_empty_row()
+            self._row_index[emp_id] = row_num
+            self._next_row = row_num + 1
             if VERBOSE_LOGS:
                 print(f"[ExcelReporter] Adding new row for {emp_id}")
         else:
@@ -130,54 +170,42 @@ class ExcelReporter:
         ]
 
         # ── Row styling ───────────────────────────────────────────
-        ready_fill     = PatternFill(fill_type="solid", fgColor="D5F5E3")
-        not_ready_fill = PatternFill(fill_type="solid", fgColor="FADBD8")
-        row_fill       = ready_fill if status == "READY" else not_ready_fill
-
-        border = Border(
-            left=Side(style="thin"),
-            right=Side(style="thin"),
-            top=Side(style="thin"),
-            bottom=Side(style="thin")
-        )
+        row_fill    = _READY_FILL if status == "READY" else _NOT_READY_FILL
+        status_font = _STATUS_OK_FONT if status == "READY" else _STATUS_BAD_FONT
 
         for col_num, value in enumerate(row_data, 1):
             cell            = self.ws.cell(row=row_num, column=col_num, value=value)
             cell.fill       = row_fill
-            cell.border     = border
-            cell.alignment  = Alignment(horizontal="center", vertical="center")
-            cell.font       = Font(name="Calibri", size=11)
+            cell.border     = _THIN_BORDER
+            cell.alignment  = _CENTER
 
             # Special color for status cell
             if col_num == 6:
-                if status == "READY":
-                    cell.font = Font(
-                        name="Calibri", size=11,
-                        bold=True, color="1E8449"
-                    )
-                else:
-                    cell.font = Font(
-                        name="Calibri", size=11,
-                        bold=True, color="C0392B"
-                    )
-
-            # Red color for missing PPE cells
-            if col_num in [4, 5] and value == "✗":
-                cell.font = Font(
-                    name="Calibri", size=13,
-                    bold=True, color="C0392B"
-                )
-            elif col_num in [4, 5] and value == "✓":
-                cell.font = Font(
-                    name="Calibri", size=13,
-                    bold=True, color="1E8449"
-                )
+                cell.font = status_font
+            # Red / green marks for PPE cells
+            elif col_num in [4, 5]:
+                cell.font = _MARK_BAD_FONT if value == "✗" else _MARK_OK_FONT
+            else:
+                cell.font = _BODY_FONT
 
         self.ws.row_dimensions[row_num].height = 22
-        self._save()
+        self._dirty = True
+        self.flush_if_due()
 
         if VERBOSE_LOGS:
-            print(f"[ExcelReporter] Saved → {emp_id} | {status}")
+            print(f"[ExcelReporter] Updated → {emp_id} | {status}")
+
+    def flush_if_due(self):
+        """Saves pending updates once save_interval has passed since the last save"""
+        if self._dirty and time.monotonic() - self._last_save >= self.save_interval:
+            self._save()
+
+    def flush(self):
+        """Saves pending updates now (call on shutdown)"""
+        if self._dirty:
+            self._save()
 
     def _save(self):
-        self.wb.save(self.report_path)
\ No newline at end of file
+        self.wb.save(self.report_path)
+        self._dirty     = False
+        self._last_save = time.monotonic()
@@ -0,0 +1,218 @@
+"""
+IndustriGuard AI — Fake IP Webcam Server
+========================================
+Serves an MJPEG stream the way the IP Webcam phone app does
+(GET /video → multipart/x-mixed-replace, GET /shot.jpg → one JPEG), so
+the wifi / usb_tether camera modes and the stream readers can be tried
+without a phone.
+
+Frames are a moving test pattern (or a looped video file).  Each one
+carries its frame number as 32 black/white blocks along the top edge;
+read_stamp(frame) recovers it on the receiving side, which makes
+dropped, repeated and late frames measurable.
+
+--drop-every / --down simulate a flaky network: every N seconds all
+streams are cut and new connections are refused for a while.
+
+Usage:
+  python fake_ip_camera.py
+  python fake_ip_camera.py --size 1280x720 --fps 30 --drop-every 20 --down 3
+  python fake_ip_camera.py --video test_video.mp4
+then set WIFI_CAMERA_URL = "http://127.0.0.1:8080/video" in config.py.
+"""
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+BOUNDARY = "industriguardframe"
+STAMP_BITS = 32
+
+
+def _stamp_cells(width):
+    """(x1, x2) of each bit's block; the stamp spans the full width, so it
+    survives JPEG and any scaling a reader applies while decoding."""
+    edges = np.linspace(0, width, STAMP_BITS + 1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def stamp(frame, number):
+    """Writes `number` into the top edge as STAMP_BITS black/white blocks."""
+    cells = _stamp_cells(frame.shape[1])
+    block = cells[0][1] - cells[0][0]
+    for bit, (x1, x2) in enumerate(cells):
+        frame[0:block, x1:x2] = 255 if (number >> bit) & 1 else 0
+
+
+def read_stamp(frame):
+    """Frame number written by stamp(), or None if the frame is too small."""
+    cells = _stamp_cells(frame.shape[1])
+    block = cells[0][1] - cells[0][0]
+    if block < 4 or frame.shape[0] < block:
+        return None
+    m = block // 4
+    number = 0
+    for bit, (x1, x2) in enumerate(cells):
+        if frame[m:block - m, x1 + m:x2 - m].mean() > 127:
+            number |= 1 << bit
+    return number
+
+
+class FrameSource:
+    """Produces stamped JPEGs at a fixed rate on its own thread."""
+
+    def __init__(self, size, fps, quality, video=None):
+        self.width, self.height = size
+        self.fps = fps
+        self.quality = quality
+        self.cap = cv2.VideoCapture(video) if video else None
+        self._cond = threading.Condition()
+        self.jpeg = None
+        self.number = -1
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _pattern(self, n):
+        x = np.arange(self.width, dtype=np.int32)
+        frame = np.empty((self.height, self.width, 3), np.uint8)
+        frame[:, :, 0] = (x + 4 * (n % 64)) % 256          # scrolls one period every 64 frames
+        frame[:, :, 1] = (np.arange(self.height, dtype=np.int32) * 255 // self.height)[:, None]
+        frame[:, :, 2] = 96
+        cx = int((0.5 + 0.4 * np.sin(n / 30.0)) * self.width)
+        cv2.circle(frame, (cx, self.height // 2), self.height // 8, (255, 255, 255), -1)
+        return frame
+
+    def _next_frame(self, n):
+        if self.cap is None:
+            return self._pattern(n)
+        ok, frame = self.cap.read()
+        if not ok:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+            if not ok:
+                return self._pattern(n)
+        return cv2.resize(frame, (self.width, self.height))
+
+    def _run(self):
+        period = 1.0 / self.fps
+        next_t = time.perf_counter()
+        n = 0
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        while True:
+            frame = self._next_frame(n)
+            stamp(frame, n)
+            cv2.putText(frame, f"#{n}  {time.strftime('%H:%M:%S')}", (12, self.height - 16),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            ok, jpeg = cv2.imencode(".jpg", frame, params)
+            with self._cond:
+                self.jpeg, self.number = jpeg.tobytes(), n
+                self._cond.notify_all()
+            n += 1
+            next_t += period
+            delay = next_t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_t = time.perf_counter()       # fell behind: do not burst
+
+    def wait_next(self, after, timeout=2.0):
+        with self._cond:
+            self._cond.wait_for(lambda: self.number > after, timeout)
+            return self.number, self.jpeg
+
+
+class Outage:
+    """Every `every` seconds, the network is 'down' for `down` seconds."""
+
+    def __init__(self, every, down):
+        self.every = every
+        self.down = down
+        self.t0 = time.monotonic()
+
+    def active(self):
+        if not self.every:
+            return False
+        return (time.monotonic() - self.t0) % (self.every + self.down) >= self.every
+
+
+def make_handler(source, outage):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.0"
+
+        def do_GET(self):
+            if outage.active():
+                self.close_connection = True       # refuse like an unreachable phone
+                return
+            path = self.path.split("?")[0]
+            if path == "/video":
+                self._stream()
+            elif path == "/shot.jpg":
+                _, jpeg = source.wait_next(-1)
+                self._send_headers("image/jpeg", len(jpeg))
+                self.wfile.write(jpeg)
+            else:
+                self.send_error(404)
+
+        def _send_headers(self, content_type, length=None):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Cache-Control", "no-cache")
+            if length is not None:
+                self.send_header("Content-Length", str(length))
+            self.end_headers()
+
+        def _stream(self):
+            self._send_headers(f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+            last = -1
+            try:
+                while not outage.active():
+                    last, jpeg = source.wait_next(last)
+                    self.wfile.write(
+                        f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(jpeg)}\r\n\r\n".encode("ascii")
+                        + jpeg + b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, fmt, *args):
+            print(f"[FakeCam] {self.address_string()} {fmt % args}")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a test MJPEG stream like the IP Webcam app.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--size", default="640x480", help="WIDTHxHEIGHT")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--quality", type=int, default=80, help="JPEG quality")
+    parser.add_argument("--video", default=None, help="Loop this video file instead of the test pattern")
+    parser.add_argument("--drop-every", type=float, default=0.0,
+                        help="Cut all streams every N seconds (0 = never)")
+    parser.add_argument("--down", type=float, default=3.0, help="Seconds each outage lasts")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    source = FrameSource((width, height), args.fps, args.quality, args.video)
+    outage = Outage(args.drop_every, args.down)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(source, outage))
+    server.daemon_threads = True
+
+    print(f"[FakeCam] MJPEG {width}x{height} @ {args.fps:g} fps on http://{args.host}:{args.port}/video")
+    if args.drop_every:
+        print(f"[FakeCam] Outage of {args.down:g}s every {args.drop_every:g}s")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,42 +5,240 @@ Run this script to find the correct device index for your
 USB-connected mobile camera (DroidCam, Iriun, Camo, etc.)
 
 Usage:  python find_cameras.py
+        python find_cameras.py --url http://192.168.0.101:8080/video --no-preview
+        python find_cameras.py --size 1280x720 --frames 60 --timeout 8
 
-It will scan device indices 0–9 and show which ones are available.
-Use the correct index in config.py → USB_CAMERA_INDEX
+It probes device indices 0–9 (and any --url streams) in parallel, one
+process per device, so a missing index that blocks inside the camera
+driver cannot hold up the others; it is cut off after --timeout seconds.
+Each camera that answers is measured with the same settings CameraFeed
+uses: delivered resolution, sustained FPS, time to first frame and
+per-read latency.
+
+The ranked results are written to CAMERA_DISCOVERY_FILE (cameras.json).
+Set CAMERA_MODE = "auto" in config.py to use the best camera from it, or
+copy its index into USB_CAMERA_INDEX.
 """
 
+import argparse
+import json
+import multiprocessing as mp
+import sys
+import time
+from multiprocessing.connection import wait
+
 import cv2
+import numpy as np
+
+from config import CAMERA_DISCOVERY_FILE
+from camera_feed import local_capture_api
+
+DEFAULT_INDICES = range(10)
+TARGET_FPS = 30          # FPS beyond this does not make a camera rank higher
+
+
+def _fourcc_text(value):
+    code = int(value)
+    text = "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+    return text if code and text.isprintable() else ""
+
+
+# ── Probing (runs in a child process per device) ────────────────────────
+def probe_source(source, size=(640, 480), frames=30):
+    """
+    Opens `source` the way CameraFeed does and measures it. Returns a dict
+    with status "ok", "no_device" or "no_frames" plus the measurements.
+    """
+    result = {"source": source, "kind": "index" if isinstance(source, int) else "stream"}
+    t0 = time.perf_counter()
+    if isinstance(source, int):
+        cap = cv2.VideoCapture(source, local_capture_api())
+    else:
+        cap = cv2.VideoCapture(source)
+    result["open_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+    if not cap.isOpened():
+        cap.release()
+        result["status"] = "no_device"
+        return result
+
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    if isinstance(source, int):
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+        cap.set(cv2.CAP_PROP_FPS, TARGET_FPS)
+
+    ret, frame = cap.read()
+    result["first_frame_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+    result["backend"] = cap.getBackendName()
+    if not ret:
+        cap.release()
+        result["status"] = "no_frames"
+        return result
+
+    read_s, failed = [], 0
+    t_start = time.perf_counter()
+    for _ in range(frames):
+        t = time.perf_counter()
+        ret, frame_next = cap.read()
+        read_s.append(time.perf_counter() - t)
+        if ret:
+            frame = frame_next
+        else:
+            failed += 1
+    elapsed = time.perf_counter() - t_start
+    ms = np.asarray(read_s) * 1000.0
+
+    h, w = frame.shape[:2]
+    result.update({
+        "status": "ok",
+        "width": w,
+        "height": h,
+        "fps": round((frames - failed) / elapsed, 1) if elapsed > 0 else 0.0,
+        "fps_reported": round(cap.get(cv2.CAP_PROP_FPS), 1),
+        "read_ms_p50": round(float(np.percentile(ms, 50)), 2),
+        "read_ms_p95": round(float(np.percentile(ms, 95)), 2),
+        "failed_reads": failed,
+        "fourcc": _fourcc_text(cap.get(cv2.CAP_PROP_FOURCC)),
+    })
+    cap.release()
+    return result
+
+
+def _probe_main(source, size, frames, conn):
+    try:
+        conn.send(probe_source(source, size, frames))
+    except Exception as e:
+        conn.send({"source": source, "status": "error", "error": str(e)})
+    finally:
+        conn.close()
+
 
+def discover(sources, size=(640, 480), frames=30, timeout=6.0, workers=None):
+    """
+    Probes every source in parallel (at most `workers` at a time) and
+    returns one result per source, ranked best first. A probe that has
+    not finished `timeout` seconds after it started is killed and reported
+    with status "timeout".
+    """
+    ctx = mp.get_context("spawn")
+    pending = list(sources)
+    workers = workers or len(pending)
+    running = {}         # conn -> (process, source, deadline)
+    results = []
 
-def find_cameras():
+    while pending or running:
+        while pending and len(running) < workers:
+            source = pending.pop(0)
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_probe_main, args=(source, size, frames, child_conn),
+                               name=f"probe-{source}", daemon=True)
+            proc.start()
+            child_conn.close()
+            running[parent_conn] = (proc, source, time.monotonic() + timeout)
+
+        next_deadline = min(d for _, _, d in running.values())
+        for conn in wait(list(running), timeout=max(0.0, next_deadline - time.monotonic())):
+            proc, source, _ = running.pop(conn)
+            try:
+                results.append(conn.recv())
+            except EOFError:                  # child died without reporting
+                results.append({"source": source, "status": "error", "error": "probe crashed"})
+            proc.join(timeout=1.0)
+
+        now = time.monotonic()
+        for conn, (proc, source, deadline) in list(running.items()):
+            if now >= deadline:
+                proc.terminate()
+                proc.join(timeout=1.0)
+                del running[conn]
+                results.append({"source": source, "status": "timeout",
+                                "kind": "index" if isinstance(source, int) else "stream"})
+    return rank(results, size)
+
+
+def rank(results, size=(640, 480)):
+    """Working cameras first: sustained FPS (up to TARGET_FPS), then pixels, then latency."""
+    want_px = size[0] * size[1]
+
+    def key(r):
+        if r.get("status") != "ok":
+            return (1, 0, 0, 0.0, str(r["source"]))
+        return (0, -min(round(r["fps"]), TARGET_FPS), -min(r["width"] * r["height"], want_px),
+                r["read_ms_p50"], str(r["source"]))
+
+    ranked = sorted(results, key=key)
+    rank_no = 0
+    for r in ranked:
+        if r.get("status") == "ok":
+            rank_no += 1
+            r["rank"] = rank_no
+    return ranked
+
+
+# ── JSON output / input ─────────────────────────────────────────────────
+def write_discovery(results, path=CAMERA_DISCOVERY_FILE, size=(640, 480)):
+    working = [r for r in results if r.get("status") == "ok"]
+    doc = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": sys.platform,
+        "requested_size": list(size),
+        "best": working[0] if working else None,
+        "cameras": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+    return doc
+
+
+def load_best_camera(path=CAMERA_DISCOVERY_FILE):
+    """Best working camera from a discovery file, or None (missing file / nothing found)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("best")
+    except (OSError, ValueError):
+        return None
+
+
+# ── Interactive finder ──────────────────────────────────────────────────
+def _describe(r):
+    label = f"Index {r['source']}" if r.get("kind") == "index" else str(r["source"])
+    status = r.get("status")
+    if status == "ok":
+        return (f"  ✅ #{r['rank']}  {label}  →  {r['width']}x{r['height']} @ {r['fps']:.1f} fps measured  "
+                f"(first frame {r['first_frame_ms']:.0f} ms, read p50 {r['read_ms_p50']:.1f} ms, "
+                f"backend: {r['backend']})")
+    if status == "no_frames":
+        return f"  ⚠  {label}  →  Opens but cannot read frames"
+    if status == "timeout":
+        return f"  ⏱  {label}  →  No answer (timed out)"
+    if status == "error":
+        return f"  ❌ {label}  →  Probe failed: {r.get('error', '')}"
+    return None      # no device: don't print anything
+
+
+def find_cameras(indices=DEFAULT_INDICES, urls=(), size=(640, 480), frames=30, timeout=6.0,
+                 json_path=CAMERA_DISCOVERY_FILE, preview=True):
     print("\n" + "=" * 55)
     print("  IndustriGuard AI — Camera Finder")
     print("=" * 55)
-    print("\n  Scanning for available cameras (index 0–9)...\n")
-
-    found = []
-
-    for index in range(10):
-        cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
-
-        if cap.isOpened():
-            ret, frame = cap.read()
-            if ret:
-                w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                fps = int(cap.get(cv2.CAP_PROP_FPS))
-                backend = cap.getBackendName()
-
-                print(f"  ✅ Index {index}  →  {w}x{h} @ {fps}fps  (backend: {backend})")
-                found.append(index)
-            else:
-                print(f"  ⚠  Index {index}  →  Opens but cannot read frames")
-            cap.release()
-        else:
-            # Don't print anything for indices that don't open
-            pass
+    indices = list(indices)
+    print(f"\n  Probing {len(indices)} device indices"
+          f"{f' and {len(urls)} stream(s)' if urls else ''} in parallel "
+          f"(timeout {timeout:g}s each)...\n")
 
+    t0 = time.perf_counter()
+    results = discover(indices + list(urls), size=size, frames=frames, timeout=timeout)
+    for r in results:
+        line = _describe(r)
+        if line:
+            print(line)
+    print(f"\n  Scan took {time.perf_counter() - t0:.1f}s")
+
+    found = [r["source"] for r in results if r.get("status") == "ok"]
+    if json_path:
+        write_discovery(results, json_path, size)
+        print(f"  Ranked results written to {json_path}")
     print()
 
     if not found:
@@ -55,22 +253,27 @@ def find_cameras():
         print(f"  Found {len(found)} camera(s): {found}")
         print()
 
-        if len(found) == 1:
-            print(f"  → Set USB_CAMERA_INDEX = {found[0]} in config.py")
-        elif len(found) >= 2:
-            print(f"  → Index 0 is usually your laptop webcam")
-            print(f"  → Index {found[1]} is likely your USB phone camera")
-            print(f"  → Set USB_CAMERA_INDEX = {found[1]} in config.py")
+        best = found[0]
+        if isinstance(best, int):
+            print(f"  → Best: index {best}. Set CAMERA_MODE = \"auto\" (uses {json_path}),")
+            print(f"    or USB_CAMERA_INDEX = {best} in config.py")
+            if best == 0 and len(found) >= 2:
+                print(f"  → Index 0 is usually your laptop webcam; a phone camera ranked lower")
+                print(f"    can still be chosen with USB_CAMERA_INDEX")
+        else:
+            print(f"  → Best: {best}. Set CAMERA_MODE = \"auto\" (uses {json_path})")
 
         print()
-        # Offer to preview
-        print("  Would you like to preview a camera? (Enter index or 'n' to skip)")
-        choice = input("  > ").strip()
+        if preview:
+            # Offer to preview
+            print("  Would you like to preview a camera? (Enter index or 'n' to skip)")
+            choice = input("  > ").strip()
 
-        if choice.isdigit() and int(choice) in found:
-            preview_camera(int(choice))
+            if choice.isdigit() and int(choice) in found:
+                preview_camera(int(choice))
 
     print("=" * 55 + "\n")
+    return results
 
 
 def preview_camera(index):
@@ -78,7 +281,7 @@ def preview_camera(index):
     print(f"\n  Opening preview for camera index {index}...")
     print("  Press Q to close the preview.\n")
 
-    cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
+    cap = cv2.VideoCapture(index, local_capture_api())
 
     if not cap.isOpened():
         print(f"  ❌ Cannot open camera {index}")
@@ -112,5 +315,23 @@ def preview_camera(index):
     print("  Preview closed.")
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Find and rank the cameras attached to this PC.")
+    parser.add_argument("--max-index", type=int, default=len(DEFAULT_INDICES),
+                        help="probe device indices 0 .. N-1 (default 10)")
+    parser.add_argument("--url", action="append", default=[],
+                        help="also probe this stream URL (repeatable)")
+    parser.add_argument("--size", default="640x480", help="requested WIDTHxHEIGHT (as CameraFeed)")
+    parser.add_argument("--frames", type=int, default=30, help="frames read per camera to measure FPS")
+    parser.add_argument("--timeout", type=float, default=6.0, help="seconds before a probe is cut off")
+    parser.add_argument("--json", default=CAMERA_DISCOVERY_FILE, help="where to write the ranked results")
+    parser.add_argument("--no-preview", action="store_true", help="do not offer a preview window")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    find_cameras()
+    args = parse_args()
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    find_cameras(indices=range(args.max_index), urls=args.url, size=(width, height),
+                 frames=args.frames, timeout=args.timeout, json_path=args.json,
+                 preview=not args.no_preview)
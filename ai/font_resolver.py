@@ -0,0 +1,174 @@
+"""
+font_resolver.py  —  Finds the overlay's TrueType fonts on any OS
+
+ui_overlay wants a clean sans-serif in four weights (light, regular,
+semibold, bold).  The resolver indexes the bundled ai/fonts/ folder, any
+UI_FONT_DIRS from config and the platform font folders once, then picks
+the first family in UI_FONT_FAMILIES that is installed.  Weights a family
+lacks fall back to its nearest weight, so one family is used throughout
+and rendering looks the same frame to frame.  If nothing is found, Pillow's
+built-in font is used and a warning says so.
+"""
+
+import os
+import sys
+
+from PIL import ImageFont
+
+from config import UI_FONT_DIRS, UI_FONT_FAMILIES
+
+BUNDLED_FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+
+WEIGHTS = ("light", "regular", "semibold", "bold")
+
+# File names per family and weight (matched case-insensitively)
+FAMILY_FILES = {
+    "Segoe UI": {
+        "light": ["segoeuil.ttf"], "regular": ["segoeui.ttf"],
+        "semibold": ["segoeuisl.ttf", "seguisb.ttf"], "bold": ["segoeuib.ttf"],
+    },
+    "Noto Sans": {
+        "light": ["NotoSans-Light.ttf"], "regular": ["NotoSans-Regular.ttf"],
+        "semibold": ["NotoSans-SemiBold.ttf", "NotoSans-Medium.ttf"], "bold": ["NotoSans-Bold.ttf"],
+    },
+    "Ubuntu": {
+        "light": ["Ubuntu-L.ttf"], "regular": ["Ubuntu-R.ttf"],
+        "semibold": ["Ubuntu-M.ttf"], "bold": ["Ubuntu-B.ttf"],
+    },
+    "DejaVu Sans": {
+        "light": ["DejaVuSans-ExtraLight.ttf"], "regular": ["DejaVuSans.ttf"],
+        "semibold": [], "bold": ["DejaVuSans-Bold.ttf"],
+    },
+    "Liberation Sans": {
+        "light": [], "regular": ["LiberationSans-Regular.ttf"],
+        "semibold": [], "bold": ["LiberationSans-Bold.ttf"],
+    },
+    "Arial": {
+        "light": [], "regular": ["arial.ttf", "Arial.ttf"],
+        "semibold": [], "bold": ["arialbd.ttf", "Arial Bold.ttf"],
+    },
+}
+
+# Weight to use when a family has no file for the requested one
+_WEIGHT_FALLBACK = {
+    "light":    ("light", "regular"),
+    "regular":  ("regular",),
+    "semibold": ("semibold", "bold", "regular"),
+    "bold":     ("bold", "semibold", "regular"),
+}
+
+
+def platform_font_dirs():
+    """OS font folders for the current platform (existing or not)."""
+    home = os.path.expanduser("~")
+    if sys.platform.startswith("win"):
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        local = os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local"))
+        return [os.path.join(windir, "Fonts"), os.path.join(local, "Microsoft", "Windows", "Fonts")]
+    if sys.platform == "darwin":
+        return ["/System/Library/Fonts", "/System/Library/Fonts/Supplemental",
+                "/Library/Fonts", os.path.join(home, "Library", "Fonts")]
+    xdg = os.environ.get("XDG_DATA_HOME", os.path.join(home, ".local", "share"))
+    return [os.path.join(xdg, "fonts"), os.path.join(home, ".fonts"),
+            "/usr/local/share/fonts", "/usr/share/fonts"]
+
+
+def _index_fonts(dirs):
+    """{lower-case file name: path}; earlier directories win."""
+    index = {}
+    for root in dirs:
+        if not os.path.isdir(root):
+            continue
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for name in filenames:
+                if name.lower().endswith((".ttf", ".otf", ".ttc")):
+                    index.setdefault(name.lower(), os.path.join(dirpath, name))
+    return index
+
+
+class FontResolver:
+    def __init__(self, families=None, extra_dirs=None):
+        self.search_dirs = [BUNDLED_FONT_DIR] + list(extra_dirs or []) + platform_font_dirs()
+        self.family = None
+        self.paths = {}          # weight -> font file path (None = Pillow default font)
+        self._fonts = {}         # (size, weight) -> ImageFont
+
+        index = _index_fonts(self.search_dirs)
+        for family in (families or list(FAMILY_FILES)):
+            files = FAMILY_FILES.get(family)
+            if not files:
+                print(f"[Fonts] Unknown font family in UI_FONT_FAMILIES: {family!r}")
+                continue
+            found = {w: next((index[n.lower()] for n in files[w] if n.lower() in index), None)
+                     for w in WEIGHTS}
+            if found["regular"] is None:
+                continue
+            self.family = family
+            for weight in WEIGHTS:
+                self.paths[weight] = next(found[w] for w in _WEIGHT_FALLBACK[weight] if found[w])
+            break
+
+        if self.family is None:
+            self.paths = {w: None for w in WEIGHTS}
+
+    def get(self, size, weight="regular"):
+        """Cached ImageFont for (size, weight)."""
+        key = (size, weight)
+        font = self._fonts.get(key)
+        if font is None:
+            path = self.paths.get(weight, self.paths["regular"])
+            font = self._fonts[key] = self._load(path, size)
+        return font
+
+    @staticmethod
+    def _load(path, size):
+        if path is not None:
+            try:
+                return ImageFont.truetype(path, size)
+            except OSError as e:
+                print(f"[Fonts] Could not load {path}: {e}")
+        try:
+            return ImageFont.load_default(size)      # scalable since Pillow 10.1
+        except TypeError:
+            return ImageFont.load_default()
+
+    def preload(self, sizes):
+        """Loads every {weight: [sizes]} up front so the first frame does not stall."""
+        for weight, weight_sizes in sizes.items():
+            for size in weight_sizes:
+                self.get(size, weight).getbbox("Ag")   # also warms FreeType's glyph cache
+        return len(self._fonts)
+
+    def report(self):
+        """{"family", "fonts": {weight: path}, "loaded": n} — what is actually rendered with."""
+        return {"family": self.family or "Pillow default",
+                "fonts": dict(self.paths), "loaded": len(self._fonts)}
+
+    def log_report(self):
+        if self.family is None:
+            print("[Fonts] WARNING: none of "
+                  f"{', '.join(UI_FONT_FAMILIES)} found in {len(self.search_dirs)} font folders "
+                  f"— using Pillow's default font. Put TTFs in {BUNDLED_FONT_DIR} to fix.")
+            return
+        print(f"[Fonts] {self.family} ({len(self._fonts)} sizes preloaded)")
+        for weight in WEIGHTS:
+            print(f"[Fonts]   {weight:<8} → {self.paths[weight]}")
+
+
+_resolver = None
+
+
+def get_resolver():
+    """Process-wide resolver, built on first use from config."""
+    global _resolver
+    if _resolver is None:
+        _resolver = FontResolver(families=UI_FONT_FAMILIES, extra_dirs=UI_FONT_DIRS)
+    return _resolver
+
+
+if __name__ == "__main__":
+    resolver = get_resolver()
+    print("[Fonts] Searched:")
+    for d in resolver.search_dirs:
+        print(f"[Fonts]   {'✓' if os.path.isdir(d) else '·'} {d}")
+    resolver.log_report()
@@ -0,0 +1,151 @@
+"""
+frame_bus.py  —  Shared-memory frame ring for the multi-process pipeline
+
+One writer (the capture process) and a fixed number of readers share
+`slots` preallocated frame buffers in a single SharedMemory block.  Only
+sequence numbers change hands; readers get NumPy views straight into the
+shared block, so a frame is copied once (camera → slot) and never again.
+
+Layout (int64 header, then the frames):
+
+    header[0]            latest sequence number (-1 = nothing written yet)
+    header[1]            slot holding it
+    header[2]            closed flag (writer is gone)
+    header[3]            online flag (0 while the camera is reconnecting)
+    header[4:4+slots]    sequence number stored in each slot (-1 = being written)
+    header[...+readers]  slot pinned by each reader (-1 = none)
+
+A reader pins the slot it is using; the writer never overwrites a pinned
+slot or the latest one, so with `slots >= readers + 2` it always has a
+free slot and a pinned frame stays intact until it is released.  Pinning
+is optimistic: the reader pins, then re-checks the slot's sequence
+number and retries if the writer got there first.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+_LATEST_SEQ, _LATEST_SLOT, _CLOSED, _ONLINE = 0, 1, 2, 3
+_FIXED = 4
+
+
+class FrameRing:
+    def __init__(self, shape, slots=4, readers=2, name=None, create=False):
+        """Use FrameRing.create() in the owning process and FrameRing.attach() elsewhere."""
+        self.shape = tuple(int(d) for d in shape)
+        self.slots = int(slots)
+        self.readers = int(readers)
+        if self.slots < self.readers + 2:
+            raise ValueError(f"FrameRing needs at least readers + 2 slots ({self.readers + 2})")
+
+        header_bytes = 8 * (_FIXED + self.slots + self.readers)
+        frame_bytes = int(np.prod(self.shape))
+        size = header_bytes + frame_bytes * self.slots
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.owner = bool(create)
+
+        buf = self._shm.buf
+        self._header = np.ndarray((_FIXED + self.slots + self.readers,), dtype=np.int64, buffer=buf)
+        self._seqs = self._header[_FIXED:_FIXED + self.slots]
+        self._pins = self._header[_FIXED + self.slots:]
+        self._frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8,
+                                  buffer=buf, offset=header_bytes)
+        if create:
+            self._header[:] = -1
+            self._header[_CLOSED] = 0
+            self._header[_ONLINE] = 1
+        self._next_seq = 0
+
+    @classmethod
+    def create(cls, shape, slots=4, readers=2):
+        return cls(shape, slots=slots, readers=readers, create=True)
+
+    @classmethod
+    def attach(cls, spec):
+        return cls(spec["shape"], slots=spec["slots"], readers=spec["readers"], name=spec["name"])
+
+    def spec(self):
+        """Picklable description for FrameRing.attach() in another process."""
+        return {"name": self._shm.name, "shape": self.shape, "slots": self.slots, "readers": self.readers}
+
+    # ── Writer ─────────────────────────────────────────────────────────
+    def write(self, frame):
+        """Copies `frame` into a free slot and publishes it. Returns its sequence number."""
+        if frame.shape != self.shape:
+            raise ValueError(f"frame shape {frame.shape} != ring shape {self.shape}")
+        seq = self._next_seq
+        latest = self._header[_LATEST_SLOT]
+        for i in range(self.slots):
+            slot = (seq + i) % self.slots
+            if slot == latest or slot in self._pins:
+                continue
+            self._seqs[slot] = -1              # invalidate first, then re-check pins
+            if slot in self._pins:
+                continue
+            np.copyto(self._frames[slot], frame)
+            self._seqs[slot] = seq
+            self._header[_LATEST_SLOT] = slot
+            self._header[_LATEST_SEQ] = seq
+            self._next_seq = seq + 1
+            return seq
+        raise RuntimeError("FrameRing: no free slot (are readers releasing their pins?)")
+
+    def close_writer(self):
+        """Tells readers no more frames will come."""
+        self._header[_CLOSED] = 1
+
+    def set_online(self, online):
+        """Tells readers whether frames are coming (False while the camera reconnects)."""
+        self._header[_ONLINE] = 1 if online else 0
+
+    # ── Readers ────────────────────────────────────────────────────────
+    @property
+    def closed(self):
+        return bool(self._header[_CLOSED])
+
+    @property
+    def online(self):
+        return bool(self._header[_ONLINE])
+
+    @property
+    def latest_seq(self):
+        return int(self._header[_LATEST_SEQ])
+
+    def read_latest(self, reader, after_seq=-1):
+        """
+        Pins and returns (seq, read-only view) of the newest frame if it is
+        newer than `after_seq`, else (None, None). Releases the reader's
+        previous pin. The view is valid until the next read or release().
+        """
+        self._pins[reader] = -1
+        for _ in range(8):
+            seq = int(self._header[_LATEST_SEQ])
+            if seq <= after_seq:
+                return None, None
+            slot = int(self._header[_LATEST_SLOT])
+            self._pins[reader] = slot
+            if self._seqs[slot] == seq:
+                view = self._frames[slot]
+                view.flags.writeable = False
+                return seq, view
+            self._pins[reader] = -1            # overwritten meanwhile — retry
+        return None, None
+
+    def release(self, reader):
+        self._pins[reader] = -1
+
+    # ── Lifetime ───────────────────────────────────────────────────────
+    def close(self):
+        """Detaches; the owner also frees the shared block."""
+        # Views into the buffer must be gone before SharedMemory.close()
+        self._header = self._seqs = self._pins = self._frames = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass        # a caller still holds a frame view; the mapping goes with it
+        if self.owner:
+            self._shm.unlink()
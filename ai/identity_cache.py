@@ -0,0 +1,63 @@
+"""
+identity_cache.py  —  track_id → employee bindings with decaying confidence
+
+Once a QR badge has been matched to a tracked person there is no need to
+keep decoding QR codes inside that person's box.  Each binding starts at
+confidence 1.0 and halves every `half_life_seconds`; while it stays above
+`min_confidence` the track counts as identified and is left out of the QR
+search.  A fresh decode of the same badge re-confirms it, and a lost
+track drops its binding.
+"""
+
+import time
+
+
+class IdentityCache:
+    def __init__(self, half_life_seconds=20.0, min_confidence=0.5):
+        self.half_life_seconds = float(half_life_seconds)
+        self.min_confidence = float(min_confidence)
+        self._bindings = {}   # track_id -> {"employee": dict, "confirmed": float}
+        self.searches_skipped = 0
+
+    def bind(self, track_id, employee, now=None):
+        """Binds (or re-confirms) a track to an employee."""
+        self._bindings[int(track_id)] = {
+            "employee": employee,
+            "confirmed": time.time() if now is None else now,
+        }
+
+    def get(self, track_id):
+        """Employee bound to this track (sticky while the track is alive)."""
+        b = self._bindings.get(int(track_id))
+        return b["employee"] if b else None
+
+    def __contains__(self, track_id):
+        return int(track_id) in self._bindings
+
+    def confidence(self, track_id, now=None):
+        b = self._bindings.get(int(track_id))
+        if b is None:
+            return 0.0
+        if self.half_life_seconds <= 0:
+            return 1.0
+        age = (time.time() if now is None else now) - b["confirmed"]
+        return 0.5 ** (max(0.0, age) / self.half_life_seconds)
+
+    def is_confirmed(self, track_id, now=None):
+        """True while the track is identified confidently enough to skip QR search."""
+        return self.confidence(track_id, now) >= self.min_confidence
+
+    def confirmed_boxes(self, persons_compliance, now=None):
+        """Person boxes of confidently identified tracks (excluded from QR search)."""
+        boxes = []
+        for pc in persons_compliance or []:
+            tid = pc["person_det"].get("track_id")
+            if tid is not None and self.is_confirmed(tid, now):
+                boxes.append(pc["person_det"]["bbox"])
+        return boxes
+
+    def evict(self, track_id):
+        self._bindings.pop(int(track_id), None)
+
+    def __len__(self):
+        return len(self._bindings)
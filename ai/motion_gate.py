@@ -0,0 +1,119 @@
+"""
+motion_gate.py  —  Cheap scene-change detector used to gate YOLO + QR work
+
+Works on a small grayscale copy of each frame and compares it against a
+running-average background.  When nothing has changed for a while the
+main loop can skip inference and QR decoding entirely, which is the
+common case at an empty gate.
+"""
+
+import time
+import cv2
+
+
+class MotionGate:
+    def __init__(self, downscale_width=160, pixel_threshold=25,
+                 min_area_ratio=0.005, hold_seconds=2.0,
+                 max_idle_seconds=5.0, bg_alpha=0.05):
+        """
+        downscale_width   : width of the grayscale image used for differencing
+        pixel_threshold   : per-pixel gray-level difference counted as change
+        min_area_ratio    : fraction of changed pixels that counts as motion
+        hold_seconds      : keep the gate open this long after the last motion
+                            (workers standing still in front of the camera)
+        max_idle_seconds  : force one inference this often even when idle, so
+                            the tracker and cached results never go stale;
+                            the gate stays open until that inference has run
+        bg_alpha          : learning rate of the running-average background
+        """
+        self.downscale_width  = int(downscale_width)
+        self.pixel_threshold  = int(pixel_threshold)
+        self.min_area_ratio   = float(min_area_ratio)
+        self.hold_seconds     = float(hold_seconds)
+        self.max_idle_seconds = float(max_idle_seconds)
+        self.bg_alpha         = float(bg_alpha)
+
+        self._background  = None   # float32 running average
+        self._small_size  = None
+        self._last_motion = 0.0
+        self._last_inference = 0.0
+        self._now         = 0.0    # time of the last update()
+        self.last_change_ratio = 0.0
+
+        # Counters
+        self.frames           = 0
+        self.motion_frames    = 0
+        self.inferences_run   = 0
+        self.inferences_skipped = 0
+        self.qr_skipped       = 0
+
+    def _prepare(self, frame):
+        h, w = frame.shape[:2]
+        if self._small_size is None or self._small_size[2:] != (w, h):
+            sw = min(self.downscale_width, w)
+            sh = max(1, int(h * sw / float(w)))
+            self._small_size = (sw, sh, w, h)
+            self._background = None   # resolution changed → relearn
+        sw, sh = self._small_size[:2]
+        small = cv2.resize(frame, (sw, sh), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def update(self, frame, now=None):
+        """
+        Feeds one frame and returns True when the scene is "active", i.e.
+        motion was seen recently or the idle heartbeat is due.  A due
+        heartbeat keeps returning True until record_inference(True) reports
+        that an inference actually ran (the caller may only infer every
+        Nth frame).
+        """
+        now = time.time() if now is None else now
+        self.frames += 1
+        gray = self._prepare(frame)
+
+        if self._background is None:
+            self._background = gray.astype("float32")
+            self._last_motion = now
+            self.last_change_ratio = 1.0
+        else:
+            diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._background))
+            _, mask = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+            self.last_change_ratio = cv2.countNonZero(mask) / float(mask.size)
+            cv2.accumulateWeighted(gray, self._background, self.bg_alpha)
+            if self.last_change_ratio >= self.min_area_ratio:
+                self._last_motion = now
+                self.motion_frames += 1
+
+        self._now = now
+        active = (now - self._last_motion) <= self.hold_seconds
+        if not active and (now - self._last_inference) >= self.max_idle_seconds:
+            active = True   # heartbeat pass, open until an inference runs
+        return active
+
+    def record_inference(self, ran):
+        """Counts a scheduled inference as run or skipped by the gate."""
+        if ran:
+            self.inferences_run += 1
+            self._last_inference = self._now
+        else:
+            self.inferences_skipped += 1
+
+    def record_qr_skip(self):
+        self.qr_skipped += 1
+
+    def reset(self):
+        """Forget the background (e.g. after a camera reconnect)."""
+        self._background = None
+        self._small_size = None
+
+    def stats(self):
+        scheduled = self.inferences_run + self.inferences_skipped
+        return {
+            "frames":             self.frames,
+            "motion_frames":      self.motion_frames,
+            "inferences_run":     self.inferences_run,
+            "inferences_skipped": self.inferences_skipped,
+            "skip_ratio":         round(self.inferences_skipped / scheduled, 3) if scheduled else 0.0,
+            "qr_skipped":         self.qr_skipped,
+            "change_ratio":       round(self.last_change_ratio, 4),
+        }
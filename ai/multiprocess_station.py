@@ -0,0 +1,310 @@
+"""
+multiprocess_station.py  —  Capture, detection and the check loop in separate processes
+
+Threads share one GIL, so capture decode, YOLO pre/post-processing and
+PIL rendering still contend even when they run on different threads.
+With MULTIPROCESS_PIPELINE (or `python main_ai.py --multiprocess`) the
+station is split into three processes:
+
+  capture  : CameraFeed → FrameRing (shared memory, one copy per frame);
+             while the camera reconnects nothing is written, the ring's
+             online flag is cleared and health snapshots go to a Queue
+  detect   : newest ring frame → YOLO (+ ByteTrack) → detections on a Queue,
+             in the same mode Pipeline would use (tiled / cascaded / full
+             frame, at the main process's current cadence imgsz)
+  main     : Pipeline — QR, association, state machine, reporting, overlay
+
+Frames never cross a process boundary; only sequence numbers, the
+detection lists and camera health snapshots do.  The main process sees the usual camera / detector
+interfaces (RingCamera, RemoteDetector), so Pipeline itself is unchanged
+apart from taking detections as they arrive instead of on its cadence.
+"""
+
+import multiprocessing as mp
+import queue
+import time
+
+import numpy as np
+
+from config import (
+    CAMERA_ID,
+    CAMERA_OFFLINE_FRAME_INTERVAL,
+    MODEL_PATH,
+    INFERENCE_IMG_SIZE,
+    USE_BYTE_TRACK,
+    TILED_INFERENCE,
+    FRAME_RING_SLOTS,
+)
+from frame_bus import FrameRing
+from camera_health import RemoteCameraHealth, offline_frame
+
+READER_DETECT = 0
+READER_MAIN = 1
+
+_HEALTH_EVERY_SECONDS = 0.5     # capture → main camera health snapshots
+
+
+# ── Child processes ────────────────────────────────────────────────────
+def _capture_main(source, camera_id, conn, health, stop):
+    import cv2
+    from camera_feed import CameraFeed
+
+    camera = CameraFeed(source=source, camera_id=camera_id)
+    frame = camera.get_frame()
+    if frame is None:
+        conn.send(None)
+        camera.release()
+        return
+    conn.send({"shape": frame.shape, "info": camera.get_info()})
+    spec = conn.recv()
+    if spec is None:
+        camera.release()
+        return
+
+    ring = FrameRing.attach(spec)
+    was_online, health_sent = True, 0.0
+    last_shape = frame.shape
+    try:
+        while frame is not None and not stop.is_set():
+            online = camera.online
+            if online:
+                if frame.shape != last_shape:
+                    last_shape = frame.shape
+                    if frame.shape != ring.shape:
+                        print(f"[Station] Camera now delivers {frame.shape[1]}x{frame.shape[0]}, "
+                              f"resizing to {ring.shape[1]}x{ring.shape[0]}")
+                if frame.shape != ring.shape:
+                    # The ring is sized at startup; a reconnect may bring another resolution
+                    frame = cv2.resize(frame, (ring.shape[1], ring.shape[0]))
+                ring.write(frame)       # offline placeholders stay out of the ring (and YOLO)
+            ring.set_online(online)
+            now = time.monotonic()
+            if online != was_online or now - health_sent >= _HEALTH_EVERY_SECONDS:
+                health.put(camera.health.snapshot())
+                was_online, health_sent = online, now
+            frame = camera.get_frame()
+    finally:
+        health.cancel_join_thread()
+        ring.close_writer()
+        ring.close()
+        camera.release()
+
+
+def _detect_main(spec, model_path, imgsz, use_tracks, results, stop):
+    """imgsz : shared mp.Value set by RemoteDetector from the main process's cadence"""
+    from ppe_detector import PPEDetector
+    from pipeline import run_detection
+
+    detector = PPEDetector(model_path=model_path)
+    if TILED_INFERENCE and use_tracks:
+        detector.init_tile_tracker()
+    ring = FrameRing.attach(spec)
+    last_seq = -1
+    try:
+        while not stop.is_set():
+            seq, frame = ring.read_latest(READER_DETECT, after_seq=last_seq)
+            if frame is None:
+                if ring.closed:
+                    break
+                time.sleep(0.002)
+                continue
+            t0 = time.perf_counter()
+            detections = run_detection(detector, frame, imgsz=imgsz.value or None,
+                                       use_tracks=use_tracks)
+            ring.release(READER_DETECT)
+            last_seq = seq
+            results.put((seq, detections, time.perf_counter() - t0))
+    finally:
+        results.cancel_join_thread()   # exit even if main stopped draining
+        ring.close()
+
+
+# ── Main-process stand-ins ─────────────────────────────────────────────
+class RingCamera:
+    """
+    CameraFeed stand-in: get_frame() returns the newest frame in the ring,
+    or an offline placeholder while the capture process reconnects (check
+    `online`, like CameraFeed) or when no new frame arrived within
+    timeout_seconds. None only once the capture process has closed the
+    ring. `health` mirrors the capture process's CameraHealth.
+    """
+
+    def __init__(self, ring, info, copy=False, reader=READER_MAIN, timeout_seconds=5.0,
+                 health_queue=None, camera_id=CAMERA_ID):
+        """
+        copy         : return a private copy (needed when the overlay is drawn on
+                       the frame); otherwise a read-only view into shared memory
+                       that stays valid until the next get_frame()
+        health_queue : Queue of CameraHealth snapshots from the capture process
+        """
+        self.ring = ring
+        self.info = info
+        self.copy = copy
+        self.reader = reader
+        self.timeout_seconds = timeout_seconds
+        self.health_queue = health_queue
+        self.health = RemoteCameraHealth(camera_id)
+        self.online = True
+        self._last_seq = -1
+        self._buf = None
+
+    def _poll_health(self):
+        if self.health_queue is None:
+            return
+        while True:
+            try:
+                self.health.update(self.health_queue.get_nowait())
+            except queue.Empty:
+                return
+
+    def _offline_frame(self):
+        # Paces the caller's loop like CameraFeed; returns early once frames come back
+        deadline = time.monotonic() + CAMERA_OFFLINE_FRAME_INTERVAL
+        while time.monotonic() < deadline and self.ring.latest_seq <= self._last_seq:
+            time.sleep(0.01)
+        self._poll_health()
+        self.online = False
+        return offline_frame(self.ring.shape)
+
+    def get_frame(self):
+        self._poll_health()
+        deadline = time.monotonic() + self.timeout_seconds
+        while True:
+            seq, frame = self.ring.read_latest(self.reader, after_seq=self._last_seq)
+            if frame is not None:
+                break
+            if self.ring.closed:
+                return None
+            if not self.ring.online or time.monotonic() > deadline:
+                # A stalled capture process looks like an outage, not end of stream
+                return self._offline_frame()
+            time.sleep(0.001)
+        self.online = True
+        self._last_seq = seq
+        if not self.copy:
+            return frame
+        if self._buf is None:
+            self._buf = np.empty_like(frame)
+        np.copyto(self._buf, frame)
+        self.ring.release(self.reader)
+        return self._buf
+
+    def get_info(self):
+        return self.info
+
+    def release(self):
+        self.ring.release(self.reader)
+
+
+class RemoteDetector:
+    """
+    Detector API backed by the detection process, which runs the same
+    configured mode (pipeline.run_detection). detect_* return its newest
+    result and hand the requested imgsz on to it; poll() tells Pipeline
+    when a new result has arrived. Compliance rules and drawing run
+    locally (no model needed).
+    """
+
+    remote = True
+
+    def __init__(self, results, imgsz=None):
+        """imgsz : shared mp.Value read by the detection process"""
+        from ppe_detector import PPEDetector
+
+        self.results = results
+        self.imgsz = imgsz
+        self.rules = PPEDetector(model_path=None)
+        self.latest = []
+        self.latest_seq = -1          # ring sequence number the result belongs to
+        self.last_inference_s = 0.0
+        self.received = 0
+
+    def poll(self):
+        """Takes all finished results (keeping the newest). True if any arrived."""
+        fresh = False
+        while True:
+            try:
+                seq, detections, seconds = self.results.get_nowait()
+            except queue.Empty:
+                return fresh
+            self.latest, self.latest_seq, self.last_inference_s = detections, seq, seconds
+            self.received += 1
+            fresh = True
+
+    def detect(self, frame, imgsz=None, **_kwargs):
+        if imgsz and self.imgsz is not None:
+            self.imgsz.value = int(imgsz)
+        return self.latest
+
+    detect_with_tracks_fast = detect
+    detect_cascaded = detect
+    detect_tiled = detect
+
+    def per_person_compliance(self, detections):
+        return self.rules.per_person_compliance(detections)
+
+    def check_ppe_compliance(self, detections):
+        return self.rules.check_ppe_compliance(detections)
+
+    def draw_boxes(self, frame, detections):
+        return self.rules.draw_boxes(frame, detections)
+
+
+# ── Orchestration ──────────────────────────────────────────────────────
+class MultiProcessStation:
+    def __init__(self, source=None, model_path=MODEL_PATH, imgsz=INFERENCE_IMG_SIZE,
+                 use_tracks=USE_BYTE_TRACK, slots=FRAME_RING_SLOTS, copy_frames=True,
+                 startup_timeout=30.0, camera_id=CAMERA_ID):
+        """
+        Starts the capture process, sizes the ring from its first frame,
+        then starts the detection process. Use .camera and .detector to
+        build the Pipeline; call close() when done.
+        copy_frames : False only for headless runs (nothing draws on frames)
+        """
+        # spawn everywhere: same behaviour on Windows / Linux / macOS, and
+        # children do not inherit the main process's threads or CUDA state
+        ctx = mp.get_context("spawn")
+        self._stop = ctx.Event()
+        parent_conn, child_conn = ctx.Pipe()
+
+        self._health = ctx.Queue()
+        self._capture = ctx.Process(target=_capture_main,
+                                    args=(source, camera_id, child_conn, self._health, self._stop),
+                                    name="capture", daemon=True)
+        self._capture.start()
+        if not parent_conn.poll(startup_timeout):
+            self._capture.terminate()
+            raise RuntimeError("capture process did not report a first frame")
+        hello = parent_conn.recv()
+        if hello is None:
+            self._capture.join(timeout=2.0)
+            raise RuntimeError("camera delivered no frame")
+
+        self.ring = FrameRing.create(hello["shape"], slots=slots, readers=2)
+        parent_conn.send(self.ring.spec())
+
+        self._results = ctx.Queue()
+        self._imgsz = ctx.Value("i", int(imgsz or 0), lock=False)
+        self._detect = ctx.Process(
+            target=_detect_main,
+            args=(self.ring.spec(), model_path, self._imgsz, use_tracks, self._results, self._stop),
+            name="detect", daemon=True,
+        )
+        self._detect.start()
+
+        self.camera = RingCamera(self.ring, hello["info"], copy=copy_frames,
+                                 health_queue=self._health, camera_id=camera_id)
+        self.detector = RemoteDetector(self._results, imgsz=self._imgsz)
+        h, w = hello["shape"][:2]
+        print(f"[Station] Multi-process pipeline: capture pid {self._capture.pid}, "
+              f"detect pid {self._detect.pid}, {slots} x {w}x{h} shared frame slots")
+
+    def close(self):
+        self._stop.set()
+        for proc in (self._detect, self._capture):
+            proc.join(timeout=3.0)
+            if proc.is_alive():
+                proc.terminate()
+        self.camera.release()
+        self.ring.close()
+        print(f"[Station] Stopped ({self.detector.received} detection results received)")
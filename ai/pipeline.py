@@ -0,0 +1,804 @@
+"""
+pipeline.py  —  Embeddable QR + PPE check pipeline
+
+All per-station state (check state machine, track identities, cached
+detections, report de-dupe) lives on a Pipeline instance instead of in
+module globals, so several pipelines can run side by side and the loop
+can be driven frame-by-frame from a benchmark or a recorded clip.
+
+    pipeline = Pipeline(detector, scanner, reporter, backend_reporter)
+    result = pipeline.step(frame)      # one frame → structured result
+    pipeline.run(camera)               # interactive / headless loop
+    pipeline.close()
+
+Camera, detector, scanner and both reporters are injected; the helper
+components (motion gate, cadence, QR worker, ...) are built from config
+unless passed in.  `clock` supplies wall-clock time for every timer in
+the state machine, so replays can run faster than real time.
+
+With a preview window, run() normally hands capture and display to a
+DisplayWorker thread: video is shown at the camera's rate while step()
+processes the newest frame and publishes an overlay snapshot.
+"""
+
+import sys
+import time
+
+import cv2
+
+from config import (
+    CAMERA_ID,
+    RESULT_DISPLAY_SECONDS,
+    PPE_FRAMES_NEEDED,
+    USE_BYTE_TRACK,
+    INFERENCE_EVERY_N_FRAMES,
+    INFERENCE_IMG_SIZE,
+    DRAW_DETECTOR_BOXES,
+    WORKER_INFO_PERSIST_SECONDS,
+    MOTION_GATE_ENABLED,
+    MOTION_DOWNSCALE_WIDTH,
+    MOTION_PIXEL_THRESHOLD,
+    MOTION_MIN_AREA_RATIO,
+    MOTION_HOLD_SECONDS,
+    MOTION_MAX_IDLE_SECONDS,
+    ADAPTIVE_INFERENCE,
+    TARGET_DISPLAY_FPS,
+    MAX_RESULT_STALENESS_MS,
+    INFERENCE_STRIDE_MAX,
+    ADAPTIVE_IMG_SIZE,
+    INFERENCE_IMG_SIZES,
+    SHOW_PERF_HUD,
+    CASCADE_INFERENCE,
+    CASCADE_CROP_IMG_SIZE,
+    CASCADE_MAX_PERSONS,
+    TILED_INFERENCE,
+    TILE_SIZE,
+    TILE_OVERLAP,
+    TILE_INCLUDE_FULL_FRAME,
+    PPE_VOTE_WINDOW,
+    PPE_VOTE_MODE,
+    PPE_VOTE_EMA_ALPHA,
+    PPE_HISTORY_MAX_TRACKS,
+    QR_MATCH_MIN_IOU,
+    QR_MATCH_MAX_DIST_RATIO,
+    QR_ASYNC_WORKER,
+    QR_RESULT_MAX_AGE_SECONDS,
+    QR_ROI_TARGET_PX,
+    QR_FULL_FRAME_EVERY_N,
+    IDENTITY_HALF_LIFE_SECONDS,
+    IDENTITY_MIN_CONFIDENCE,
+    HEADLESS,
+    STAGE_TIMING_REPORT_SECONDS,
+    PROFILING_ENABLED,
+    PROFILING_WINDOW_SECONDS,
+    SHOW_PROFILER_PANEL,
+    DISPLAY_THREAD,
+    DISPLAY_EXTRAPOLATE_MAX_SECONDS,
+)
+
+from safety_status  import SafetyStatus
+from motion_gate    import MotionGate
+from cadence        import InferenceCadence
+from track_history  import TrackPPEHistory, TrackVelocity
+from qr_matcher     import QRPersonMatcher, qr_poly_to_rect
+from qr_worker      import QRDecodeWorker, build_qr_rois
+from identity_cache import IdentityCache
+from stage_timer    import StageTimer
+from profiler       import StageProfiler
+from display_worker import DisplayWorker
+import ui_overlay as ui
+
+# ── State Machine ──────────────────────────────────────────────────
+#
+#  SCANNING   → waiting for QR code
+#  COUNTDOWN  → QR found, worker gets ready
+#  CHECKING   → running PPE check
+#  DISPLAYING → showing result, countdown to reset
+#
+SCANNING   = "SCANNING"
+COUNTDOWN  = "COUNTDOWN"
+CHECKING   = "CHECKING"
+DISPLAYING = "DISPLAYING"
+
+COUNTDOWN_SECONDS = 5
+
+# Backend/Excel reporting de-dupe (multi-person mode)
+MULTI_REPORT_MIN_INTERVAL_SECONDS = 5.0
+
+WINDOW_NAME = "Industriguard-AI"
+
+_PPE_KEYS = ("has_helmet", "has_vest", "has_gloves", "has_goggles", "has_boots")
+_PPE_NAMES = ("Helmet", "Safety Vest", "Gloves", "Goggles", "Boots")
+
+
+def run_detection(detector, frame, imgsz=None, use_tracks=USE_BYTE_TRACK):
+    """
+    One inference in the configured mode (tiled, cascaded or full frame).
+    Shared by Pipeline and the detection process of the multi-process
+    station, so both honour the same settings.
+    """
+    if TILED_INFERENCE:
+        return detector.detect_tiled(
+            frame, tile_size=TILE_SIZE, overlap=TILE_OVERLAP,
+            include_full_frame=TILE_INCLUDE_FULL_FRAME,
+            use_tracks=use_tracks
+        )
+    if CASCADE_INFERENCE:
+        return detector.detect_cascaded(
+            frame, imgsz=imgsz, crop_imgsz=CASCADE_CROP_IMG_SIZE,
+            use_tracks=use_tracks, max_persons=CASCADE_MAX_PERSONS
+        )
+    if use_tracks:
+        return detector.detect_with_tracks_fast(frame, imgsz=imgsz)
+    return detector.detect(frame)
+
+
+def _missing_items(compliance):
+    return [name for key, name in zip(_PPE_KEYS, _PPE_NAMES) if not compliance.get(key)]
+
+
+class Pipeline:
+    def __init__(self, detector, scanner, reporter=None, backend_reporter=None,
+                 camera=None, safety=None, camera_id=CAMERA_ID, headless=HEADLESS,
+                 motion_gate=None, cadence=None, qr_worker=None, timer=None,
+                 clock=time.time, display_thread=DISPLAY_THREAD):
+        """
+        detector         : PPEDetector (or anything with the same detect_* API)
+        scanner          : QRScanner
+        reporter         : ExcelReporter-like (update_employee); None = no Excel
+        backend_reporter : Reporter-like (send_check_result); None = no backend
+        camera           : CameraFeed-like (get_frame / release), used by run()
+        headless         : skip all overlay rendering and window calls
+        motion_gate / cadence / qr_worker / timer : override the config-built
+                           components; motion_gate=False disables the gate and
+                           qr_worker=False decodes QR codes synchronously on
+                           the calling thread
+        clock            : wall-clock source for all state-machine timers
+        display_thread   : let run() show video from a DisplayWorker thread
+
+        A detector with `remote = True` (multiprocess_station.RemoteDetector)
+        runs elsewhere: its results are taken whenever poll() reports a new
+        one, instead of on the inference cadence (the cadence's imgsz is
+        still passed on to it).
+        """
+        self.detector = detector
+        self.scanner = scanner
+        self.reporter = reporter
+        self.backend_reporter = backend_reporter
+        self.camera = camera
+        self.safety = safety or SafetyStatus()
+        self.camera_id = camera_id
+        self.headless = bool(headless)
+        self.clock = clock
+        self.display_thread = bool(display_thread) and sys.platform != "darwin"
+
+        if motion_gate is None and MOTION_GATE_ENABLED:
+            motion_gate = MotionGate(
+                downscale_width=MOTION_DOWNSCALE_WIDTH,
+                pixel_threshold=MOTION_PIXEL_THRESHOLD,
+                min_area_ratio=MOTION_MIN_AREA_RATIO,
+                hold_seconds=MOTION_HOLD_SECONDS,
+                max_idle_seconds=MOTION_MAX_IDLE_SECONDS,
+            )
+        self.motion_gate = motion_gate or None
+
+        self.cadence = cadence or InferenceCadence(
+            initial_stride=INFERENCE_EVERY_N_FRAMES,
+            initial_imgsz=INFERENCE_IMG_SIZE,
+            target_fps=TARGET_DISPLAY_FPS,
+            max_staleness_ms=MAX_RESULT_STALENESS_MS,
+            max_stride=INFERENCE_STRIDE_MAX if ADAPTIVE_INFERENCE else INFERENCE_EVERY_N_FRAMES,
+            min_stride=1 if ADAPTIVE_INFERENCE else INFERENCE_EVERY_N_FRAMES,
+            adapt_imgsz=ADAPTIVE_INFERENCE and ADAPTIVE_IMG_SIZE,
+            imgsz_ladder=INFERENCE_IMG_SIZES,
+        )
+
+        if TILED_INFERENCE and USE_BYTE_TRACK and getattr(detector, "model", None) is not None:
+            # Fails here, not mid-shift, if the tiled tracker is unavailable
+            detector.init_tile_tracker()
+
+        if qr_worker is None and QR_ASYNC_WORKER:
+            qr_worker = QRDecodeWorker(
+                scanner,
+                roi_target_px=QR_ROI_TARGET_PX,
+                full_frame_every=QR_FULL_FRAME_EVERY_N,
+            )
+        self.qr_worker = qr_worker or None
+
+        self.timer = timer or StageTimer(
+            report_every_seconds=STAGE_TIMING_REPORT_SECONDS,
+            profiler=StageProfiler(window_seconds=PROFILING_WINDOW_SECONDS) if PROFILING_ENABLED else None,
+        )
+
+        # Tracking state for stable labels (used when USE_BYTE_TRACK=True)
+        # Employee labels persist briefly even if tracking/QR drops for a few frames.
+        self.identities = IdentityCache(  # track_id -> emp_dict (sticky while track is alive)
+            half_life_seconds=IDENTITY_HALF_LIFE_SECONDS,
+            min_confidence=IDENTITY_MIN_CONFIDENCE,
+        )
+        self.track_last_seen = {}    # track_id -> clock()
+        self.recent_workers = {}     # emp_id -> latest overlay/report info
+        self.ppe_history = TrackPPEHistory(  # track_id -> voted PPE state over recent inferences
+            window=PPE_VOTE_WINDOW,
+            mode=PPE_VOTE_MODE,
+            ema_alpha=PPE_VOTE_EMA_ALPHA,
+            max_tracks=PPE_HISTORY_MAX_TRACKS,
+        )
+        self.box_motion = TrackVelocity()   # track_id -> box velocity, for display extrapolation
+        self.boxes_time = 0.0                # clock() of the inference behind cached persons
+        self.qr_matcher = QRPersonMatcher(min_iou=QR_MATCH_MIN_IOU,
+                                          max_dist_ratio=QR_MATCH_MAX_DIST_RATIO)
+        self.last_qr_rects = []      # QR rects from the latest decode (next ROI hints)
+        self.last_sent = {}          # employee_id -> {"status", "has_helmet", "has_vest", "t"}
+
+        # Cache last expensive inference results (for smooth FPS)
+        self.frame_index = 0
+        self.cached_detections = []
+        self.cached_persons_compliance = []
+        self._frame_detections = None   # detections to draw when DRAW_DETECTOR_BOXES
+
+        # Single-worker check state machine
+        self.state = SCANNING
+        self.current_employee = None
+        self.current_status = None
+        self.countdown_timer = None
+        self.result_timer = None
+        self.ppe_check_frames = 0
+        self.ppe_results_pool = []   # Collect results over multiple frames
+
+        self._stop_requested = False
+        self._display = None           # DisplayWorker while run() uses the display thread
+
+        # Load overlay fonts now rather than on the first frame that uses them
+        if not self.headless:
+            ui.preload_fonts()
+
+    # ── Public API ──────────────────────────────────────────────────
+    def step(self, frame):
+        """
+        Runs one frame through QR → detection → compliance → association →
+        reporting (and the overlay unless headless). The frame is drawn on
+        in place. Returns a dict:
+
+          frame_index, state, frame,
+          inferred     : YOLO ran on this frame
+          scene_active : motion gate verdict (True without a gate)
+          qr           : decoded QR results used this frame
+          persons      : [{track_id, bbox, employee_id, status,
+                           safety_percentage, has_*}, ...]
+          reports      : [{employee_id, status, source}, ...] sent this frame
+          decision     : final status dict when a CHECKING run completes
+          timings      : {stage: seconds} for this frame
+        """
+        owns_frame = self.timer.begin()
+        self.frame_index += 1
+        self._frame_detections = None
+        result = {
+            "frame_index": self.frame_index,
+            "state": self.state,
+            "frame": frame,
+            "inferred": False,
+            "scene_active": True,
+            "qr": [],
+            "persons": [],
+            "reports": [],
+            "decision": None,
+            "timings": None,
+        }
+
+        # ── Multi-person overlay (QR → person bbox + PPE + safety%) ─────
+        # Only run the expensive multi-person pipeline during SCANNING state.
+        # During COUNTDOWN / CHECKING / DISPLAYING the single-person state
+        # machine handles everything — no need for the heavy overlay loop.
+        run_multi_overlay = (self.state == SCANNING)
+        if run_multi_overlay:
+            self.cadence.begin_frame()
+        try:
+            if run_multi_overlay:
+                self._multi_person(frame, result)
+        except Exception as e:
+            # Keep the main loop resilient
+            print(f"[Pipeline] Multi-overlay error: {e}")
+
+        self._update_state(frame, result)
+        self.timer.lap("state")
+
+        if self._display is not None:
+            # The display thread draws it on the frames it shows
+            self._display.publish(self._overlay_state(result))
+            self.timer.lap("overlay")
+        elif not self.headless:
+            frame = self._render(frame, self._overlay_state(result), self.clock())
+            self.timer.lap("render")
+
+        if run_multi_overlay:
+            self.cadence.end_frame(result["inferred"])
+        if owns_frame:
+            self.timer.end_frame()
+
+        result["frame"] = frame
+        result["state"] = self.state
+        result["timings"] = dict(self.timer.last)
+        return result
+
+    def run(self, camera=None):
+        """
+        Reads frames from the camera until it runs dry, Q is pressed in the
+        preview window, or stop() is called (e.g. from a signal handler).
+        """
+        camera = camera or self.camera
+        if not self.headless and self.display_thread:
+            self._run_with_display_thread(camera)
+            return
+
+        while not self._stop_requested:
+            self._flush_reporter()
+            self.timer.begin()
+            frame = camera.get_frame()
+            if frame is None:
+                print("[Pipeline] No frame received. Exiting.")
+                break
+            if not getattr(camera, "online", True):
+                # Placeholder while the camera reconnects: nothing to process
+                self.timer.cancel()
+                if not self.headless:
+                    cv2.imshow(WINDOW_NAME, self._render_offline(frame, camera))
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        print("\n[Pipeline] Shutting down...")
+                        break
+                continue
+            self.timer.lap("capture")
+
+            result = self.step(frame)
+
+            if not self.headless:
+                t_show = time.perf_counter()
+                # ── Show frame ─────────────────────────────────────
+                cv2.imshow(WINDOW_NAME, result["frame"])
+                key = cv2.waitKey(1) & 0xFF
+                self.timer.add("display", time.perf_counter() - t_show)
+                if key == ord('q'):
+                    print("\n[Pipeline] Shutting down...")
+                    break
+
+            self.timer.end_frame()
+            self.timer.maybe_report()
+
+    def _run_with_display_thread(self, camera):
+        """run() with capture + display on a DisplayWorker; this thread only processes."""
+        max_fps = None
+        if hasattr(camera, "get_info"):
+            max_fps = camera.get_info().get("fps") or None
+        display = DisplayWorker(camera, self._render, WINDOW_NAME, clock=self.clock, max_fps=max_fps,
+                                render_offline=lambda f: self._render_offline(f, camera))
+        self._display = display
+        try:
+            while not self._stop_requested:
+                self._flush_reporter()
+                self.timer.begin()
+                frame = display.next_frame()
+                if frame is None:
+                    if display.quit_requested:
+                        print("\n[Pipeline] Shutting down...")
+                        break
+                    if display.camera_ended:
+                        print("[Pipeline] No frame received. Exiting.")
+                        break
+                    continue    # still waiting; capture lap keeps running
+                self.timer.lap("capture")
+
+                self.step(frame)
+
+                self.timer.end_frame()
+                self.timer.maybe_report()
+        finally:
+            self._display = None
+            display.stop()
+
+    def stop(self):
+        """Asks run() to return after the current frame (signal-safe)."""
+        self._stop_requested = True
+
+    def close(self):
+        """Stops background workers, saves pending report rows and prints the run summary."""
+        if self.qr_worker is not None:
+            self.qr_worker.stop()
+        if hasattr(self.reporter, "flush"):
+            self.reporter.flush()
+        if self.motion_gate is not None:
+            gs = self.motion_gate.stats()
+            print(f"[MotionGate] Inferences run: {gs['inferences_run']}  "
+                  f"skipped: {gs['inferences_skipped']} ({gs['skip_ratio']*100:.0f}%)  "
+                  f"QR decodes skipped: {gs['qr_skipped']}")
+        for line in self.timer.summary_lines():
+            print(f"[Timing] {line}")
+
+    def _flush_reporter(self):
+        """Writes batched Excel updates once their save interval has passed."""
+        if hasattr(self.reporter, "flush_if_due"):
+            self.reporter.flush_if_due()
+
+    # ── Multi-person pass (SCANNING) ────────────────────────────────
+    def _multi_person(self, frame, result):
+        identities = self.identities
+
+        # Motion gate: while the scene is static, skip QR decoding and YOLO.
+        # Cached detections stay valid (nothing moved) and the tracker is
+        # simply not fed, so its state is intact when activity resumes.
+        scene_active = True
+        if self.motion_gate is not None:
+            scene_active = self.motion_gate.update(frame, now=self.clock())
+        result["scene_active"] = scene_active
+        self.timer.lap("motion")
+
+        qr_results = []
+
+        # Tracks already bound to an employee are not searched for QR codes
+        # again until the track is lost or its identity confidence decays.
+        identified_boxes = identities.confirmed_boxes(self.cached_persons_compliance, now=self.clock())
+        all_identified = bool(self.cached_persons_compliance) and \
+            len(identified_boxes) == len(self.cached_persons_compliance)
+        if all_identified:
+            identities.searches_skipped += 1
+
+        if scene_active and not all_identified:
+            if self.qr_worker is not None:
+                # Decode off-thread, only where a badge is likely
+                rois = build_qr_rois(self.cached_persons_compliance, self.last_qr_rects, frame.shape,
+                                     exclude_boxes=identified_boxes)
+                self.qr_worker.submit(frame, self.frame_index, rois, mask_boxes=identified_boxes)
+            else:
+                qr_results = self.scanner.scan_frame_multi(frame)
+        elif not scene_active:
+            self.motion_gate.record_qr_skip()
+
+        if self.qr_worker is not None:
+            _, qr_results = self.qr_worker.results(QR_RESULT_MAX_AGE_SECONDS)
+            self.last_qr_rects = [qr_poly_to_rect(r["bbox"]) for r in qr_results if r.get("bbox") is not None]
+        result["qr"] = qr_results
+        self.timer.lap("qr")
+
+        if getattr(self.detector, "remote", False):
+            # Detection runs in its own process; use each new result once
+            should_infer = self.detector.poll()
+        else:
+            should_infer = self.cadence.should_infer()
+        if should_infer and self.motion_gate is not None:
+            self.motion_gate.record_inference(scene_active)
+            should_infer = scene_active
+        if should_infer:
+            t_infer = time.perf_counter()
+            detections = self._detect(frame)
+            infer_s = time.perf_counter() - t_infer
+            if getattr(self.detector, "remote", False):
+                infer_s = self.detector.last_inference_s   # measured in the detection process
+            self.cadence.record_inference(infer_s)
+            self.timer.lap("detect")
+            result["inferred"] = True
+            self.cached_detections = detections
+            self.cached_persons_compliance = self.ppe_history.update(
+                self.detector.per_person_compliance(detections)
+            )
+            self.boxes_time = self.clock()
+            self.box_motion.update(self.cached_persons_compliance, self.boxes_time)
+            self.timer.lap("compliance")
+        self._frame_detections = self.cached_detections
+
+        persons_compliance = self.cached_persons_compliance
+        now = self.clock()
+
+        # Mark currently visible tracks and keep them alive for a short grace period
+        # so worker info does not disappear immediately on brief dropouts.
+        visible_track_ids = set()
+        for pc in (persons_compliance or []):
+            tid = pc["person_det"].get("track_id")
+            if tid is not None:
+                tid = int(tid)
+                visible_track_ids.add(tid)
+                self.track_last_seen[tid] = now
+
+        for tid in list(self.track_last_seen.keys()):
+            if tid not in visible_track_ids and (now - self.track_last_seen[tid]) > WORKER_INFO_PERSIST_SECONDS:
+                self.track_last_seen.pop(tid, None)
+                identities.evict(tid)
+                self.ppe_history.evict(tid)
+                self.box_motion.evict(tid)
+
+        # Associate QR -> tracked person (IoU preferred, gated distance fallback)
+        persons = [pc for pc in (persons_compliance or []) if pc.get("person_det")]
+
+        # Optimal assignment over a gated IoU / distance cost matrix.
+        # Only tracked persons can hold an identity.
+        qr_items = [
+            (r["employee"], qr_poly_to_rect(r["bbox"]))
+            for r in qr_results
+            if r.get("employee") and r.get("bbox") is not None
+        ]
+        tracked_persons = [pc for pc in persons if pc["person_det"].get("track_id") is not None]
+        for qi, pi in self.qr_matcher.match(
+            [rect for _, rect in qr_items],
+            [pc["person_det"]["bbox"] for pc in tracked_persons]
+        ):
+            tid = tracked_persons[pi]["person_det"]["track_id"]
+            identities.bind(tid, qr_items[qi][0], now)
+        self.timer.lap("associate")
+
+        # Per-person reporting using stable track_id (drawn later by _render)
+        for pc in persons:
+            x1, y1, x2, y2 = pc["person_det"]["bbox"]
+            tid = pc["person_det"].get("track_id")
+            flags = {key: bool(pc.get(key)) for key in _PPE_KEYS}
+            safety_pct = int(pc.get("safety_percentage") or 0)
+            status = "READY" if all(flags.values()) else "NOT READY"
+
+            emp = identities.get(tid) if tid is not None else None
+
+            result["persons"].append({
+                "track_id": int(tid) if tid is not None else None,
+                "bbox": [x1, y1, x2, y2],
+                "employee_id": emp["id"] if emp else None,
+                "status": status,
+                "safety_percentage": safety_pct,
+                **flags,
+            })
+
+            if not emp:
+                continue
+
+            self.recent_workers[emp["id"]] = {
+                "name": emp["name"],
+                "id": emp["id"],
+                "department": emp.get("department", ""),
+                "role": emp.get("role", ""),
+                "has_helmet": flags["has_helmet"],
+                "has_vest": flags["has_vest"],
+                "safety_pct": safety_pct,
+                "status": status,
+                "last_seen": now,
+            }
+
+            self._report_person(emp, tid, flags, safety_pct, status, now, result)
+
+        self.timer.lap("report")
+
+    def _detect(self, frame):
+        return run_detection(self.detector, frame, imgsz=self.cadence.imgsz)
+
+    def _report_person(self, emp, tid, flags, safety_pct, status, now, result):
+        """
+        Permanent association + continuous reporting:
+        send to backend + update Excel when status changes or at a slow interval.
+        """
+        emp_id = emp["id"]
+        prev = self.last_sent.get(emp_id)
+        if prev is not None:
+            changed = (
+                prev["status"] != status or
+                prev["has_helmet"] != flags["has_helmet"] or
+                prev["has_vest"] != flags["has_vest"]
+            )
+            if not changed and (now - prev["t"]) < MULTI_REPORT_MIN_INTERVAL_SECONDS:
+                return
+
+        compliance = dict(flags)
+        compliance["missing"] = _missing_items(flags)
+        status_data = self.safety.evaluate(compliance)
+        status_data["safety_percentage"] = safety_pct
+        status_data["track_id"] = int(tid) if tid is not None else None
+
+        self._publish(emp, status_data, stage="report")
+        result["reports"].append({"employee_id": emp_id, "status": status, "source": "multi"})
+
+        self.last_sent[emp_id] = {
+            "status": status,
+            "has_helmet": flags["has_helmet"],
+            "has_vest": flags["has_vest"],
+            "t": now
+        }
+
+    def _publish(self, employee, status_data, stage):
+        # Excel and HTTP get their own timing stages; the work before them
+        # is charged to the caller's stage.
+        self.timer.lap(stage)
+        # Save/update local Excel (one row per employee)
+        if self.reporter is not None:
+            self.reporter.update_employee(employee, status_data)
+            self.timer.lap("excel")
+        # Publish to backend -> WebSocket -> frontend
+        if self.backend_reporter is not None:
+            self.backend_reporter.send_check_result(employee, status_data, camera_id=self.camera_id)
+            self.timer.lap("http")
+
+    def _reset_qr(self):
+        self.scanner.reset()   # stops scanner from re-triggering
+        if self.qr_worker is not None:
+            self.qr_worker.clear()
+
+    # ── Single-worker check state machine ───────────────────────────
+    def _update_state(self, frame, result):
+        now = self.clock()
+
+        # ══════════════════════════════════════════════════════════
+        # STATE: SCANNING — Wait for QR code
+        # ══════════════════════════════════════════════════════════
+        if self.state == SCANNING:
+            # Reuse the first recognized employee from the multi-person
+            # pass instead of decoding again.
+            employee = next((r["employee"] for r in result["qr"] if r.get("employee")), None)
+            if employee:
+                self.current_employee = employee
+                self.ppe_check_frames = 0
+                self.ppe_results_pool = []
+                self.countdown_timer  = now
+                self.state = COUNTDOWN
+                self._reset_qr()
+
+        # ══════════════════════════════════════════════════════════
+        # STATE: COUNTDOWN — Professional 5 second prep timer
+        # ══════════════════════════════════════════════════════════
+        elif self.state == COUNTDOWN:
+            elapsed = now - self.countdown_timer
+
+            # Transition
+            if elapsed >= COUNTDOWN_SECONDS:
+                self.state = CHECKING
+                print(f"[Pipeline] Countdown done → Starting PPE check for {self.current_employee['name']}")
+
+        # ══════════════════════════════════════════════════════════
+        # STATE: CHECKING — QR found, now check PPE
+        # ══════════════════════════════════════════════════════════
+        elif self.state == CHECKING:
+            # Reuse cached detections from the multi-person overlay
+            # instead of running detector.detect() again (halves GPU cost).
+            detections = self.cached_detections if self.cached_detections else self.detector.detect(frame)
+            compliance = self.detector.check_ppe_compliance(detections)
+            self._frame_detections = detections
+
+            # Collect result
+            self.ppe_results_pool.append(compliance)
+            self.ppe_check_frames += 1
+
+            # After enough frames, make final decision
+            if self.ppe_check_frames >= PPE_FRAMES_NEEDED:
+                self.current_status = self.safety.evaluate(self._vote_check())
+                self._publish(self.current_employee, self.current_status, stage="state")
+                result["decision"] = self.current_status
+                result["reports"].append({
+                    "employee_id": self.current_employee["id"],
+                    "status": self.current_status["status"],
+                    "source": "check",
+                })
+
+                self.result_timer = now
+                self.state = DISPLAYING
+                print(f"[Pipeline] Result → {self.current_status['status']}")
+
+        # ══════════════════════════════════════════════════════════
+        # STATE: DISPLAYING — Show result, then reset
+        # ══════════════════════════════════════════════════════════
+        elif self.state == DISPLAYING:
+            elapsed = now - self.result_timer
+
+            # Auto reset after display time
+            if elapsed >= RESULT_DISPLAY_SECONDS:
+                self.state = SCANNING
+                self._reset_qr()
+                self.current_employee = None
+                self.current_status   = None
+                print("\n[Pipeline] Ready for next worker...\n" + "-"*55)
+
+    # ── Overlay ──────────────────────────────────────────────────────
+    def _overlay_state(self, result):
+        """
+        Snapshot of everything _render draws for the state reached this
+        frame. Holds no references to state the pipeline mutates later, so
+        the display thread can keep drawing it while the next frame runs.
+        """
+        persons = []
+        for p in result["persons"]:
+            emp = self.identities.get(p["track_id"]) if p["employee_id"] else None
+            persons.append(dict(p, employee=emp))
+
+        panel = []
+        if SHOW_PERF_HUD:
+            panel += self.cadence.hud_lines()
+        if SHOW_PROFILER_PANEL and self.timer.profiler is not None:
+            panel += self.timer.profiler.panel_lines()
+
+        return {
+            "state": self.state,
+            "employee": self.current_employee,
+            "status": self.current_status,
+            "countdown_timer": self.countdown_timer,
+            "result_timer": self.result_timer,
+            "ppe_check_frames": self.ppe_check_frames,
+            "persons": persons,
+            "boxes_time": self.boxes_time,
+            "velocities": self.box_motion.snapshot() if persons else {},
+            "qr": list(result["qr"]),
+            "detections": self._frame_detections if DRAW_DETECTOR_BOXES else None,
+            "panel": panel,
+        }
+
+    def _render(self, frame, overlay, now):
+        """Draws an _overlay_state() snapshot as it should look at clock time `now`."""
+        h, w = frame.shape[:2]
+
+        if overlay["detections"]:
+            frame = self.detector.draw_boxes(frame, overlay["detections"])
+
+        # Boxes come from the last inference; move them along their track's
+        # velocity so they follow the person on frames in between
+        dt = min(max(0.0, now - overlay["boxes_time"]), DISPLAY_EXTRAPOLATE_MAX_SECONDS)
+        velocities = overlay["velocities"]
+
+        # Per-person boxes, worker info card only for identified employees
+        yn = lambda v: "Y" if v else "N"
+        for p in overlay["persons"]:
+            emp = p["employee"]
+            bbox = p["bbox"]
+            v = velocities.get(p["track_id"])
+            if v is not None and dt > 0:
+                bbox = [int(round(c + vc * dt)) for c, vc in zip(bbox, v)]
+            if emp:
+                color = ui.ACCENT_GREEN if p["status"] == "READY" else ui.ACCENT_RED
+            else:
+                color = ui.TEXT_MUTED
+            ui.draw_person_bbox(frame, bbox, color, is_identified=bool(emp))
+            if emp:
+                lines = [
+                    f"{emp['name']} ({emp['id']})",
+                    f"{emp.get('department','')} | {emp.get('role','')}",
+                    f"Helmet: {yn(p['has_helmet'])}  Vest: {yn(p['has_vest'])}  Gloves: {yn(p['has_gloves'])}",
+                    f"Goggles: {yn(p['has_goggles'])}  Boots: {yn(p['has_boots'])}",
+                    f"Safety: {p['safety_percentage']}%  Status: {p['status']}",
+                ]
+                ui.draw_worker_info_card(frame, lines, bbox, color, w, h)
+
+        # QR overlays (helpful for debugging association)
+        if overlay["qr"]:
+            frame = self.scanner.draw_qr_overlay_multi(frame, overlay["qr"])
+
+        # ── Top instruction banner ─────────────────────────────────
+        bar_h = ui.draw_top_banner(frame)
+
+        state = overlay["state"]
+        employee = overlay["employee"]
+        if state == SCANNING:
+            ui.draw_scanning_state(frame, bar_h)
+        elif state == COUNTDOWN:
+            elapsed = min(now - overlay["countdown_timer"], COUNTDOWN_SECONDS)
+            ui.draw_countdown(frame, employee, COUNTDOWN_SECONDS - int(elapsed),
+                              elapsed, COUNTDOWN_SECONDS)
+        elif state == CHECKING:
+            ui.draw_checking_banner(frame, employee['name'],
+                                    overlay["ppe_check_frames"], PPE_FRAMES_NEEDED, bar_h)
+        elif state == DISPLAYING:
+            # Draw modern result overlay + countdown to the next check
+            frame = ui.draw_result_overlay(frame, overlay["status"], employee)
+            remaining = max(0, int(RESULT_DISPLAY_SECONDS - (now - overlay["result_timer"])))
+            ui.draw_next_check_timer(frame, remaining)
+            ui.draw_saved_confirmation(frame)
+
+        if overlay["panel"]:
+            ui.draw_debug_panel(frame, overlay["panel"], title="Performance")
+        return frame
+
+    @staticmethod
+    def _render_offline(frame, camera):
+        """The camera-offline screen, drawn on the camera's placeholder frame."""
+        health = getattr(camera, "health", None)
+        ui.draw_camera_offline(frame, health.status_lines() if health is not None else [])
+        return frame
+
+    def _vote_check(self):
+        """Majority vote across the frames collected in CHECKING."""
+        pool = self.ppe_results_pool
+        half = PPE_FRAMES_NEEDED // 2
+        goggles_threshold = max(3, PPE_FRAMES_NEEDED // 3)
+        final_compliance = {}
+        for key in _PPE_KEYS:
+            votes = sum(1 for r in pool if r.get(key))
+            final_compliance[key] = votes >= (goggles_threshold if key == "has_goggles" else half)
+        final_compliance["missing"] = _missing_items(final_compliance)
+        return final_compliance
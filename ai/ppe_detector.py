@@ -1,13 +1,20 @@
 from ultralytics import YOLO
+import math
 import cv2
+import numpy as np
 
 class PPEDetector:
     # Minimum confidence to keep a detection (filters noise)
     MIN_CONFIDENCE = 0.30
 
     def __init__(self, model_path="ppe_model.pt"):
-        self.model = YOLO(model_path)
-        print(f"[PPEDetector] Model loaded → {model_path}")
+        # model_path=None: compliance rules and drawing only, no model
+        # (the multi-process pipeline runs YOLO in its own process)
+        self.model_path = model_path
+        self.model = YOLO(model_path) if model_path else None
+        if self.model is not None:
+            print(f"[PPEDetector] Model loaded → {model_path}")
+        self._crop_model = None    # cascaded mode's crop pass (see _crop_predictor)
 
         self.CLASS_CONFIDENCE = {"goggles": 0.15}
 
@@ -19,42 +26,28 @@ class PPEDetector:
         self.PERSON_CLASSES    = ["person"]
         self.VIOLATION_CLASSES = ["no_helmet", "no_goggle", "no_gloves", "no_boots"]
 
-    def detect(self, frame):
-        """Runs detection and returns list of detected objects"""
-        results     = self.model(frame, verbose=False)
-        detections  = []
-
-        for result in results:
-            for box in result.boxes:
-                class_id    = int(box.cls[0])
-                confidence  = float(box.conf[0])
-                class_name  = self.model.names[class_id]
-                min_conf    = self.CLASS_CONFIDENCE.get(class_name.lower(), self.MIN_CONFIDENCE)
-                if confidence < min_conf:
-                    continue
-                bbox        = box.xyxy[0].tolist()
-
-                detections.append({
-                    "class_id":   class_id,
-                    "class_name": class_name,
-                    "confidence": round(confidence, 2),
-                    "bbox":       [int(b) for b in bbox]
-                })
+        # Cascaded mode: which classes to keep from each person-crop region.
+        # (x1, y1, x2, y2) are fractions of the person bbox; values outside
+        # 0..1 extend the crop beyond the box (helmets above, boots below).
+        self.CROP_REGIONS = {
+            "head":  ((-0.05, -0.35, 1.05, 0.40), ["helmet", "goggles", "no_helmet", "no_goggle"]),
+            "hands": ((-0.20,  0.30, 1.20, 0.85), ["gloves", "no_gloves"]),
+            "feet":  ((-0.05,  0.70, 1.05, 1.20), ["boots", "no_boots"]),
+        }
 
-        return detections
+        # Tiled mode: tile layouts cached per (w, h, tile, overlap) and a
+        # standalone ByteTrack instance fed with the merged person boxes.
+        self._tile_layouts = {}
+        self._tile_tracker = None
+        self._tile_tracker_errors = 0
 
-    def detect_with_tracks(self, frame, tracker="bytetrack.yaml"):
+    def _results_to_detections(self, results, offset=(0, 0), with_tracks=False, keep=None):
         """
-        Runs detection + tracking using Ultralytics trackers (ByteTrack by default).
-        Returns detections like detect(), but includes:
-          - track_id (int) when available
+        Converts Ultralytics results to detection dicts.
+        `offset` shifts boxes into frame coordinates (used for crops) and
+        `keep` optionally restricts the lower-cased class names returned.
         """
-        try:
-            results = self.model.track(frame, persist=True, tracker=tracker, verbose=False)
-        except Exception:
-            # Fallback to plain detect if track() is not supported in this env
-            return self.detect(frame)
-
+        ox, oy = offset
         detections = []
         for result in results:
             boxes = getattr(result, "boxes", None)
@@ -65,28 +58,50 @@ class PPEDetector:
                 class_id = int(box.cls[0])
                 confidence = float(box.conf[0])
                 class_name = self.model.names[class_id]
+                if keep is not None and class_name.lower() not in keep:
+                    continue
                 min_conf = self.CLASS_CONFIDENCE.get(class_name.lower(), self.MIN_CONFIDENCE)
                 if confidence < min_conf:
                     continue
-                bbox = box.xyxy[0].tolist()
-
-                track_id = None
-                try:
-                    if getattr(box, "id", None) is not None:
-                        track_id = int(box.id[0])
-                except Exception:
-                    track_id = None
+                x1, y1, x2, y2 = box.xyxy[0].tolist()
 
-                detections.append({
+                det = {
                     "class_id": class_id,
                     "class_name": class_name,
                     "confidence": round(confidence, 2),
-                    "bbox": [int(b) for b in bbox],
-                    "track_id": track_id,
-                })
+                    "bbox": [int(x1 + ox), int(y1 + oy), int(x2 + ox), int(y2 + oy)],
+                }
+                if with_tracks:
+                    track_id = None
+                    try:
+                        if getattr(box, "id", None) is not None:
+                            track_id = int(box.id[0])
+                    except Exception:
+                        track_id = None
+                    det["track_id"] = track_id
+                detections.append(det)
 
         return detections
 
+    def detect(self, frame):
+        """Runs detection and returns list of detected objects"""
+        results = self.model(frame, verbose=False)
+        return self._results_to_detections(results)
+
+    def detect_with_tracks(self, frame, tracker="bytetrack.yaml"):
+        """
+        Runs detection + tracking using Ultralytics trackers (ByteTrack by default).
+        Returns detections like detect(), but includes:
+          - track_id (int) when available
+        """
+        try:
+            results = self.model.track(frame, persist=True, tracker=tracker, verbose=False)
+        except Exception:
+            # Fallback to plain detect if track() is not supported in this env
+            return self.detect(frame)
+
+        return self._results_to_detections(results, with_tracks=True)
+
     def detect_with_tracks_fast(self, frame, tracker="bytetrack.yaml", imgsz=None):
         """
         Same as detect_with_tracks(), but allows reducing inference size via imgsz.
@@ -99,35 +114,265 @@ class PPEDetector:
         except Exception:
             return self.detect(frame)
 
-        detections = []
-        for result in results:
-            boxes = getattr(result, "boxes", None)
-            if boxes is None:
-                continue
+        return self._results_to_detections(results, with_tracks=True)
 
-            for box in boxes:
-                class_id = int(box.cls[0])
-                confidence = float(box.conf[0])
-                class_name = self.model.names[class_id]
-                min_conf = self.CLASS_CONFIDENCE.get(class_name.lower(), self.MIN_CONFIDENCE)
-                if confidence < min_conf:
+    def reset_tracking(self):
+        """
+        Forgets all ByteTrack state (track IDs restart at 1), e.g. between
+        unrelated clips. model.track(persist=True) keeps its trackers on the
+        model's predictor, so they would otherwise carry over.
+        """
+        predictor = getattr(self.model, "predictor", None)
+        for tracker in (getattr(predictor, "trackers", None) or []):
+            tracker.reset()
+        if self._tile_tracker is not None:
+            self._tile_tracker.reset()
+
+    def _person_crops(self, frame, persons, max_persons):
+        """
+        Builds (region_name, x1, y1, crop) for the head / hands / feet of each
+        person, clipped to the frame. Largest persons are processed first.
+        """
+        fh, fw = frame.shape[:2]
+        persons = sorted(
+            persons,
+            key=lambda p: (p["bbox"][2] - p["bbox"][0]) * (p["bbox"][3] - p["bbox"][1]),
+            reverse=True
+        )[:max_persons]
+
+        crops = []
+        for p in persons:
+            px1, py1, px2, py2 = p["bbox"]
+            pw, ph = px2 - px1, py2 - py1
+            if pw < 8 or ph < 8:
+                continue
+            for region, ((fx1, fy1, fx2, fy2), _) in self.CROP_REGIONS.items():
+                x1 = max(0, int(px1 + fx1 * pw))
+                y1 = max(0, int(py1 + fy1 * ph))
+                x2 = min(fw, int(px1 + fx2 * pw))
+                y2 = min(fh, int(py1 + fy2 * ph))
+                if x2 - x1 < 8 or y2 - y1 < 8:
                     continue
-                bbox = box.xyxy[0].tolist()
+                crops.append((region, x1, y1, frame[y1:y2, x1:x2]))
+        return crops
 
-                track_id = None
-                try:
-                    if getattr(box, "id", None) is not None:
-                        track_id = int(box.id[0])
-                except Exception:
-                    track_id = None
+    def _nms_merge(self, detections, iou_threshold=0.5, partial=None, ios_threshold=0.6):
+        """
+        Class-wise NMS over merged detections (keeps the highest confidence).
+        `partial` optionally flags boxes cut by a tile seam: those are also
+        removed when `ios_threshold` of their own area lies inside a kept box
+        (intersection over the smaller box), and lose ties to whole boxes.
+        Whole boxes are only compared by IoU, so a partly occluded worker
+        standing behind another one is not merged away.
+        """
+        if len(detections) < 2:
+            return detections
+
+        boxes = np.array([d["bbox"] for d in detections], dtype=np.float32)
+        scores = np.array([d["confidence"] for d in detections], dtype=np.float32)
+        classes = np.array([d["class_id"] for d in detections])
+        areas = np.maximum(0, boxes[:, 2] - boxes[:, 0]) * np.maximum(0, boxes[:, 3] - boxes[:, 1])
+        partial = (np.zeros(len(detections), dtype=bool) if partial is None
+                   else np.asarray(partial, dtype=bool))
+
+        # Whole boxes first, then prefer full-frame (tracked) boxes on ties so track_id survives
+        tracked = np.array([d.get("track_id") is not None for d in detections], dtype=np.float32)
+        order = np.lexsort((-tracked, -scores, partial))
+        suppressed = np.zeros(len(detections), dtype=bool)
+        keep = []
+        for i in order:
+            if suppressed[i]:
+                continue
+            keep.append(i)
+            same = (classes == classes[i]) & ~suppressed
+            same[i] = False
+            if not same.any():
+                continue
+            idx = np.nonzero(same)[0]
+            ix1 = np.maximum(boxes[i, 0], boxes[idx, 0])
+            iy1 = np.maximum(boxes[i, 1], boxes[idx, 1])
+            ix2 = np.minimum(boxes[i, 2], boxes[idx, 2])
+            iy2 = np.minimum(boxes[i, 3], boxes[idx, 3])
+            inter = np.maximum(0, ix2 - ix1) * np.maximum(0, iy2 - iy1)
+            iou = inter / np.maximum(areas[i] + areas[idx] - inter, 1e-6)
+            drop = iou >= iou_threshold
+            if partial.any():
+                ios = inter / np.maximum(np.minimum(areas[i], areas[idx]), 1e-6)
+                drop |= partial[idx] & (ios >= ios_threshold)
+            suppressed[idx[drop]] = True
+
+        return [detections[i] for i in sorted(keep)]
+
+    def _crop_predictor(self):
+        """
+        Second YOLO instance (same weights) for the crop batch. model.track()
+        registers ByteTrack callbacks on self.model's predictor, so running
+        crops through self.model would feed every crop to the person tracker
+        in crop coordinates, advancing it and breaking real tracks.
+        """
+        if self._crop_model is None:
+            self._crop_model = YOLO(self.model_path)
+        return self._crop_model
 
-                detections.append({
-                    "class_id": class_id,
-                    "class_name": class_name,
-                    "confidence": round(confidence, 2),
-                    "bbox": [int(b) for b in bbox],
-                    "track_id": track_id,
-                })
+    def detect_cascaded(self, frame, imgsz=None, crop_imgsz=320, use_tracks=True,
+                        tracker="bytetrack.yaml", max_persons=8):
+        """
+        Two-stage detection for small PPE (goggles, gloves, boots).
+        1. Full-frame pass at `imgsz` (with tracking) finds persons + large PPE.
+        2. Head / hands / feet crops of each person are run as ONE batch at
+           `crop_imgsz`, so small items get many more pixels.
+        Crop detections are shifted back into frame coordinates and merged
+        with the first pass using class-wise NMS, so the result can be fed
+        straight into per_person_compliance().
+        """
+        if use_tracks:
+            detections = self.detect_with_tracks_fast(frame, tracker=tracker, imgsz=imgsz)
+        else:
+            results = self.model(frame, imgsz=int(imgsz), verbose=False) if imgsz else self.model(frame, verbose=False)
+            detections = self._results_to_detections(results)
+
+        persons = [d for d in detections if self._is_class(d, self.PERSON_CLASSES)]
+        if not persons:
+            return detections
+
+        crops = self._person_crops(frame, persons, max_persons)
+        if not crops:
+            return detections
+
+        try:
+            crop_results = self._crop_predictor()([c[3] for c in crops], imgsz=int(crop_imgsz),
+                                                  verbose=False)
+        except Exception as e:
+            print(f"[PPEDetector] Crop pass failed: {e}")
+            return detections
+
+        extra = []
+        for (region, x1, y1, _), result in zip(crops, crop_results):
+            keep = self.CROP_REGIONS[region][1]
+            extra.extend(self._results_to_detections([result], offset=(x1, y1), keep=keep))
+
+        return self._nms_merge(detections + extra)
+
+    def _tile_layout(self, width, height, tile_size, overlap):
+        """
+        Returns [(x1, y1, x2, y2), ...] tiles covering the frame with at least
+        `overlap` (fraction) overlap. Cached per resolution.
+        """
+        key = (width, height, int(tile_size), round(float(overlap), 3))
+        layout = self._tile_layouts.get(key)
+        if layout is not None:
+            return layout
+
+        def starts(length):
+            tile = min(int(tile_size), length)
+            if length <= tile:
+                return [0], tile
+            step = max(1, int(tile * (1.0 - overlap)))
+            n = int(math.ceil((length - tile) / float(step))) + 1
+            # Spread tiles evenly so the last one ends exactly at the border
+            return [int(round(i * (length - tile) / float(n - 1))) for i in range(n)], tile
+
+        xs, tw = starts(width)
+        ys, th = starts(height)
+        layout = [(x, y, x + tw, y + th) for y in ys for x in xs]
+        self._tile_layouts[key] = layout
+        return layout
+
+    def init_tile_tracker(self, tracker="bytetrack.yaml"):
+        """
+        Builds the standalone ByteTrack instance used by detect_tiled().
+        Raises RuntimeError if this Ultralytics version does not provide the
+        tracker API, so a misconfigured station fails at startup instead of
+        silently running without track IDs.
+        """
+        if self._tile_tracker is not None:
+            return
+        try:
+            from ultralytics.trackers.byte_tracker import BYTETracker
+            from ultralytics.utils import IterableSimpleNamespace, YAML
+            from ultralytics.utils.checks import check_yaml
+            cfg = IterableSimpleNamespace(**YAML.load(check_yaml(tracker)))
+            self._tile_tracker = BYTETracker(args=cfg, frame_rate=30)
+        except Exception as e:
+            raise RuntimeError(
+                f"Tiled inference with tracking needs Ultralytics' BYTETracker ({e}); "
+                f"update ultralytics or set USE_BYTE_TRACK = False"
+            ) from e
+
+    def _track_persons(self, frame, persons, tracker):
+        """
+        Assigns track_id to merged person detections with a standalone
+        Ultralytics ByteTrack instance. If an update fails, the tracker is
+        reset and this frame's persons keep track_id None; the next frame
+        tries again.
+        """
+        for p in persons:
+            p["track_id"] = None
+        self.init_tile_tracker(tracker)
+
+        try:
+            from ultralytics.engine.results import Boxes
+            if persons:
+                data = np.array(
+                    [p["bbox"] + [p["confidence"], p["class_id"]] for p in persons],
+                    dtype=np.float32
+                )
+            else:
+                data = np.zeros((0, 6), dtype=np.float32)
+            tracks = self._tile_tracker.update(Boxes(data, frame.shape[:2]), frame)
+            for t in (tracks if tracks is not None else []):
+                idx = int(t[-1])
+                if 0 <= idx < len(persons):
+                    persons[idx]["track_id"] = int(t[4])
+            self._tile_tracker_errors = 0
+        except Exception as e:
+            self._tile_tracker_errors += 1
+            self._tile_tracker.reset()
+            if self._tile_tracker_errors == 1 or self._tile_tracker_errors % 100 == 0:
+                print(f"[PPEDetector] Tiled tracking failed ({e}) — tracker reset "
+                      f"({self._tile_tracker_errors} consecutive failures)")
+
+    @staticmethod
+    def _touches_seam(bbox, tile, width, height, margin=4):
+        """True if `bbox` reaches an edge of `tile` that is inside the frame
+        (the object was probably cut there)."""
+        bx1, by1, bx2, by2 = bbox
+        tx1, ty1, tx2, ty2 = tile
+        return ((tx1 > 0 and bx1 <= tx1 + margin) or (ty1 > 0 and by1 <= ty1 + margin) or
+                (tx2 < width and bx2 >= tx2 - margin) or (ty2 < height and by2 >= ty2 - margin))
+
+    def detect_tiled(self, frame, tile_size=640, overlap=0.2, imgsz=None,
+                     include_full_frame=True, use_tracks=True,
+                     tracker="bytetrack.yaml"):
+        """
+        SAHI-style sliced inference for high-resolution / wide-angle frames.
+        The frame is cut into overlapping tiles (plus, optionally, the full
+        frame for large subjects) and all of them run as ONE batch. Boxes are
+        shifted back to frame coordinates and merged with cross-tile NMS;
+        persons then get stable IDs from a ByteTrack instance, so the output
+        is a drop-in for detect_with_tracks_fast().
+        """
+        h, w = frame.shape[:2]
+        layout = self._tile_layout(w, h, tile_size, overlap)
+        regions = list(layout)
+        if include_full_frame and len(layout) > 1:
+            regions.append((0, 0, w, h))
+
+        batch = [frame[y1:y2, x1:x2] for (x1, y1, x2, y2) in regions]
+        results = self.model(batch, imgsz=int(imgsz or tile_size), verbose=False)
+
+        detections = []
+        partial = []
+        for (x1, y1, x2, y2), result in zip(regions, results):
+            found = self._results_to_detections([result], offset=(x1, y1))
+            detections.extend(found)
+            partial.extend(self._touches_seam(d["bbox"], (x1, y1, x2, y2), w, h) for d in found)
+
+        detections = self._nms_merge(detections, partial=partial)
+
+        if use_tracks:
+            persons = [d for d in detections if self._is_class(d, self.PERSON_CLASSES)]
+            self._track_persons(frame, persons, tracker)
 
         return detections
 
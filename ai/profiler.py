@@ -0,0 +1,224 @@
+"""
+profiler.py  —  Rolling per-stage latency histograms for the vision loop
+
+StageTimer hands the per-frame stage timings to a StageProfiler once per
+frame.  Each stage keeps an HDR-style histogram: buckets are log-linear
+(16 sub-buckets per power of two of microseconds, ~3% relative error)
+so one fixed-size integer array covers 1 µs … 1 min.  A ring of interval
+histograms makes it rolling — only the last `window_seconds` count.
+
+Views on the same data:
+  - panel_lines()      : on-screen debug panel (ui.draw_debug_panel)
+  - log_lines()        : periodic [Profiler] log lines
+  - prometheus_text()  : `/metrics` served by MetricsServer
+
+Nothing here runs unless PROFILING_ENABLED is set; StageTimer then only
+pays one `is None` check per frame.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+_SUB_BITS = 5                        # 2^5 = 32 linear buckets below 32 µs
+_SUB = 1 << _SUB_BITS
+_HALF = _SUB >> 1                    # sub-buckets per power of two above that
+_MAX_US = 60 * 1000 * 1000           # values above one minute are clamped
+_N_BUCKETS = _SUB + (_MAX_US.bit_length() - _SUB_BITS) * _HALF
+
+
+def bucket_index(us):
+    """Histogram bucket of an integer microsecond value."""
+    if us < _SUB:
+        return us if us > 0 else 0
+    if us > _MAX_US:
+        us = _MAX_US
+    shift = us.bit_length() - _SUB_BITS
+    return _SUB + (shift - 1) * _HALF + ((us >> shift) - _HALF)
+
+
+def _bucket_midpoints():
+    mids = np.zeros(_N_BUCKETS, dtype=np.float64)
+    mids[:_SUB] = np.arange(_SUB)
+    k = np.arange(_N_BUCKETS - _SUB)
+    shift = k // _HALF + 1
+    mantissa = _HALF + k % _HALF
+    low = mantissa.astype(np.float64) * (2.0 ** shift)
+    mids[_SUB:] = low + (2.0 ** shift - 1.0) / 2.0
+    return mids
+
+
+_MIDPOINTS_US = _bucket_midpoints()
+
+
+class RollingHistogram:
+    def __init__(self, window_seconds=60.0, intervals=6):
+        """The last `window_seconds`, kept as `intervals` rotating sub-histograms."""
+        self.intervals = max(1, int(intervals))
+        self.interval_seconds = float(window_seconds) / self.intervals
+        self._ring = np.zeros((self.intervals, _N_BUCKETS), dtype=np.int64)
+        self._slot_id = None
+        self._slot = 0
+        self.count = 0          # whole-run totals (Prometheus _count / _sum)
+        self.total_s = 0.0
+
+    def advance(self, now):
+        """Rotates the ring so the current slot covers `now`; clears expired slots."""
+        slot_id = int(now / self.interval_seconds)
+        if self._slot_id is None:
+            self._slot_id = slot_id
+            return
+        steps = slot_id - self._slot_id
+        if steps <= 0:
+            return
+        for _ in range(min(steps, self.intervals)):
+            self._slot = (self._slot + 1) % self.intervals
+            self._ring[self._slot] = 0
+        self._slot_id = slot_id
+
+    def record(self, seconds):
+        self._ring[self._slot, bucket_index(int(seconds * 1e6))] += 1
+        self.count += 1
+        self.total_s += seconds
+
+    def percentiles(self, quantiles=(0.5, 0.95, 0.99)):
+        """(window_count, [seconds per quantile]) over the rolling window."""
+        counts = self._ring.sum(axis=0)
+        n = int(counts.sum())
+        if n == 0:
+            return 0, [None] * len(quantiles)
+        cum = np.cumsum(counts)
+        out = []
+        for q in quantiles:
+            idx = int(np.searchsorted(cum, max(1, int(np.ceil(q * n)))))
+            out.append(float(_MIDPOINTS_US[idx]) / 1e6)
+        return n, out
+
+
+class StageProfiler:
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, window_seconds=60.0, intervals=6, panel_refresh_seconds=0.5):
+        self.window_seconds = float(window_seconds)
+        self.intervals = intervals
+        self.panel_refresh_seconds = float(panel_refresh_seconds)
+        self._hists = {}         # stage -> RollingHistogram (insertion = loop order)
+        self._lock = threading.Lock()
+        self._panel_cache = (0.0, [])
+
+    def record_frame(self, timings, now=None):
+        """Records one frame's {stage: seconds} plus their sum as "frame"."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            # Advance every stage, so stages that stop running (e.g. QR outside
+            # SCANNING) age out of the window too
+            for h in self._hists.values():
+                h.advance(now)
+            total = 0.0
+            for stage, seconds in timings.items():
+                self._hist(stage, now).record(seconds)
+                total += seconds
+            self._hist("frame", now).record(total)
+
+    def _hist(self, stage, now):
+        h = self._hists.get(stage)
+        if h is None:
+            h = self._hists[stage] = RollingHistogram(self.window_seconds, self.intervals)
+            h.advance(now)
+        return h
+
+    def snapshot(self):
+        """{stage: {"window_count", "p50_ms", "p95_ms", "p99_ms", "count", "sum_s"}}."""
+        now = time.monotonic()
+        with self._lock:
+            out = {}
+            for stage, h in self._hists.items():
+                h.advance(now)
+                n, qs = h.percentiles(self.QUANTILES)
+                row = {"window_count": n, "count": h.count, "sum_s": h.total_s}
+                for q, v in zip(self.QUANTILES, qs):
+                    row[f"p{int(q * 100)}_ms"] = None if v is None else round(v * 1000.0, 2)
+                out[stage] = row
+            return out
+
+    # ── Views ─────────────────────────────────────────────────────────
+    @staticmethod
+    def _fmt(v):
+        return "--" if v is None else f"{v:.1f}"
+
+    def log_lines(self):
+        lines = [f"p50 / p95 / p99 ms over the last {self.window_seconds:g}s"]
+        for stage, s in self.snapshot().items():
+            lines.append(f"  {stage:<10} {self._fmt(s['p50_ms']):>7} {self._fmt(s['p95_ms']):>7} "
+                         f"{self._fmt(s['p99_ms']):>7}   n={s['window_count']}")
+        return lines
+
+    def panel_lines(self):
+        """Short lines for ui.draw_debug_panel, recomputed at most every refresh period."""
+        now = time.monotonic()
+        t, lines = self._panel_cache
+        if now - t < self.panel_refresh_seconds and lines:
+            return lines
+        lines = [f"{'stage':<9}  p50   p95   p99 ms"]
+        for stage, s in self.snapshot().items():
+            lines.append(f"{stage:<9} {self._fmt(s['p50_ms']):>5} {self._fmt(s['p95_ms']):>5} "
+                         f"{self._fmt(s['p99_ms']):>5}")
+        self._panel_cache = (now, lines)
+        return lines
+
+    def prometheus_text(self, prefix="industriguard_ai"):
+        name = f"{prefix}_stage_latency_seconds"
+        lines = [
+            f"# HELP {name} Per-frame time spent in each vision loop stage "
+            f"(quantiles over the last {self.window_seconds:g}s).",
+            f"# TYPE {name} summary",
+        ]
+        for stage, s in self.snapshot().items():
+            for q in self.QUANTILES:
+                v = s[f"p{int(q * 100)}_ms"]
+                if v is not None:
+                    lines.append(f'{name}{{stage="{stage}",quantile="{q:g}"}} {v / 1000.0:.6f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {s["sum_s"]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {s["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+# ── Local /metrics endpoint ──────────────────────────────────────────────
+class MetricsServer:
+    """
+    Serves `/metrics` (Prometheus text format) from a daemon thread.
+    `sources` are callables returning exposition text; their outputs are
+    concatenated, so other components can add their own metrics.
+    """
+
+    def __init__(self, sources, host="127.0.0.1", port=9108):
+        self.sources = list(sources)
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = "".join(src() for src in server.sources).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):   # keep the console quiet
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, int(port)), _Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        print(f"[Profiler] Metrics at http://{host}:{self.port}/metrics")
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
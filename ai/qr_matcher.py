@@ -0,0 +1,112 @@
+"""
+qr_matcher.py  —  QR badge → tracked person association
+
+Builds an IoU / center-distance cost matrix between decoded QR codes and
+person boxes with NumPy and solves it as an assignment problem (Hungarian
+method via scipy).  Pairs that fail the gating thresholds are never
+matched, so a badge held up next to a worker is not bound to someone
+standing across the frame.
+"""
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:   # scipy is optional — fall back to greedy matching
+    linear_sum_assignment = None
+
+_GATED = 1e6   # cost of a pair rejected by the gates
+
+
+def qr_poly_to_rect(qr_poly):
+    """4-point QR polygon → [x1, y1, x2, y2]."""
+    pts = np.asarray(qr_poly).reshape(-1, 2)
+    xs = pts[:, 0]
+    ys = pts[:, 1]
+    return [int(xs.min()), int(ys.min()), int(xs.max()), int(ys.max())]
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU between boxes a (N,4) and b (M,4) → (N,M)."""
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+    area_a = np.clip(a[:, 2] - a[:, 0], 0, None) * np.clip(a[:, 3] - a[:, 1], 0, None)
+    area_b = np.clip(b[:, 2] - b[:, 0], 0, None) * np.clip(b[:, 3] - b[:, 1], 0, None)
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-6), 0.0)
+
+
+def center_distance_matrix(a, b):
+    """Pairwise Euclidean distance between box centers → (N,M)."""
+    a = np.asarray(a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float32).reshape(-1, 4)
+    ca = np.stack([(a[:, 0] + a[:, 2]) / 2.0, (a[:, 1] + a[:, 3]) / 2.0], axis=1)
+    cb = np.stack([(b[:, 0] + b[:, 2]) / 2.0, (b[:, 1] + b[:, 3]) / 2.0], axis=1)
+    return np.linalg.norm(ca[:, None, :] - cb[None, :, :], axis=2)
+
+
+class QRPersonMatcher:
+    def __init__(self, min_iou=0.05, max_dist_ratio=1.0):
+        """
+        min_iou        : IoU at or above which a QR/person pair is an
+                         overlap match (always preferred over distance)
+        max_dist_ratio : distance fallback gate — QR center may be at most
+                         this many person-box diagonals from the person center
+        """
+        self.min_iou = float(min_iou)
+        self.max_dist_ratio = float(max_dist_ratio)
+
+    def cost_matrix(self, qr_rects, person_rects):
+        """
+        Overlapping pairs cost 1 - IoU (in [0, 1)); distance-only pairs cost
+        1 + normalized distance (in [1, 2]); gated pairs cost _GATED.
+        """
+        iou = iou_matrix(qr_rects, person_rects)
+        dist = center_distance_matrix(qr_rects, person_rects)
+        p = np.asarray(person_rects, dtype=np.float32).reshape(-1, 4)
+        diag = np.hypot(p[:, 2] - p[:, 0], p[:, 3] - p[:, 1])
+        norm_dist = dist / np.maximum(diag[None, :], 1.0)
+
+        cost = np.full(iou.shape, _GATED, dtype=np.float64)
+        dist_ok = norm_dist <= self.max_dist_ratio
+        cost[dist_ok] = 1.0 + norm_dist[dist_ok] / max(self.max_dist_ratio, 1e-6)
+        overlap = iou >= self.min_iou
+        cost[overlap] = 1.0 - iou[overlap]
+        return cost
+
+    def match(self, qr_rects, person_rects):
+        """
+        Returns [(qr_index, person_index), ...] — each QR and each person is
+        used at most once and gated pairs are never returned.
+        """
+        if len(qr_rects) == 0 or len(person_rects) == 0:
+            return []
+
+        cost = self.cost_matrix(qr_rects, person_rects)
+
+        if linear_sum_assignment is not None:
+            rows, cols = linear_sum_assignment(cost)
+            pairs = zip(rows.tolist(), cols.tolist())
+        else:
+            pairs = self._greedy(cost)
+
+        return [(int(r), int(c)) for r, c in pairs if cost[r, c] < _GATED]
+
+    @staticmethod
+    def _greedy(cost):
+        """Lowest-cost-first matching (used only when scipy is missing)."""
+        order = np.argsort(cost, axis=None)
+        used_r, used_c, pairs = set(), set(), []
+        for flat in order.tolist():
+            r, c = divmod(flat, cost.shape[1])
+            if r in used_r or c in used_c:
+                continue
+            used_r.add(r)
+            used_c.add(c)
+            pairs.append((r, c))
+        return pairs
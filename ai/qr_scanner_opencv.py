@@ -1,12 +1,23 @@
 import cv2
 import json
 import os
+import time
+import threading
+from collections import OrderedDict
 
 class QRScanner:
-    def __init__(self, employees_file="employee_data/employees.json"):
+    # Unknown payloads are remembered for this long (no lookups, one log line)
+    UNKNOWN_QR_TTL_SECONDS = 30.0
+    UNKNOWN_QR_MAX_ENTRIES = 256
+
+    def __init__(self, employees_file="employee_data/employees.json",
+                 unknown_ttl_seconds=UNKNOWN_QR_TTL_SECONDS):
         self.employees_file = employees_file
         self.employee_db    = self._load_employees()
         self.qr_detector    = cv2.QRCodeDetector()
+        self.unknown_ttl_seconds = float(unknown_ttl_seconds)
+        self._unknown_qr    = OrderedDict()   # raw -> expiry time (negative cache)
+        self._unknown_lock  = threading.Lock()  # lookup() may run on the QR worker thread
 
         self.current_employee = None
         self.scan_confirmed   = False
@@ -25,6 +36,28 @@ class QRScanner:
 
         return {emp["id"]: emp for emp in data["employees"]}
 
+    def lookup(self, raw):
+        """
+        Employee for a decoded payload, or None. Unknown payloads go into a
+        small negative cache so repeated sightings skip the lookup and are
+        logged only once per TTL.
+        """
+        now = time.time()
+        with self._unknown_lock:
+            expiry = self._unknown_qr.get(raw)
+            if expiry is not None:
+                if now < expiry:
+                    return None
+                del self._unknown_qr[raw]
+
+            employee = self.employee_db.get(raw)
+            if employee is None:
+                print(f"[QRScanner] Unknown QR code: {raw}")
+                self._unknown_qr[raw] = now + self.unknown_ttl_seconds
+                while len(self._unknown_qr) > self.UNKNOWN_QR_MAX_ENTRIES:
+                    self._unknown_qr.popitem(last=False)
+        return employee
+
     def scan_frame(self, frame):
         data, bbox, _ = self.qr_detector.detectAndDecode(frame)
         self._last_bbox = bbox  # cache for draw_qr_overlay
@@ -33,15 +66,13 @@ class QRScanner:
             raw_data = data.strip()
             print(f"[QRScanner] QR Detected: {raw_data}")
 
-            if raw_data in self.employee_db:
-                employee = self.employee_db[raw_data]
+            employee = self.lookup(raw_data)
+            if employee:
                 self.current_employee = employee
                 self.scan_confirmed   = True
                 print(f"[QRScanner] Employee Identified: {employee['id']} — {employee['name']}")
                 return employee
-            else:
-                print(f"[QRScanner] Unknown QR code: {raw_data}")
-                return None
+            return None
 
         return None
 
@@ -64,7 +95,7 @@ class QRScanner:
             data, bbox, _ = self.qr_detector.detectAndDecode(frame)
             if data:
                 raw = data.strip()
-                employee = self.employee_db.get(raw)
+                employee = self.lookup(raw)
                 results.append({
                     "raw": raw,
                     "employee": employee,
@@ -77,7 +108,7 @@ class QRScanner:
             if not data:
                 continue
             raw = data.strip()
-            employee = self.employee_db.get(raw)
+            employee = self.lookup(raw)
             bbox = None
             if points is not None and i < len(points) and points[i] is not None:
                 bbox = points[i].astype(int)
@@ -90,6 +121,52 @@ class QRScanner:
 
         return results
 
+    def decode_region(self, image, offset=(0, 0), scale=1.0, detector=None, multi=False):
+        """
+        Decodes QR codes in an image region (an ROI crop, possibly resized by
+        `scale`). Polygons are mapped back to full-frame coordinates.
+        ROI crops normally hold a single badge, so the cheaper single
+        detectAndDecode is used unless `multi` is set.
+        Pass a separate `detector` when calling from another thread.
+        """
+        det = detector or self.qr_detector
+        ox, oy = offset
+        found = []
+
+        if multi:
+            try:
+                ok, decoded_info, points, _ = det.detectAndDecodeMulti(image)
+            except Exception:
+                ok, decoded_info, points = False, [], None
+            if ok and decoded_info:
+                for i, data in enumerate(decoded_info):
+                    if data:
+                        pts = points[i] if points is not None and i < len(points) else None
+                        found.append((data, pts))
+        else:
+            try:
+                data, pts, _ = det.detectAndDecode(image)
+            except Exception:
+                data, pts = "", None
+            if data:
+                found.append((data, pts))
+
+        results = []
+        for data, pts in found:
+            raw = data.strip()
+            bbox = None
+            if pts is not None:
+                pts = pts.reshape(-1, 2) / float(scale)
+                pts[:, 0] += ox
+                pts[:, 1] += oy
+                bbox = pts.astype(int)
+            results.append({
+                "raw": raw,
+                "employee": self.lookup(raw),
+                "bbox": bbox
+            })
+        return results
+
     def draw_qr_overlay_multi(self, frame, qr_results):
         """Draws overlays for multiple QR codes (polylines + label)."""
         for r in (qr_results or []):
@@ -0,0 +1,178 @@
+"""
+qr_worker.py  —  Background QR decoding on the latest frame only
+
+The main loop hands over small ROI crops (chest areas of detected
+persons and the last known QR boxes) and carries on drawing.  A worker
+thread decodes only the newest job, at an ROI-dependent scale, and
+publishes the results tagged with the frame sequence number they came
+from.  Older jobs are dropped, never queued.
+"""
+
+import threading
+import time
+
+import cv2
+
+
+def _center_in_any(rect, boxes):
+    cx = (rect[0] + rect[2]) / 2.0
+    cy = (rect[1] + rect[3]) / 2.0
+    return any(b[0] <= cx <= b[2] and b[1] <= cy <= b[3] for b in boxes)
+
+
+def build_qr_rois(persons_compliance, last_qr_rects, frame_shape, chest=(0.10, 0.70), pad=0.10,
+                  exclude_boxes=None):
+    """
+    Returns [(x1, y1, x2, y2), ...] regions where a badge is likely:
+    the chest band of every detected person plus each last known QR rect
+    (doubled in size). Regions are clipped to the frame.
+    Persons / QR rects inside `exclude_boxes` (already identified tracks)
+    are skipped.
+    """
+    fh, fw = frame_shape[:2]
+    exclude_boxes = exclude_boxes or []
+    rois = []
+    for pc in persons_compliance or []:
+        if pc["person_det"]["bbox"] in exclude_boxes:
+            continue
+        x1, y1, x2, y2 = pc["person_det"]["bbox"]
+        w, h = x2 - x1, y2 - y1
+        rois.append((x1 - w * pad, y1 + h * chest[0], x2 + w * pad, y1 + h * chest[1]))
+    for x1, y1, x2, y2 in last_qr_rects or []:
+        if _center_in_any((x1, y1, x2, y2), exclude_boxes):
+            continue
+        w, h = x2 - x1, y2 - y1
+        rois.append((x1 - w / 2.0, y1 - h / 2.0, x2 + w / 2.0, y2 + h / 2.0))
+
+    out = []
+    for x1, y1, x2, y2 in rois:
+        x1, y1 = max(0, int(x1)), max(0, int(y1))
+        x2, y2 = min(fw, int(x2)), min(fh, int(y2))
+        if x2 - x1 >= 24 and y2 - y1 >= 24:
+            out.append((x1, y1, x2, y2))
+    return out
+
+
+class QRDecodeWorker:
+    def __init__(self, scanner, roi_target_px=400, full_frame_max_px=960,
+                 full_frame_every=5):
+        """
+        scanner           : QRScanner (employee lookup + decode helpers)
+        roi_target_px     : ROIs are resized so their longest side is ~this
+                            (small badges are upscaled, big ones shrunk)
+        full_frame_max_px : longest side of the downscaled full-frame search
+        full_frame_every  : also search the whole frame every N jobs, so
+                            badges held outside any ROI are still found
+        """
+        self.scanner = scanner
+        self.roi_target_px = int(roi_target_px)
+        self.full_frame_max_px = int(full_frame_max_px)
+        self.full_frame_every = max(1, int(full_frame_every))
+
+        self._cond = threading.Condition()
+        self._job = None           # (seq, [(crop, ox, oy, scale), ...], generation); scale=None → ROI
+        self._result = (-1, [], 0.0)
+        self._generation = 0       # bumped by clear(); stale in-flight jobs are not published
+        self._running = True
+        self._jobs_submitted = 0
+        self.jobs_done = 0
+        self.jobs_dropped = 0
+        self.last_decode_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="qr-decode", daemon=True)
+        self._thread.start()
+
+    # ── Main-thread side ──────────────────────────────────────────────
+    def submit(self, frame, seq, rois, mask_boxes=None):
+        """
+        Queues the newest frame for decoding. Only ROI crops are copied;
+        the full frame is copied (downscaled) only when there are no ROIs
+        or the periodic full-frame search is due. `mask_boxes` (identified
+        persons) are blanked in that copy so their badges are not decoded.
+        """
+        self._jobs_submitted += 1
+        crops = [(frame[y1:y2, x1:x2].copy(), x1, y1, None) for (x1, y1, x2, y2) in rois]
+        if not crops or self._jobs_submitted % self.full_frame_every == 0:
+            h, w = frame.shape[:2]
+            scale = min(1.0, self.full_frame_max_px / float(max(h, w)))
+            if scale >= 1.0:
+                small = frame.copy()
+            else:
+                small = cv2.resize(frame, (int(w * scale), int(h * scale)),
+                                   interpolation=cv2.INTER_AREA)
+            for x1, y1, x2, y2 in mask_boxes or []:
+                small[max(0, int(y1 * scale)):max(0, int(y2 * scale)),
+                      max(0, int(x1 * scale)):max(0, int(x2 * scale))] = 127
+            crops.append((small, 0, 0, scale))
+
+        with self._cond:
+            if self._job is not None:
+                self.jobs_dropped += 1
+            self._job = (seq, crops, self._generation)
+            self._cond.notify()
+
+    def results(self, max_age_seconds=0.5):
+        """Latest published (seq, results), or (seq, []) if too old."""
+        seq, results, t = self._result
+        if time.time() - t > max_age_seconds:
+            return seq, []
+        return seq, results
+
+    def clear(self):
+        """Forget pending work and published results (e.g. after a check)."""
+        with self._cond:
+            self._job = None
+            self._result = (-1, [], 0.0)
+            self._generation += 1
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout=1.0)
+
+    # ── Worker thread ─────────────────────────────────────────────────
+    def _run(self):
+        detector = cv2.QRCodeDetector()   # detectors are not shared across threads
+        while True:
+            with self._cond:
+                while self._running and self._job is None:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                seq, crops, generation = self._job
+                self._job = None
+
+            t0 = time.perf_counter()
+            results = {}
+            for crop, ox, oy, scale in crops:
+                for r in self._decode(detector, crop, ox, oy, scale):
+                    results.setdefault(r["raw"], r)
+            self.last_decode_ms = (time.perf_counter() - t0) * 1000.0
+            self.jobs_done += 1
+
+            with self._cond:
+                if generation == self._generation:
+                    self._result = (seq, list(results.values()), time.time())
+
+    def _decode(self, detector, crop, ox, oy, scale):
+        if scale is not None:
+            # Full frame, already downscaled by submit() — may hold several badges
+            return self.scanner.decode_region(
+                crop, offset=(ox, oy), scale=scale, detector=detector, multi=True)
+
+        h, w = crop.shape[:2]
+        scale = min(2.0, max(0.5, self.roi_target_px / float(max(h, w))))
+        if abs(scale - 1.0) > 0.1:
+            interp = cv2.INTER_CUBIC if scale > 1.0 else cv2.INTER_AREA
+            crop = cv2.resize(crop, (int(w * scale), int(h * scale)), interpolation=interp)
+        else:
+            scale = 1.0
+        return self.scanner.decode_region(crop, offset=(ox, oy), scale=scale, detector=detector)
+
+    def stats(self):
+        return {
+            "jobs_done": self.jobs_done,
+            "jobs_dropped": self.jobs_dropped,
+            "last_decode_ms": round(self.last_decode_ms, 1),
+        }
@@ -1,10 +1,17 @@
 import requests
 import time
-from config import VERBOSE_LOGS
+import json
+import os
+from config import VERBOSE_LOGS, CHECK_LOG_PATH
 
 class Reporter:
-    def __init__(self, backend_url="http://localhost:5000"):
+    def __init__(self, backend_url="http://localhost:5000", check_log_path=CHECK_LOG_PATH):
         self.backend_url = backend_url
+        self.check_log_path = check_log_path
+        if check_log_path:
+            log_dir = os.path.dirname(check_log_path)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
         if VERBOSE_LOGS:
             print(f"[Reporter] Initialized → backend: {backend_url}")
 
@@ -31,6 +38,8 @@ class Reporter:
             "timestamp":     time.strftime("%Y-%m-%d %H:%M:%S")
         }
 
+        self._append_check_log(payload)
+
         try:
             response = requests.post(
                 f"{self.backend_url}/api/report",
@@ -47,4 +56,14 @@ class Reporter:
         except requests.exceptions.ConnectionError:
             print("[Reporter] Backend not reachable — check will still save to Excel")
         except Exception as e:
-            print(f"[Reporter] Error: {e}")
\ No newline at end of file
+            print(f"[Reporter] Error: {e}")
+
+    def _append_check_log(self, payload):
+        """Appends the payload to the local JSON-lines check log (used by shift_report.py)."""
+        if not self.check_log_path:
+            return
+        try:
+            with open(self.check_log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"[Reporter] Could not write check log: {e}")
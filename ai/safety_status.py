@@ -1,5 +1,6 @@
 class SafetyStatus:
     def __init__(self):
+        self._backdrop = None       # solid color block reused by draw_status
         print("[SafetyStatus] Safety Status Engine initialized")
 
     def evaluate(self, compliance):
@@ -47,6 +48,7 @@ class SafetyStatus:
         Table columns: Item | Recognition
         """
         import cv2
+        import numpy as np
 
         h, w = frame.shape[:2]
         color = status_data["color"]
@@ -77,16 +79,17 @@ class SafetyStatus:
         tx = (w - table_w) // 2
         ty = 60                # top margin below the banner
 
-        # ── Semi-transparent dark backdrop ────────────────────
-        overlay = frame.copy()
+        # ── Semi-transparent dark backdrop (blended on its ROI only) ──
         backdrop_pad = 20
-        cv2.rectangle(
-            overlay,
-            (tx - backdrop_pad, ty - backdrop_pad),
-            (tx + table_w + backdrop_pad, ty + table_h + 140 + backdrop_pad),
-            (15, 15, 25), -1
-        )
-        cv2.addWeighted(overlay, 0.80, frame, 0.20, 0, frame)
+        bx1 = max(0, tx - backdrop_pad)
+        by1 = max(0, ty - backdrop_pad)
+        bx2 = min(w, tx + table_w + backdrop_pad + 1)
+        by2 = min(h, ty + table_h + 140 + backdrop_pad + 1)
+        if bx2 > bx1 and by2 > by1:
+            roi = frame[by1:by2, bx1:bx2]
+            if self._backdrop is None or self._backdrop.shape != roi.shape:
+                self._backdrop = np.full(roi.shape, (15, 15, 25), dtype=np.uint8)
+            cv2.addWeighted(self._backdrop, 0.80, roi, 0.20, 0, roi)
 
         # ── Table border (rounded feel via thick border) ──────
         cv2.rectangle(frame, (tx, ty), (tx + table_w, ty + table_h), (180, 180, 180), 2)
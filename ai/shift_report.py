@@ -0,0 +1,302 @@
+"""
+IndustriGuard AI — End-of-Shift Excel Report
+=============================================
+Builds a full shift report (every check, one sheet per department and a
+summary sheet) using openpyxl's write-only mode.  Rows are streamed from
+the source straight into the workbook, so memory use stays flat no matter
+how many checks the shift produced.
+
+Sources:
+  - db   : backend SQLite database (employee_check_logs table)
+  - log  : local JSON-lines check log written by Reporter (CHECK_LOG_PATH)
+
+--since / --until are local time.  The backend stores timestamps in UTC,
+so for the db source the bounds are converted to UTC for the query and
+each row's timestamp back to local time; the local log is already in
+local time.
+
+Usage:
+  python shift_report.py                         # today, from backend DB
+  python shift_report.py --source log
+  python shift_report.py --since "2025-06-01 06:00:00" --until "2025-06-01 14:00:00"
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+
+from config import BACKEND_DB_PATH, CHECK_LOG_PATH
+
+# ── Columns ────────────────────────────────────────────────────────────
+# (header, record key, width)
+COLUMNS = [
+    ("Timestamp",   "timestamp",     20),
+    ("Employee ID", "employee_id",   12),
+    ("Name",        "employee_name", 25),
+    ("Department",  "department",    20),
+    ("Role",        "role",          18),
+    ("Helmet",      "has_helmet",    10),
+    ("Safety Vest", "has_vest",      12),
+    ("Gloves",      "has_gloves",    10),
+    ("Goggles",     "has_goggles",   10),
+    ("Boots",       "has_boots",     10),
+    ("Missing PPE", "missing_ppe",   30),
+    ("Status",      "status",        14),
+    ("Camera",      "camera_id",     12),
+]
+PPE_KEYS = {"has_helmet", "has_vest", "has_gloves", "has_goggles", "has_boots"}
+
+# ── Shared styles (reused by every streamed cell) ──────────────────────
+_THIN = Side(style="thin")
+_BORDER         = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+_CENTER         = Alignment(horizontal="center", vertical="center")
+_HEADER_FILL    = PatternFill(fill_type="solid", fgColor="1A5276")
+_HEADER_FONT    = Font(name="Calibri", size=11, bold=True, color="FFFFFF")
+_TITLE_FONT     = Font(name="Calibri", size=14, bold=True, color="0D3B6E")
+_BODY_FONT      = Font(name="Calibri", size=11)
+_READY_FILL     = PatternFill(fill_type="solid", fgColor="D5F5E3")
+_NOT_READY_FILL = PatternFill(fill_type="solid", fgColor="FADBD8")
+_OK_FONT        = Font(name="Calibri", size=11, bold=True, color="1E8449")
+_BAD_FONT       = Font(name="Calibri", size=11, bold=True, color="C0392B")
+
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+# ── Sources ────────────────────────────────────────────────────────────
+def _local_to_utc(text):
+    """'YYYY-MM-DD HH:MM:SS[.ffffff]' local time → the backend's UTC format."""
+    utc = datetime.fromisoformat(text).astimezone(timezone.utc)
+    return utc.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _utc_to_local(text):
+    """Backend UTC timestamp → 'YYYY-MM-DD HH:MM:SS' local time."""
+    utc = datetime.fromisoformat(text).replace(tzinfo=timezone.utc)
+    return utc.astimezone().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def iter_db_checks(db_path, since, until):
+    """
+    Yields check records from the backend SQLite database, oldest first.
+    `since` / `until` and the returned timestamps are local time (the
+    backend stores UTC). Uses a plain sqlite3 cursor so rows are fetched
+    lazily.
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"[ShiftReport] Database not found: {db_path}")
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.execute(
+            "SELECT timestamp, employee_id, employee_name, department, role, "
+            "has_helmet, has_vest, has_gloves, has_goggles, has_boots, "
+            "missing_ppe, status, camera_id "
+            "FROM employee_check_logs "
+            "WHERE timestamp >= ? AND timestamp < ? "
+            "ORDER BY timestamp",
+            (_local_to_utc(since), _local_to_utc(until))
+        )
+        for row in cursor:
+            record = dict(row)
+            if record["timestamp"]:
+                record["timestamp"] = _utc_to_local(record["timestamp"])
+            yield record
+    finally:
+        conn.close()
+
+
+def iter_log_checks(log_path, since, until):
+    """
+    Yields check records from the local JSON-lines check log, one line at
+    a time.  Each line is a Reporter payload.
+    """
+    if not os.path.exists(log_path):
+        raise FileNotFoundError(f"[ShiftReport] Check log not found: {log_path}")
+
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            ts = record.get("timestamp", "")
+            if not (since <= ts < until):
+                continue
+            missing = record.get("missing_ppe", [])
+            if isinstance(missing, list):
+                record["missing_ppe"] = ", ".join(missing)
+            yield record
+
+
+# ── Writer ─────────────────────────────────────────────────────────────
+def _sheet_title(name, used):
+    """Makes a valid, unique Excel sheet title (max 31 chars)."""
+    base = _INVALID_SHEET_CHARS.sub("_", name or "Unknown").strip() or "Unknown"
+    base = base[:31]
+    title = base
+    n = 2
+    while title.lower() in used:
+        suffix = f" ({n})"
+        title = base[:31 - len(suffix)] + suffix
+        n += 1
+    used.add(title.lower())
+    return title
+
+
+def _styled(ws, value, font=_BODY_FONT, fill=None):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.font = font
+    cell.alignment = _CENTER
+    cell.border = _BORDER
+    if fill is not None:
+        cell.fill = fill
+    return cell
+
+
+def _start_sheet(wb, title, heading):
+    """Creates a write-only sheet with column widths, title and header row."""
+    ws = wb.create_sheet(title)
+    for idx, (_, _, width) in enumerate(COLUMNS):
+        ws.column_dimensions[chr(ord("A") + idx)].width = width
+    ws.freeze_panes = "A3"
+
+    title_cell = WriteOnlyCell(ws, value=heading)
+    title_cell.font = _TITLE_FONT
+    ws.append([title_cell])
+    ws.append([_styled(ws, header, _HEADER_FONT, _HEADER_FILL) for header, _, _ in COLUMNS])
+    return ws
+
+
+def _record_row(ws, record):
+    is_ready = record.get("status") == "READY"
+    fill = _READY_FILL if is_ready else _NOT_READY_FILL
+    row = []
+    for _, key, _ in COLUMNS:
+        value = record.get(key, "")
+        font = _BODY_FONT
+        if key in PPE_KEYS:
+            value = "✓" if value else "✗"
+            font = _OK_FONT if value == "✓" else _BAD_FONT
+        elif key == "status":
+            font = _OK_FONT if is_ready else _BAD_FONT
+        row.append(_styled(ws, value, font, fill))
+    return row
+
+
+def build_shift_report(records, output_path, heading="IndustriGuard AI — Shift Report"):
+    """
+    Streams `records` into a write-only workbook at `output_path`.
+    Writes an "All Checks" sheet, one sheet per department and a summary.
+    Returns a small dict of totals.
+    """
+    wb = Workbook(write_only=True)
+    used_titles = set()
+
+    history = _start_sheet(wb, _sheet_title("All Checks", used_titles), heading)
+    dept_sheets = {}
+    totals = {}   # department -> {"READY": n, "NOT READY": n, "missing": {item: n}}
+
+    for record in records:
+        history.append(_record_row(history, record))
+
+        dept = record.get("department") or "Unknown"
+        ws = dept_sheets.get(dept)
+        if ws is None:
+            ws = _start_sheet(wb, _sheet_title(dept, used_titles), f"{heading} — {dept}")
+            dept_sheets[dept] = ws
+            totals[dept] = {"READY": 0, "NOT READY": 0, "missing": dict.fromkeys(sorted(PPE_KEYS), 0)}
+        ws.append(_record_row(ws, record))
+
+        t = totals[dept]
+        status = "READY" if record.get("status") == "READY" else "NOT READY"
+        t[status] += 1
+        for key in PPE_KEYS:
+            if not record.get(key):
+                t["missing"][key] += 1
+
+    # ── Summary sheet (only aggregates are held in memory) ─────────
+    summary = wb.create_sheet(_sheet_title("Summary", used_titles))
+    for col in "ABCDEFGHIJ":
+        summary.column_dimensions[col].width = 16
+    summary.column_dimensions["A"].width = 24
+    title_cell = WriteOnlyCell(summary, value=f"{heading} — Summary")
+    title_cell.font = _TITLE_FONT
+    summary.append([title_cell])
+    summary.append([
+        _styled(summary, h, _HEADER_FONT, _HEADER_FILL)
+        for h in ["Department", "Checks", "Ready", "Not Ready", "Ready %",
+                  "No Helmet", "No Vest", "No Gloves", "No Goggles", "No Boots"]
+    ])
+
+    grand = {"checks": 0, "ready": 0}
+    for dept in sorted(totals):
+        t = totals[dept]
+        checks = t["READY"] + t["NOT READY"]
+        grand["checks"] += checks
+        grand["ready"] += t["READY"]
+        pct = round(t["READY"] / checks * 100, 1) if checks else 0
+        m = t["missing"]
+        summary.append([
+            _styled(summary, dept), _styled(summary, checks),
+            _styled(summary, t["READY"]), _styled(summary, t["NOT READY"]),
+            _styled(summary, pct),
+            _styled(summary, m["has_helmet"]), _styled(summary, m["has_vest"]),
+            _styled(summary, m["has_gloves"]), _styled(summary, m["has_goggles"]),
+            _styled(summary, m["has_boots"]),
+        ])
+
+    out_dir = os.path.dirname(output_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    wb.save(output_path)
+
+    return {
+        "checks": grand["checks"],
+        "ready": grand["ready"],
+        "departments": len(totals),
+        "output": output_path,
+    }
+
+
+# ── CLI ────────────────────────────────────────────────────────────────
+def main():
+    today = datetime.now().strftime("%Y-%m-%d")
+    parser = argparse.ArgumentParser(description="Generate the end-of-shift Excel report.")
+    parser.add_argument("--source", choices=["db", "log"], default="db",
+                        help="Read checks from the backend DB or the local check log")
+    parser.add_argument("--db", default=BACKEND_DB_PATH, help="Backend SQLite database path")
+    parser.add_argument("--log", default=CHECK_LOG_PATH, help="Local JSON-lines check log path")
+    parser.add_argument("--since", default=f"{today} 00:00:00",
+                        help="Start of shift, local 'YYYY-MM-DD HH:MM:SS' (inclusive)")
+    parser.add_argument("--until", default=f"{today} 23:59:59.999999",
+                        help="End of shift, local 'YYYY-MM-DD HH:MM:SS' (exclusive)")
+    parser.add_argument("--output", default=None, help="Output .xlsx path")
+    args = parser.parse_args()
+
+    output = args.output or f"../reports/shift_report_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+
+    if args.source == "db":
+        records = iter_db_checks(args.db, args.since, args.until)
+    else:
+        records = iter_log_checks(args.log, args.since, args.until)
+
+    print(f"[ShiftReport] Source : {args.source}  ({args.since} → {args.until})")
+    result = build_shift_report(records, output)
+    print(f"[ShiftReport] {result['checks']} checks, {result['ready']} ready, "
+          f"{result['departments']} department(s)")
+    print(f"[ShiftReport] Saved → {result['output']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+stage_timer.py  —  Per-stage wall-clock timings for the main loop
+
+The loop calls `begin()` at the top of every frame and `lap(name)` after
+each stage; the time since the previous mark is charged to that stage.
+`begin()` is a no-op while a frame is already open, so a caller may start
+the frame (e.g. to time the camera read) before Pipeline.step() does.
+`last` holds the stage timings of the most recent frame.
+
+With a StageProfiler attached, every finished frame is also recorded
+into its rolling latency histograms (see profiler.py).
+`report_lines()` summarizes the current window (mean / max ms per stage
+and frames per second) and `maybe_report()` prints it periodically.
+"""
+
+import time
+
+
+class StageTimer:
+    def __init__(self, report_every_seconds=30.0, label="Timing", profiler=None):
+        self.report_every_seconds = float(report_every_seconds)
+        self.label = label
+        self.profiler = profiler
+        self._stats = {}          # name -> [count, total_s, max_s]  (current window)
+        self._totals = {}         # name -> [count, total_s, max_s]  (whole run)
+        self._frames = 0
+        self._total_frames = 0
+        self._t_mark = None
+        self._open = False
+        self.last = {}            # name -> seconds for the current / latest frame
+        self._window_start = time.perf_counter()
+        self._run_start = self._window_start
+
+    # ── Per-frame hooks ───────────────────────────────────────────────
+    def begin(self):
+        """Opens a frame. Returns False if one was already open."""
+        if self._open:
+            return False
+        self._open = True
+        self.last = {}
+        self._t_mark = time.perf_counter()
+        return True
+
+    def lap(self, name):
+        """Charges the time since the previous mark to `name`."""
+        now = time.perf_counter()
+        if self._t_mark is not None:
+            self.add(name, now - self._t_mark)
+        self._t_mark = now
+
+    def add(self, name, seconds):
+        self.last[name] = self.last.get(name, 0.0) + seconds
+        for table in (self._stats, self._totals):
+            s = table.get(name)
+            if s is None:
+                table[name] = [1, seconds, seconds]
+            else:
+                s[0] += 1
+                s[1] += seconds
+                if seconds > s[2]:
+                    s[2] = seconds
+
+    def cancel(self):
+        """Drops the open frame without recording it (e.g. a camera-offline frame)."""
+        self._open = False
+        self.last = {}
+        self._t_mark = None
+
+    def end_frame(self):
+        if not self._open:
+            return
+        self._open = False
+        self._frames += 1
+        self._total_frames += 1
+        if self.profiler is not None:
+            self.profiler.record_frame(self.last)
+
+    # ── Reporting ─────────────────────────────────────────────────────
+    @staticmethod
+    def _lines(stats, frames, elapsed):
+        fps = frames / elapsed if elapsed > 0 else 0.0
+        lines = [f"{frames} frames in {elapsed:.1f}s  ({fps:.1f} FPS)"]
+        for name, (count, total, peak) in stats.items():
+            lines.append(
+                f"  {name:<10} mean {total / count * 1000.0:7.2f} ms  "
+                f"max {peak * 1000.0:7.2f} ms  per-frame {total / max(1, frames) * 1000.0:7.2f} ms"
+            )
+        return lines
+
+    def report_lines(self):
+        return self._lines(self._stats, self._frames, time.perf_counter() - self._window_start)
+
+    def summary_lines(self):
+        return self._lines(self._totals, self._total_frames, time.perf_counter() - self._run_start)
+
+    def maybe_report(self):
+        """Prints and resets the window once `report_every_seconds` have passed."""
+        if self.report_every_seconds <= 0:
+            return False
+        if time.perf_counter() - self._window_start < self.report_every_seconds:
+            return False
+        for line in self.report_lines():
+            print(f"[{self.label}] {line}")
+        if self.profiler is not None:
+            for line in self.profiler.log_lines():
+                print(f"[Profiler] {line}")
+        self._stats = {}
+        self._frames = 0
+        self._window_start = time.perf_counter()
+        return True
+
+    def snapshot(self):
+        """Whole-run {stage: {"count", "mean_ms", "max_ms"}}."""
+        return {
+            name: {
+                "count": count,
+                "mean_ms": round(total / count * 1000.0, 3),
+                "max_ms": round(peak * 1000.0, 3),
+            }
+            for name, (count, total, peak) in self._totals.items()
+        }
@@ -0,0 +1,313 @@
+"""
+stream_reader.py  —  Low-latency network camera reader on an ffmpeg / GStreamer subprocess
+
+cv2.VideoCapture(url) on an HTTP MJPEG or RTSP stream keeps its own
+decode buffer (CAP_PROP_BUFFERSIZE is a hint most backends ignore), so
+frames arrive late, and a dropped connection blocks get_frame() while it
+reconnects.  With STREAM_READER = "ffmpeg" or "gstreamer", CameraFeed
+uses this reader instead:
+
+  - the decoder runs in a child process with its buffering turned off
+    (ffmpeg: -fflags nobuffer -flags low_delay, tiny probe; GStreamer:
+    live source, latency=0, sync=false) and writes raw BGR frames to a pipe
+  - a pump thread readinto()s each frame straight into one of two
+    preallocated buffers and publishes the newest; nothing queues, so the
+    consumer always gets the latest frame
+  - the stream can be scaled while decoding (STREAM_DECODE_SIZE, and
+    ffmpeg's MJPEG -lowres), so full-size frames never reach Python
+  - a supervisor thread restarts the subprocess with exponential backoff
+    when the stream ends or stalls (exponential backoff with jitter);
+    get_frame() never waits for it
+
+Try it without a phone:  python fake_ip_camera.py  then point
+WIFI_CAMERA_URL at http://127.0.0.1:8080/video.
+"""
+
+import collections
+import re
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+from config import (
+    FFMPEG_BINARY,
+    GST_LAUNCH_BINARY,
+    STREAM_DECODE_SIZE,
+    STREAM_MJPEG_LOWRES,
+    STREAM_STALL_SECONDS,
+    STREAM_BACKOFF_MIN_SECONDS,
+    STREAM_BACKOFF_MAX_SECONDS,
+    CAMERA_RECONNECT_JITTER,
+)
+from camera_health import Backoff
+
+BACKENDS = ("ffmpeg", "gstreamer")
+
+_GST_DEFAULT_SIZE = (640, 480)     # gst-launch cannot report the size it negotiated
+_OUTPUT_SIZE_RE = re.compile(r"Video: rawvideo\b.*?, (\d+)x(\d+)\b")
+
+
+def ffmpeg_command(url, size=None, lowres=0, binary=FFMPEG_BINARY):
+    """ffmpeg argv that decodes `url` to raw BGR frames on stdout."""
+    cmd = [binary, "-hide_banner", "-nostats", "-loglevel", "info",
+           "-fflags", "nobuffer", "-flags", "low_delay",
+           "-probesize", "32", "-analyzeduration", "0"]
+    timeout_us = str(int(STREAM_STALL_SECONDS * 1e6))
+    if url.startswith("rtsp"):
+        cmd += ["-rtsp_transport", "tcp", "-timeout", timeout_us]
+    elif url.startswith("http"):
+        cmd += ["-rw_timeout", timeout_us]
+    if lowres:
+        cmd += ["-lowres", str(int(lowres))]     # MJPEG: IDCT at 1/2, 1/4 or 1/8 size
+    cmd += ["-i", url, "-an", "-sn", "-dn"]
+    if size:
+        cmd += ["-vf", f"scale={size[0]}:{size[1]}:flags=fast_bilinear"]
+    cmd += ["-pix_fmt", "bgr24", "-f", "rawvideo", "pipe:1"]
+    return cmd
+
+
+def gstreamer_command(url, size, binary=GST_LAUNCH_BINARY):
+    """gst-launch argv that decodes `url` to raw BGR frames of `size` on stdout."""
+    if url.startswith("rtsp"):
+        source = ["rtspsrc", f"location={url}", "latency=0", "protocols=tcp", "!", "decodebin"]
+    else:
+        source = ["souphttpsrc", f"location={url}", "is-live=true", "do-timestamp=true",
+                  "!", "multipartdemux", "!", "jpegdec"]
+    caps = f"video/x-raw,format=BGR,width={size[0]},height={size[1]}"
+    return [binary, "-q", *source,
+            "!", "queue", "max-size-buffers=1", "leaky=downstream",
+            "!", "videoconvert", "!", "videoscale", "!", caps,
+            "!", "fdsink", "fd=1", "sync=false"]
+
+
+class SubprocessStreamReader:
+    def __init__(self, url, backend="ffmpeg", size=STREAM_DECODE_SIZE, lowres=STREAM_MJPEG_LOWRES,
+                 stall_seconds=STREAM_STALL_SECONDS, backoff=(STREAM_BACKOFF_MIN_SECONDS,
+                                                              STREAM_BACKOFF_MAX_SECONDS),
+                 health=None):
+        """
+        url           : http(s) MJPEG or rtsp URL
+        backend       : "ffmpeg" or "gstreamer"
+        size          : (width, height) to scale to while decoding; None keeps
+                        the stream's size (ffmpeg; gstreamer then uses 640x480)
+        lowres        : ffmpeg MJPEG decode at 1/2**lowres size (0 = off)
+        stall_seconds : restart the subprocess when no frame arrives for this long
+        backoff       : (first, max) seconds between restarts, doubling each time
+                        (with CAMERA_RECONNECT_JITTER)
+        health        : CameraHealth told about failed attempts and retry times
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown stream reader backend {backend!r} (use one of {BACKENDS})")
+        if backend == "gstreamer" and not size:
+            size = _GST_DEFAULT_SIZE
+        self.url = url
+        self.backend = backend
+        self.size = tuple(size) if size else None
+        self.lowres = int(lowres or 0) if backend == "ffmpeg" else 0
+        self.stall_seconds = float(stall_seconds)
+        self.backoff = (float(backoff[0]), float(backoff[1]))
+        self.health = health
+
+        self._cond = threading.Condition()
+        self._buffers = None        # [front, back] preallocated frames
+        self._seq = 0               # frames published so far
+        self._taken_seq = 0         # last seq returned by get_frame()
+        self._last_frame_time = 0.0
+        self._proc = None
+        self._stop = threading.Event()
+        self._supervisor = None
+        self._spawn_failed = False
+        self.command = None         # argv of the current subprocess
+
+        self.state = "idle"         # idle → connecting → streaming ⇄ reconnecting → closed
+        self.frame_shape = None
+        self.connects = 0
+        self.reconnects = 0
+        self.fps = 0.0
+        self.last_error = ""
+
+    # ── Lifetime ──────────────────────────────────────────────────────
+    def open(self, timeout=10.0):
+        """
+        Starts the subprocess; True once the first frame arrived within
+        `timeout`. False at once if the decoder binary cannot be started.
+        """
+        if self._supervisor is None:
+            self._supervisor = threading.Thread(target=self._supervise, name="stream-reader",
+                                                daemon=True)
+            self._supervisor.start()
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > 0 or self.state == "closed"
+                                or self._spawn_failed, timeout)
+            return self._seq > 0
+
+    def close(self):
+        self._stop.set()
+        self._kill()
+        if self._supervisor is not None:
+            self._supervisor.join(timeout=3.0)
+        with self._cond:
+            self.state = "closed"
+            self._cond.notify_all()
+
+    # ── Consumer side ─────────────────────────────────────────────────
+    def get_frame(self, timeout=1.0):
+        """
+        Copy of the newest frame. Waits up to `timeout` for one newer than the
+        last returned; if the stream is down meanwhile, returns the last frame
+        again (the reconnect runs in the background). None once closed or if
+        no frame has ever arrived.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > self._taken_seq or self.state == "closed",
+                                timeout)
+            if self.state == "closed" or self._seq == 0:
+                return None
+            self._taken_seq = self._seq
+            return self._buffers[0].copy()
+
+    @property
+    def stale_seconds(self):
+        """Seconds since the last frame arrived."""
+        return time.monotonic() - self._last_frame_time if self._last_frame_time else float("inf")
+
+    def get_info(self):
+        h, w = self.frame_shape[:2] if self.frame_shape else (0, 0)
+        return {"backend": self.backend, "state": self.state, "width": w, "height": h,
+                "fps": round(self.fps), "reconnects": self.reconnects}
+
+    # ── Supervisor thread ─────────────────────────────────────────────
+    def _supervise(self):
+        backoff = Backoff(self.backoff[0], self.backoff[1], jitter=CAMERA_RECONNECT_JITTER)
+        while not self._stop.is_set():
+            self.state = "connecting" if self.connects == 0 else "reconnecting"
+            frames_before = self._seq
+            self._run_once()
+            if self._stop.is_set():
+                break
+            if self._seq > frames_before:
+                backoff.reset()                    # it worked for a while: start over
+            elif self.health is not None:
+                self.health.attempt_failed(self.last_error or "no frames")
+            delay = backoff.next_delay()
+            if self.health is not None:
+                self.health.retry_scheduled(delay)
+            self.reconnects += 1
+            self.state = "reconnecting"
+            print(f"[StreamReader] ⚠ {self.backend} stream lost ({self.last_error or 'ended'}) "
+                  f"— retrying in {delay:.1f}s")
+            self._stop.wait(delay)
+
+    def _run_once(self):
+        """One subprocess lifetime: spawn, pump frames until EOF or stall, kill."""
+        try:
+            self._spawn()
+        except OSError as e:
+            self.last_error = f"cannot start {self.command[0]}: {e.strerror or e}"
+            with self._cond:
+                self._spawn_failed = True
+                self._cond.notify_all()
+            return
+        self.connects += 1
+        self._size_known = threading.Event()
+        self._stderr_tail = collections.deque(maxlen=8)
+        if self.size:
+            self._set_frame_shape(self.size)
+
+        proc = self._proc
+        threading.Thread(target=self._drain_stderr, args=(proc,), name="stream-stderr",
+                         daemon=True).start()
+        pump = threading.Thread(target=self._pump, args=(proc,), name="stream-pump", daemon=True)
+        pump.start()
+
+        started = time.monotonic()
+        while pump.is_alive() and not self._stop.is_set():
+            pump.join(timeout=0.25)
+            since = max(started, self._last_frame_time)
+            if time.monotonic() - since > self.stall_seconds:
+                self.last_error = f"no frame for {self.stall_seconds:.0f}s"
+                break
+        self._kill()
+        pump.join(timeout=1.0)
+        if not self.last_error and self._stderr_tail:
+            self.last_error = self._stderr_tail[-1]
+
+    def _spawn(self):
+        if self.backend == "ffmpeg":
+            self.command = ffmpeg_command(self.url, self.size, self.lowres)
+        else:
+            self.command = gstreamer_command(self.url, self.size)
+        self.last_error = ""
+        # bufsize=0: stdout is a raw pipe, so readinto() fills our buffer directly
+        self._proc = subprocess.Popen(self.command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                      stderr=subprocess.PIPE, bufsize=0)
+
+    def _kill(self):
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+            try:
+                proc.wait(timeout=2.0)
+            except subprocess.TimeoutExpired:
+                pass
+
+    # ── Subprocess I/O threads ────────────────────────────────────────
+    def _set_frame_shape(self, size):
+        shape = (int(size[1]), int(size[0]), 3)
+        if self._buffers is None or self._buffers[0].shape != shape:
+            with self._cond:
+                self._buffers = [np.empty(shape, np.uint8), np.empty(shape, np.uint8)]
+                self.frame_shape = shape
+        self._size_known.set()
+
+    def _drain_stderr(self, proc):
+        """Keeps the stderr pipe from filling up; ffmpeg's output header gives the frame size."""
+        for raw in iter(proc.stderr.readline, b""):
+            line = raw.decode("utf-8", "replace").strip()
+            if not line or line.startswith(("frame=", "[out#")):    # end-of-run stats
+                continue
+            self._stderr_tail.append(line)
+            if not self._size_known.is_set():
+                m = _OUTPUT_SIZE_RE.search(line)
+                if m:
+                    self._set_frame_shape((int(m.group(1)), int(m.group(2))))
+        proc.stderr.close()
+
+    def _pump(self, proc):
+        """Reads whole frames into the back buffer and publishes each one."""
+        while not self._size_known.wait(0.25):
+            if proc.poll() is not None or self._stop.is_set():
+                return
+        stdout = proc.stdout
+        t_prev = None
+        while not self._stop.is_set():
+            back = self._buffers[1]
+            view = memoryview(back).cast("B")
+            got, total = 0, view.nbytes
+            while got < total:
+                n = stdout.readinto(view[got:])
+                if not n:
+                    return                          # EOF: subprocess exited or was killed
+                got += n
+            view.release()
+
+            now = time.monotonic()
+            with self._cond:
+                self._buffers[0], self._buffers[1] = back, self._buffers[0]
+                self._seq += 1
+                self._last_frame_time = now
+                if self.state != "streaming":
+                    self.state = "streaming"
+                    self._announce()
+                self._cond.notify_all()
+            if t_prev is not None and now > t_prev:
+                fps = 1.0 / (now - t_prev)
+                self.fps = fps if self.fps == 0.0 else 0.9 * self.fps + 0.1 * fps
+            t_prev = now
+
+    def _announce(self):
+        h, w = self.frame_shape[:2]
+        verb = "Connected" if self.connects == 1 else "Reconnected"
+        print(f"[StreamReader] ✅ {verb} via {self.backend} ({w}x{h})")
@@ -0,0 +1,167 @@
+"""
+track_history.py  —  Per-track temporal PPE state for multi-person mode
+
+Keeps a small ring buffer of the last N PPE observations for every
+tracked person and votes over it (majority or EMA), the same way the
+CHECKING state pools 10 frames for a single worker.  A one-frame goggle
+miss therefore no longer flips READY/NOT READY, which in turn stops the
+Excel save + backend POST that every status flip triggers.
+
+All buffers are preallocated (max_tracks x window x 5 items), so memory
+is bounded no matter how many people walk past the gate.
+
+TrackVelocity estimates how fast each tracked box moves between
+inferences, so the display can move boxes forward on frames where no
+inference ran.
+"""
+
+import numpy as np
+
+PPE_ITEMS = ("has_helmet", "has_vest", "has_gloves", "has_goggles", "has_boots")
+
+
+class TrackPPEHistory:
+    # Fraction of positive observations needed per item — mirrors the
+    # CHECKING vote (half the frames, goggles only a third: small + flaky).
+    VOTE_RATIO = np.array([0.5, 0.5, 0.5, 0.3, 0.5], dtype=np.float32)
+
+    def __init__(self, window=10, mode="majority", ema_alpha=0.3, max_tracks=64):
+        self.window     = max(1, int(window))
+        self.mode       = mode if mode in ("majority", "ema") else "majority"
+        self.ema_alpha  = float(ema_alpha)
+        self.max_tracks = max(1, int(max_tracks))
+
+        n_items = len(PPE_ITEMS)
+        self._buf   = np.zeros((self.max_tracks, self.window, n_items), dtype=np.uint8)
+        self._ema   = np.zeros((self.max_tracks, n_items), dtype=np.float32)
+        self._count = np.zeros(self.max_tracks, dtype=np.int32)   # samples stored (<= window)
+        self._head  = np.zeros(self.max_tracks, dtype=np.int32)   # next write position
+        self._tick  = np.zeros(self.max_tracks, dtype=np.int64)   # last update (for LRU)
+
+        self._slots = {}                              # track_id -> slot
+        self._free  = list(range(self.max_tracks - 1, -1, -1))
+        self._clock = 0
+
+    def _slot_for(self, track_id):
+        slot = self._slots.get(track_id)
+        if slot is not None:
+            self._tick[slot] = self._clock   # not an LRU victim for the rest of this update
+            return slot
+        if not self._free:
+            # Table full: recycle the least recently updated track
+            lru_tid = min(self._slots, key=lambda t: self._tick[self._slots[t]])
+            self.evict(lru_tid)
+        slot = self._free.pop()
+        self._buf[slot]   = 0
+        self._count[slot] = 0
+        self._head[slot]  = 0
+        self._ema[slot]   = 0.0
+        self._tick[slot]  = self._clock
+        self._slots[track_id] = slot
+        return slot
+
+    def evict(self, track_id):
+        """Drop a track's history (call when the track is lost)."""
+        slot = self._slots.pop(track_id, None)
+        if slot is not None:
+            self._free.append(slot)
+
+    def __len__(self):
+        return len(self._slots)
+
+    def update(self, persons_compliance):
+        """
+        Records one inference worth of per_person_compliance() output and
+        returns a new list where has_* / safety_percentage are the voted
+        values.  Persons without a track_id are passed through unchanged.
+        """
+        self._clock += 1
+        tracked = []
+        for i, pc in enumerate(persons_compliance or []):
+            tid = (pc.get("person_det") or {}).get("track_id")
+            if tid is not None:
+                tracked.append((i, int(tid)))
+        # More tracks in one frame than slots: the rest pass through unvoted
+        tracked = tracked[:self.max_tracks]
+
+        if not tracked:
+            return list(persons_compliance or [])
+
+        slots = np.array([self._slot_for(tid) for _, tid in tracked], dtype=np.int32)
+        obs = np.array(
+            [[bool(persons_compliance[i].get(k)) for k in PPE_ITEMS] for i, _ in tracked],
+            dtype=np.uint8
+        )
+
+        # Ring-buffer write + EMA, vectorized over all tracked persons
+        self._buf[slots, self._head[slots]] = obs
+        self._head[slots] = (self._head[slots] + 1) % self.window
+        fresh = self._count[slots] == 0
+        self._ema[slots] = np.where(
+            fresh[:, None], obs, self._ema[slots] + self.ema_alpha * (obs - self._ema[slots])
+        )
+        self._count[slots] = np.minimum(self._count[slots] + 1, self.window)
+        self._tick[slots] = self._clock
+
+        if self.mode == "ema":
+            voted = self._ema[slots] >= self.VOTE_RATIO
+        else:
+            # Unused ring entries are zero, so a plain sum over the window works
+            votes = self._buf[slots].sum(axis=1)
+            needed = np.maximum(1, np.ceil(self.VOTE_RATIO[None, :] * self._count[slots][:, None]))
+            voted = votes >= needed
+
+        out = list(persons_compliance)
+        for row, (i, _) in enumerate(tracked):
+            pc = dict(persons_compliance[i])
+            for j, key in enumerate(PPE_ITEMS):
+                pc[key] = bool(voted[row, j])
+            pc["safety_percentage"] = int(round(voted[row].sum() / float(len(PPE_ITEMS)) * 100))
+            pc["samples"] = int(self._count[slots[row]])
+            out[i] = pc
+        return out
+
+
+class TrackVelocity:
+    """
+    Per-track bounding-box velocity in px/s (x1, y1, x2, y2), from
+    consecutive inference results, EMA-smoothed against detector jitter.
+    """
+
+    def __init__(self, ema_alpha=0.5, max_gap_seconds=1.0):
+        self.ema_alpha = float(ema_alpha)
+        self.max_gap_seconds = float(max_gap_seconds)
+        self._last = {}      # track_id -> (t, bbox as float32[4])
+        self._vel = {}       # track_id -> float32[4]
+
+    def update(self, persons_compliance, now):
+        """Records the boxes of one inference, observed at clock time `now`."""
+        for pc in persons_compliance or []:
+            det = pc.get("person_det") or {}
+            tid = det.get("track_id")
+            if tid is None:
+                continue
+            tid = int(tid)
+            bbox = np.asarray(det["bbox"], dtype=np.float32)
+            prev = self._last.get(tid)
+            self._last[tid] = (now, bbox)
+            if prev is None:
+                continue
+            dt = now - prev[0]
+            if dt <= 0:
+                continue
+            if dt > self.max_gap_seconds:
+                # Track was not seen for a while; an old velocity would overshoot
+                self._vel.pop(tid, None)
+                continue
+            v = (bbox - prev[1]) / dt
+            old = self._vel.get(tid)
+            self._vel[tid] = v if old is None else old + self.ema_alpha * (v - old)
+
+    def snapshot(self):
+        """{track_id: (vx1, vy1, vx2, vy2)} — a plain copy, safe to pass to another thread."""
+        return {tid: tuple(float(c) for c in v) for tid, v in self._vel.items()}
+
+    def evict(self, track_id):
+        self._last.pop(track_id, None)
+        self._vel.pop(track_id, None)
@@ -1,8 +1,9 @@
 """
 ui_overlay.py  —  Modern, aesthetic OpenCV overlay system for IndustriGuard-AI
 
-Uses PIL/Pillow for crisp TrueType font rendering (Segoe UI) instead of
-OpenCV's blocky built-in fonts.  All drawing helpers live here so
+Uses PIL/Pillow for crisp TrueType font rendering (Segoe UI, or the closest
+family font_resolver finds on this OS) instead of OpenCV's blocky built-in
+fonts.  All drawing helpers live here so
 main_ai.py stays clean.
 """
 
@@ -10,27 +11,34 @@ import cv2
 import numpy as np
 import math
 import time
-from PIL import Image, ImageDraw, ImageFont
+from collections import OrderedDict
+from PIL import Image, ImageDraw
+
+from font_resolver import get_resolver
 
 # ── Font setup ─────────────────────────────────────────────────────────
-_FONT_DIR = r"C:\Windows\Fonts"
-_font_cache = {}
+# Every (weight, size) the overlay draws with; preload_fonts() loads them
+# at startup so the first frame of each screen does not stall on disk I/O.
+OVERLAY_FONT_SIZES = {
+    "light":    (14, 15, 17),
+    "regular":  (13, 14, 15, 17),
+    "semibold": (12, 13, 14, 15, 16, 20, 22),
+    "bold":     (22, 42, 64),
+}
+
 
 def _font(size, weight="regular"):
-    """Load & cache a Segoe UI TrueType font at the given pixel size."""
-    key = (size, weight)
-    if key not in _font_cache:
-        paths = {
-            "light":    f"{_FONT_DIR}\\segoeuil.ttf",
-            "regular":  f"{_FONT_DIR}\\segoeui.ttf",
-            "semibold": f"{_FONT_DIR}\\segoeuisl.ttf",
-            "bold":     f"{_FONT_DIR}\\segoeuib.ttf",
-        }
-        try:
-            _font_cache[key] = ImageFont.truetype(paths.get(weight, paths["regular"]), size)
-        except Exception:
-            _font_cache[key] = ImageFont.load_default()
-    return _font_cache[key]
+    """Cached TrueType font at the given pixel size (see font_resolver)."""
+    return get_resolver().get(size, weight)
+
+
+def preload_fonts(verbose=True):
+    """Resolves and loads all overlay fonts now; logs which files are used."""
+    resolver = get_resolver()
+    resolver.preload(OVERLAY_FONT_SIZES)
+    if verbose:
+        resolver.log_report()
+    return resolver.report()
 
 
 def _pil_text_size(text, font):
@@ -39,20 +47,64 @@ def _pil_text_size(text, font):
     return bbox[2] - bbox[0], bbox[3] - bbox[1]
 
 
+# Pre-rendered text sprites, keyed by (text, size, weight, color, shadow).
+# Most strings (titles, labels, hints) repeat frame after frame, so PIL
+# only rasterizes a string the first time it is seen.
+_SPRITE_CACHE_SIZE = 512
+_sprite_cache = OrderedDict()
+sprite_stats = {"hits": 0, "misses": 0}
+
+
+def _text_sprite(text, font_size, weight, color, shadow):
+    """
+    Returns (premultiplied BGR uint16, inverse alpha uint16, pad, text width).
+    Cached LRU; the arrays are read-only and shared between callers.
+    """
+    key = (text, font_size, weight, tuple(color), bool(shadow))
+    sprite = _sprite_cache.get(key)
+    if sprite is not None:
+        _sprite_cache.move_to_end(key)
+        sprite_stats["hits"] += 1
+        return sprite
+    sprite_stats["misses"] += 1
+
+    pil_font = _font(font_size, weight)
+    tw, th = _pil_text_size(text, pil_font)
+    # Add padding for descenders, shadow, and anti-aliasing
+    pad = max(6, font_size // 3)
+
+    txt_img = Image.new("RGBA", (tw + pad * 2, th + pad * 2), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(txt_img)
+    rgb = (color[2], color[1], color[0])
+    if shadow:
+        draw.text((pad + 1, pad + 1), text, font=pil_font, fill=(0, 0, 0, 100))
+    draw.text((pad, pad), text, font=pil_font, fill=(*rgb, 255))
+
+    rgba = np.asarray(txt_img, dtype=np.uint16)
+    alpha = rgba[:, :, 3:4]
+    premul = rgba[:, :, 2::-1] * alpha          # RGBA -> BGR, times alpha (0..255²)
+    inv_alpha = 255 - alpha
+    premul.flags.writeable = False
+    inv_alpha.flags.writeable = False
+
+    sprite = (premul, inv_alpha, pad, tw)
+    _sprite_cache[key] = sprite
+    if len(_sprite_cache) > _SPRITE_CACHE_SIZE:
+        _sprite_cache.popitem(last=False)
+    return sprite
+
+
 def _put_text(img, text, pos, font_size=18, color=(245, 245, 250),
               weight="regular", anchor=None, shadow=False):
     """
     Render anti-aliased TrueType text onto an OpenCV BGR frame.
     `color` is BGR.  `pos` is (x, y) of the top-left of the text.
     `anchor` can be "center" to center text horizontally at pos[0].
-    Uses a small cropped region for performance.
+    The cached sprite is blended onto the covered ROI in one pass.
+    Returns the text width in pixels.
     """
-    pil_font = _font(font_size, weight)
-    tw, th = _pil_text_size(text, pil_font)
-    # Add padding for descenders, shadow, and anti-aliasing
-    pad = max(6, font_size // 3)
-    region_w = tw + pad * 2
-    region_h = th + pad * 2
+    premul, inv_alpha, pad, tw = _text_sprite(text, font_size, weight, color, shadow)
+    region_h, region_w = premul.shape[:2]
 
     x, y = pos
     if anchor == "center":
@@ -60,16 +112,6 @@ def _put_text(img, text, pos, font_size=18, color=(245, 245, 250),
 
     h_frame, w_frame = img.shape[:2]
 
-    # Create a small RGBA image for just the text
-    txt_img = Image.new("RGBA", (region_w, region_h), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(txt_img)
-    rgb = (color[2], color[1], color[0])
-
-    tx_local, ty_local = pad, pad
-    if shadow:
-        draw.text((tx_local + 1, ty_local + 1), text, font=pil_font, fill=(0, 0, 0, 100))
-    draw.text((tx_local, ty_local), text, font=pil_font, fill=(*rgb, 255))
-
     # Compute paste coordinates on the frame
     paste_x = x - pad
     paste_y = y - pad
@@ -85,32 +127,105 @@ def _put_text(img, text, pos, font_size=18, color=(245, 245, 250),
     src_y2 = src_y1 + (dst_y2 - dst_y1)
 
     if dst_x2 <= dst_x1 or dst_y2 <= dst_y1:
-        return
+        return tw
 
-    txt_np = np.array(txt_img)
-    region = txt_np[src_y1:src_y2, src_x1:src_x2]
-    alpha = region[:, :, 3].astype(np.float32) / 255.0
-    mask = alpha > 0
+    _blend_premul(img[dst_y1:dst_y2, dst_x1:dst_x2],
+                  premul[src_y1:src_y2, src_x1:src_x2],
+                  inv_alpha[src_y1:src_y2, src_x1:src_x2])
+    return tw
 
-    if not np.any(mask):
-        return
 
-    roi = img[dst_y1:dst_y2, dst_x1:dst_x2]
-    for c in range(3):
-        ch = 2 - c  # RGBA -> BGR
-        roi[:, :, c][mask] = (
-            region[:, :, ch][mask] * alpha[mask] +
-            roi[:, :, c][mask] * (1 - alpha[mask])
-        ).astype(np.uint8)
+def _blend_premul(roi, premul, inv_alpha):
+    """In place: roi = (premul + roi * inv_alpha) / 255, in integer math."""
+    blended = _scratch_buffer("blend", roi.shape, np.uint16)
+    np.multiply(roi, inv_alpha, out=blended)
+    blended += premul
+    blended += 127
+    np.floor_divide(blended, 255, out=blended)
+    roi[:] = blended
 
 
 def _put_text_get_width(img, text, pos, font_size=18, color=(245, 245, 250),
                          weight="regular", shadow=False):
     """Render text and return the rendered width in pixels."""
-    pil_font = _font(font_size, weight)
-    tw, _ = _pil_text_size(text, pil_font)
-    _put_text(img, text, pos, font_size, color, weight, shadow=shadow)
-    return tw
+    return _put_text(img, text, pos, font_size, color, weight, shadow=shadow)
+
+
+# ── Scratch buffers ────────────────────────────────────────────────────
+# Translucent primitives work on the clipped ROI only, in buffers that are
+# allocated once and reused, so steady-state rendering allocates no
+# frame-sized arrays.
+_scratch = {}
+
+
+def _scratch_buffer(name, shape, dtype=np.uint8):
+    """Reusable uninitialised array of `shape`; grows (never shrinks) on demand."""
+    n = 1
+    for d in shape:
+        n *= d
+    buf = _scratch.get(name)
+    if buf is None or buf.size < n or buf.dtype != dtype:
+        size = max(n, buf.size if buf is not None and buf.dtype == dtype else 0)
+        buf = _scratch[name] = np.empty(size, dtype=dtype)
+    return buf[:n].reshape(shape)
+
+
+def _clip_box(img, pt1, pt2):
+    """(x1, y1, x2, y2) of the inclusive box pt1..pt2 clipped to img, exclusive end; None if empty."""
+    h, w = img.shape[:2]
+    x1, y1 = max(0, pt1[0]), max(0, pt1[1])
+    x2, y2 = min(w, pt2[0] + 1), min(h, pt2[1] + 1)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return x1, y1, x2, y2
+
+
+# ── Static layer cache ─────────────────────────────────────────────────
+# Static parts of the overlay (banner, cards, tables) are painted once per
+# frame size + content.  The painter runs on a black and a white canvas:
+# black gives the premultiplied color, white - black the inverse alpha, so
+# glass / anti-aliased drawing is captured exactly.  Only the bounding box
+# the layer touches is kept and blended, in one pass, on later frames.
+_LAYER_CACHE_SIZE = 32
+_layer_cache = OrderedDict()
+layer_stats = {"hits": 0, "misses": 0}
+
+
+def _draw_layer(frame, key, painter):
+    """
+    Composites the cached layer `key` (painting it with `painter(canvas)`
+    first if the frame size or key changed) onto frame.
+    """
+    h, w = frame.shape[:2]
+    full_key = (w, h) + tuple(key)
+    layer = _layer_cache.get(full_key)
+    if layer is not None:
+        _layer_cache.move_to_end(full_key)
+        layer_stats["hits"] += 1
+    else:
+        layer_stats["misses"] += 1
+        black = np.zeros((h, w, 3), dtype=np.uint8)
+        white = np.full((h, w, 3), 255, dtype=np.uint8)
+        painter(black)
+        painter(white)
+        inv_alpha = white.astype(np.int16) - black          # 255 where untouched
+        inv_alpha = np.clip(inv_alpha, 0, 255).astype(np.uint16)
+        ys, xs = np.nonzero((inv_alpha < 255).any(axis=2))
+        if ys.size == 0:
+            layer = None
+        else:
+            y1, y2, x1, x2 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+            premul = black[y1:y2, x1:x2].astype(np.uint16) * 255
+            layer = (x1, y1, premul, inv_alpha[y1:y2, x1:x2].copy())
+        _layer_cache[full_key] = layer
+        if len(_layer_cache) > _LAYER_CACHE_SIZE:
+            _layer_cache.popitem(last=False)
+
+    if layer is None:
+        return
+    x1, y1, premul, inv_alpha = layer
+    lh, lw = premul.shape[:2]
+    _blend_premul(frame[y1:y1 + lh, x1:x1 + lw], premul, inv_alpha)
 
 
 # ── Colour palette (BGR) ──────────────────────────────────────────────
@@ -157,10 +272,21 @@ def _rounded_rect(img, pt1, pt2, color, radius=12, thickness=-1):
 
 
 def _glass_rect(img, pt1, pt2, alpha=0.70, color=CARD_BG, radius=12):
-    """Semi-transparent rounded rectangle (glass-morphism)."""
-    overlay = img.copy()
-    _rounded_rect(overlay, pt1, pt2, color, radius, -1)
-    cv2.addWeighted(overlay, alpha, img, 1 - alpha, 0, img)
+    """Semi-transparent rounded rectangle (glass-morphism), blended on its ROI only."""
+    box = _clip_box(img, pt1, pt2)
+    if box is None:
+        return
+    x1, y1, x2, y2 = box
+    roi = img[y1:y2, x1:x2]
+    overlay = _scratch_buffer("glass", roi.shape)
+    if radius < 1:
+        overlay[:] = color
+    else:
+        # Same shape as drawing on a full-frame copy, in ROI coordinates
+        np.copyto(overlay, roi)
+        _rounded_rect(overlay, (pt1[0] - x1, pt1[1] - y1), (pt2[0] - x1, pt2[1] - y1),
+                      color, radius, -1)
+    cv2.addWeighted(overlay, alpha, roi, 1 - alpha, 0, roi)
 
 
 def _pill_badge(img, text, center, color, font_size=14, pad_x=14, pad_y=5):
@@ -178,16 +304,23 @@ def _pill_badge(img, text, center, color, font_size=14, pad_x=14, pad_y=5):
 
 
 def _gradient_bar(img, pt1, pt2, color_left, color_right):
-    """Draw a horizontal gradient rectangle."""
+    """Draw a horizontal gradient rectangle (y2 inclusive, clipped to the frame)."""
     x1, y1 = pt1
     x2, y2 = pt2
     width = x2 - x1
     if width <= 0:
         return
-    for i in range(width):
-        t = i / float(width)
-        c = tuple(int(color_left[j] + t * (color_right[j] - color_left[j])) for j in range(3))
-        cv2.line(img, (x1 + i, y1), (x1 + i, y2), c, 1)
+    t = np.arange(width, dtype=np.float64)[:, None] / float(width)
+    left = np.asarray(color_left, dtype=np.float64)
+    right = np.asarray(color_right, dtype=np.float64)
+    row = (left + t * (right - left)).astype(np.uint8)       # one color per column
+
+    h, w = img.shape[:2]
+    cx1, cx2 = max(0, x1), min(w, x2)
+    cy1, cy2 = max(0, y1), min(h, y2 + 1)
+    if cx2 <= cx1 or cy2 <= cy1:
+        return
+    img[cy1:cy2, cx1:cx2] = row[cx1 - x1:cx2 - x1]
 
 
 def _centered_text(img, text, y, font_size=18, color=TEXT_WHITE, weight="regular"):
@@ -202,29 +335,31 @@ def draw_top_banner(frame, title="Industriguard-AI", subtitle="Show your ID to s
     """
     Sleek gradient top banner with brand name + instruction.
     """
-    h, w = frame.shape[:2]
     bar_h = 52
 
-    # Gradient background
-    _gradient_bar(frame, (0, 0), (w, bar_h), BANNER_TOP, BANNER_BOT)
+    def paint(canvas):
+        w = canvas.shape[1]
+        # Gradient background
+        _gradient_bar(canvas, (0, 0), (w, bar_h), BANNER_TOP, BANNER_BOT)
 
-    # Thin accent line at bottom of banner
-    cv2.line(frame, (0, bar_h), (w, bar_h), ACCENT_CYAN, 2)
+        # Thin accent line at bottom of banner
+        cv2.line(canvas, (0, bar_h), (w, bar_h), ACCENT_CYAN, 2)
 
-    # Brand name — bold
-    title_w = _put_text_get_width(
-        frame, title, (18, 14), font_size=22, color=TEXT_WHITE,
-        weight="bold", shadow=True
-    )
+        # Brand name — bold
+        title_w = _put_text_get_width(
+            canvas, title, (18, 14), font_size=22, color=TEXT_WHITE,
+            weight="bold", shadow=True
+        )
 
-    # Vertical separator dot
-    sep_x = 18 + title_w + 16
-    cv2.circle(frame, (sep_x, 28), 3, ACCENT_CYAN, -1)
+        # Vertical separator dot
+        sep_x = 18 + title_w + 16
+        cv2.circle(canvas, (sep_x, 28), 3, ACCENT_CYAN, -1)
 
-    # Subtitle — light weight
-    _put_text(frame, subtitle, (sep_x + 16, 17), font_size=17,
-              color=TEXT_DIM, weight="light")
+        # Subtitle — light weight
+        _put_text(canvas, subtitle, (sep_x + 16, 17), font_size=17,
+                  color=TEXT_DIM, weight="light")
 
+    _draw_layer(frame, ("banner", title, subtitle), paint)
     return bar_h
 
 
@@ -240,8 +375,9 @@ def draw_scanning_state(frame, bar_h):
 
     y_center = bar_h + 22
     cv2.circle(frame, (24, y_center), radius, dot_color, -1)
-    _put_text(frame, "Scanning for QR ID...", (42, y_center - 9),
-              font_size=15, color=TEXT_DIM, weight="regular")
+    _draw_layer(frame, ("scan_hint", bar_h), lambda canvas: _put_text(
+        canvas, "Scanning for QR ID...", (42, y_center - 9),
+        font_size=15, color=TEXT_DIM, weight="regular"))
 
 
 def draw_worker_info_card(frame, lines, bbox, color, w, h):
@@ -300,9 +436,7 @@ def draw_person_bbox(frame, bbox, color, is_identified=False):
     t = 3
 
     if is_identified:
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (x1, y1), (x2, y2), color, -1)
-        cv2.addWeighted(overlay, 0.07, frame, 0.93, 0, frame)
+        _glass_rect(frame, (x1, y1), (x2, y2), alpha=0.07, color=color, radius=0)
 
     # Four L-shaped corner brackets
     cv2.line(frame, (x1, y1), (x1 + corner_len, y1), color, t)
@@ -323,33 +457,41 @@ def draw_countdown(frame, employee, remaining, elapsed, total_seconds):
     Modern countdown overlay with ring progress indicator.
     """
     h, w = frame.shape[:2]
+    cx, cy = w // 2, h // 2
+    bar_y = h - 6
+    dept_text = f"{employee.get('department', '')}  |  {employee.get('id', '')}"
 
-    # Full-screen dark overlay
-    _glass_rect(frame, (0, 52), (w, h), alpha=0.55, color=DARK_BG, radius=0)
+    def paint(canvas):
+        # Full-screen dark overlay
+        _glass_rect(canvas, (0, 52), (w, h), alpha=0.55, color=DARK_BG, radius=0)
 
-    # Employee welcome card
-    card_w = min(500, w - 40)
-    card_x = (w - card_w) // 2
-    card_y = 70
-    card_h = 62
-    _glass_rect(frame, (card_x, card_y), (card_x + card_w, card_y + card_h),
-                alpha=0.80, color=CARD_BG, radius=10)
-    cv2.line(frame, (card_x + 10, card_y), (card_x + card_w - 10, card_y), ACCENT_CYAN, 2)
+        # Employee welcome card
+        card_w = min(500, w - 40)
+        card_x = (w - card_w) // 2
+        card_y = 70
+        card_h = 62
+        _glass_rect(canvas, (card_x, card_y), (card_x + card_w, card_y + card_h),
+                    alpha=0.80, color=CARD_BG, radius=10)
+        cv2.line(canvas, (card_x + 10, card_y), (card_x + card_w - 10, card_y), ACCENT_CYAN, 2)
 
-    _centered_text(frame, f"Welcome, {employee['name']}", card_y + 12,
-                   font_size=20, color=TEXT_WHITE, weight="semibold")
-    dept_text = f"{employee.get('department', '')}  |  {employee.get('id', '')}"
-    _centered_text(frame, dept_text, card_y + 38,
-                   font_size=14, color=TEXT_MUTED, weight="light")
+        _centered_text(canvas, f"Welcome, {employee['name']}", card_y + 12,
+                       font_size=20, color=TEXT_WHITE, weight="semibold")
+        _centered_text(canvas, dept_text, card_y + 38,
+                       font_size=14, color=TEXT_MUTED, weight="light")
+
+        # Ring track
+        cv2.circle(canvas, (cx, cy), 80, DIVIDER, 3)
+        cv2.circle(canvas, (cx, cy), 68, (40, 40, 55), 1)
+
+        # Bottom progress bar track
+        cv2.rectangle(canvas, (0, bar_y), (w, h), DARK_BG, -1)
+
+    _draw_layer(frame, ("countdown", employee["name"], dept_text), paint)
 
     # Ring progress
-    cx, cy = w // 2, h // 2
     progress = min(elapsed / total_seconds, 1.0)
     angle = int(360 * progress)
-
-    cv2.circle(frame, (cx, cy), 80, DIVIDER, 3)
     cv2.ellipse(frame, (cx, cy), (80, 80), -90, 0, angle, ACCENT_CYAN, 4)
-    cv2.circle(frame, (cx, cy), 68, (40, 40, 55), 1)
 
     # Countdown number
     if remaining > 0:
@@ -370,9 +512,7 @@ def draw_countdown(frame, employee, remaining, elapsed, total_seconds):
     _centered_text(frame, msg, cy + 100, font_size=17, color=TEXT_DIM, weight="regular")
 
     # Bottom progress bar
-    bar_y = h - 6
     bar_fill = int(w * progress)
-    cv2.rectangle(frame, (0, bar_y), (w, h), DARK_BG, -1)
     if bar_fill > 0:
         _gradient_bar(frame, (0, bar_y), (bar_fill, h), ACCENT_BLUE, ACCENT_CYAN)
 
@@ -385,11 +525,13 @@ def draw_checking_banner(frame, employee_name, current_frame, total_frames, bar_
     banner_y = bar_h + 2
     banner_h = 40
 
-    _glass_rect(frame, (0, banner_y), (w, banner_y + banner_h),
-                alpha=0.82, color=(25, 55, 25), radius=0)
+    def paint(canvas):
+        _glass_rect(canvas, (0, banner_y), (w, banner_y + banner_h),
+                    alpha=0.82, color=(25, 55, 25), radius=0)
+        _put_text(canvas, f"Checking PPE for: {employee_name}",
+                  (18, banner_y + 10), font_size=16, color=ACCENT_GREEN, weight="semibold")
 
-    _put_text(frame, f"Checking PPE for: {employee_name}",
-              (18, banner_y + 10), font_size=16, color=ACCENT_GREEN, weight="semibold")
+    _draw_layer(frame, ("checking", employee_name, bar_h), paint)
 
     # Progress pill on right
     prog_text = f"{current_frame}/{total_frames}"
@@ -403,79 +545,87 @@ def draw_result_overlay(frame, status_data, employee):
     Modern PPE result display with card layout and status badge.
     """
     h, w = frame.shape[:2]
-    is_ready = status_data["status"] == "READY"
-    accent = ACCENT_GREEN if is_ready else ACCENT_RED
-
-    # Central card
-    card_w = min(420, w - 60)
-    card_h = 390
-    cx = (w - card_w) // 2
-    cy = 65
-
-    _glass_rect(frame, (cx, cy), (cx + card_w, cy + card_h),
-                alpha=0.85, color=CARD_BG, radius=14)
-    _rounded_rect(frame, (cx, cy), (cx + card_w, cy + 4), accent, radius=2, thickness=-1)
-
-    # Employee info
-    name = employee["name"] if employee else "Unknown"
-    emp_id = employee["id"] if employee else "---"
-    dept = employee.get("department", "") if employee else ""
-
-    info_y = cy + 14
-    _centered_text(frame, f"{name}  |  {emp_id}  |  {dept}",
-                   info_y, font_size=15, color=TEXT_DIM, weight="regular")
-
-    # PPE items table
-    items = [
-        ("Helmet",      status_data.get("has_helmet", False)),
-        ("Safety Vest", status_data.get("has_vest",   False)),
-        ("Gloves",      status_data.get("has_gloves", False)),
-        ("Goggles",     status_data.get("has_goggles", False)),
-        ("Boots",       status_data.get("has_boots",  False)),
-    ]
-
-    row_y = info_y + 28
-    row_h = 36
-    table_w = card_w - 40
-    table_x = cx + 20
-
-    # Table header
-    _put_text(frame, "PPE Item", (table_x + 10, row_y),
-              font_size=13, color=TEXT_MUTED, weight="semibold")
-    _put_text(frame, "Status", (table_x + table_w - 80, row_y),
-              font_size=13, color=TEXT_MUTED, weight="semibold")
-    row_y += 22
-    cv2.line(frame, (table_x, row_y), (table_x + table_w, row_y), DIVIDER, 1)
-
-    for item_name, detected in items:
-        ry = row_y + 5
-        row_color = (25, 50, 25) if detected else (50, 25, 25)
-        _glass_rect(frame, (table_x, ry), (table_x + table_w, ry + row_h - 4),
-                    alpha=0.5, color=row_color, radius=6)
-
-        _put_text(frame, item_name, (table_x + 12, ry + 8),
-                  font_size=15, color=TEXT_WHITE, weight="regular")
-
-        if detected:
-            _pill_badge(frame, "YES",
-                        (table_x + table_w - 40, ry + row_h // 2 - 2),
-                        (40, 110, 40), font_size=12)
-        else:
-            _pill_badge(frame, "NO",
-                        (table_x + table_w - 40, ry + row_h // 2 - 2),
-                        (60, 30, 130), font_size=12)
-
-        row_y += row_h
-
-    # Big status badge
-    status_y = row_y + 22
-    _pill_badge(frame, status_data["status"],
-                (w // 2, status_y + 10), accent, font_size=22, pad_x=30, pad_y=8)
-
-    # Message
-    msg = status_data["message"]
-    _centered_text(frame, msg, status_y + 42, font_size=15, color=TEXT_DIM, weight="light")
-
+    # Rebuilt only when the shown result changes
+    flags = tuple(bool(status_data.get(k, False))
+                  for k in ("has_helmet", "has_vest", "has_gloves", "has_goggles", "has_boots"))
+    who = (employee["name"], employee["id"], employee.get("department", "")) if employee else None
+    key = ("result", status_data["status"], status_data["message"], flags, who)
+
+    def paint(canvas):
+        is_ready = status_data["status"] == "READY"
+        accent = ACCENT_GREEN if is_ready else ACCENT_RED
+
+        # Central card
+        card_w = min(420, w - 60)
+        card_h = 390
+        cx = (w - card_w) // 2
+        cy = 65
+
+        _glass_rect(canvas, (cx, cy), (cx + card_w, cy + card_h),
+                    alpha=0.85, color=CARD_BG, radius=14)
+        _rounded_rect(canvas, (cx, cy), (cx + card_w, cy + 4), accent, radius=2, thickness=-1)
+
+        # Employee info
+        name = employee["name"] if employee else "Unknown"
+        emp_id = employee["id"] if employee else "---"
+        dept = employee.get("department", "") if employee else ""
+
+        info_y = cy + 14
+        _centered_text(canvas, f"{name}  |  {emp_id}  |  {dept}",
+                       info_y, font_size=15, color=TEXT_DIM, weight="regular")
+
+        # PPE items table
+        items = [
+            ("Helmet",      status_data.get("has_helmet", False)),
+            ("Safety Vest", status_data.get("has_vest",   False)),
+            ("Gloves",      status_data.get("has_gloves", False)),
+            ("Goggles",     status_data.get("has_goggles", False)),
+            ("Boots",       status_data.get("has_boots",  False)),
+        ]
+
+        row_y = info_y + 28
+        row_h = 36
+        table_w = card_w - 40
+        table_x = cx + 20
+
+        # Table header
+        _put_text(canvas, "PPE Item", (table_x + 10, row_y),
+                  font_size=13, color=TEXT_MUTED, weight="semibold")
+        _put_text(canvas, "Status", (table_x + table_w - 80, row_y),
+                  font_size=13, color=TEXT_MUTED, weight="semibold")
+        row_y += 22
+        cv2.line(canvas, (table_x, row_y), (table_x + table_w, row_y), DIVIDER, 1)
+
+        for item_name, detected in items:
+            ry = row_y + 5
+            row_color = (25, 50, 25) if detected else (50, 25, 25)
+            _glass_rect(canvas, (table_x, ry), (table_x + table_w, ry + row_h - 4),
+                        alpha=0.5, color=row_color, radius=6)
+
+            _put_text(canvas, item_name, (table_x + 12, ry + 8),
+                      font_size=15, color=TEXT_WHITE, weight="regular")
+
+            if detected:
+                _pill_badge(canvas, "YES",
+                            (table_x + table_w - 40, ry + row_h // 2 - 2),
+                            (40, 110, 40), font_size=12)
+            else:
+                _pill_badge(canvas, "NO",
+                            (table_x + table_w - 40, ry + row_h // 2 - 2),
+                            (60, 30, 130), font_size=12)
+
+            row_y += row_h
+
+        # Big status badge
+        status_y = row_y + 22
+        _pill_badge(canvas, status_data["status"],
+                    (w // 2, status_y + 10), accent, font_size=22, pad_x=30, pad_y=8)
+
+        # Message
+        msg = status_data["message"]
+        _centered_text(canvas, msg, status_y + 42, font_size=15, color=TEXT_DIM, weight="light")
+
+    _draw_layer(frame, key, paint)
     return frame
 
 
@@ -499,3 +649,52 @@ def draw_saved_confirmation(frame):
     y = h - 26
     cv2.circle(frame, (x - 8, y + 6), 4, ACCENT_GREEN, -1)
     _put_text(frame, text, (x, y), font_size=14, color=ACCENT_GREEN, weight="regular")
+
+
+def draw_camera_offline(frame, lines):
+    """
+    Full "camera offline" screen shown while the camera reconnects:
+    banner plus a centred card with a pulsing red dot and status lines.
+    """
+    h, w = frame.shape[:2]
+    draw_top_banner(frame, subtitle="Camera offline")
+
+    card_w, card_h = 360, 132
+    x1, y1 = (w - card_w) // 2, (h - card_h) // 2
+    title_y = y1 + 24
+
+    def paint(canvas):
+        _glass_rect(canvas, (x1, y1), (x1 + card_w, y1 + card_h), alpha=0.85, color=CARD_BG)
+        _rounded_rect(canvas, (x1, y1), (x1 + card_w, y1 + card_h), ACCENT_RED, 12, 1)
+        _centered_text(canvas, "Camera offline", title_y, font_size=20,
+                       color=TEXT_WHITE, weight="semibold")
+
+    _draw_layer(frame, ("camera_offline",), paint)
+
+    pulse = (math.sin(time.time() * 4) + 1) / 2.0
+    cv2.circle(frame, (x1 + 28, title_y + 13), int(5 + 2 * pulse), ACCENT_RED, -1)
+    ty = title_y + 44
+    for line in lines[:2]:
+        _centered_text(frame, line, ty, font_size=15, color=TEXT_DIM)
+        ty += 26
+
+
+def draw_debug_panel(frame, lines, title="Performance"):
+    """Compact glass panel at the bottom-left with monospace-ish stats lines."""
+    if not lines:
+        return
+    h, w = frame.shape[:2]
+    pil_font = _font(13, "regular")
+    line_h = 18
+    pad = 8
+    box_w = max(_pil_text_size(line, pil_font)[0] for line in lines + [title]) + pad * 2
+    box_h = line_h * (len(lines) + 1) + pad * 2
+    x1, y2 = 10, h - 14
+    y1 = max(0, y2 - box_h)
+    _glass_rect(frame, (x1, y1), (x1 + box_w, y2), alpha=0.75, color=DARK_BG, radius=6)
+    _put_text(frame, title, (x1 + pad, y1 + pad), font_size=13,
+              color=ACCENT_CYAN, weight="semibold")
+    ty = y1 + pad + line_h
+    for line in lines:
+        _put_text(frame, line, (x1 + pad, ty), font_size=13, color=TEXT_DIM)
+        ty += line_h
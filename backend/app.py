@@ -4,6 +4,7 @@ from flask_cors import CORS
 from database import db, init_db
 from routes.checks import checks_bp, init_checks
 from routes.dashboard import dashboard_bp
+from metrics import init_metrics, WS_CLIENTS, WS_EMITS
 
 def create_app():
     app = Flask(__name__)
@@ -11,6 +12,7 @@ def create_app():
     app.config["SECRET_KEY"]                     = "industriguard_secret_2025"
     app.config["SQLALCHEMY_DATABASE_URI"]        = "sqlite:///industriguard.db"
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["METRICS_ENABLED"]                = True   # GET /metrics (Prometheus text format)
 
     CORS(app, origins="*")
 
@@ -21,6 +23,9 @@ def create_app():
     app.register_blueprint(checks_bp)
     app.register_blueprint(dashboard_bp)
 
+    if app.config["METRICS_ENABLED"]:
+        init_metrics(app, db)
+
     return app
 
 
@@ -36,14 +41,17 @@ init_checks(socketio)
 @socketio.on("connect")
 def on_connect():
     print("[WebSocket] Dashboard client connected")
+    WS_CLIENTS.inc()
     socketio.emit("connected", {
         "message": "Connected to IndustriGuard backend",
         "service": "IndustriGuard AI v2"
     })
+    WS_EMITS.inc(event="connected")
 
 @socketio.on("disconnect")
 def on_disconnect():
     print("[WebSocket] Dashboard client disconnected")
+    WS_CLIENTS.dec()
 
 
 # ── Run ────────────────────────────────────────────────────────────
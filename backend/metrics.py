@@ -0,0 +1,239 @@
+"""
+Prometheus-style metrics for the backend.
+
+A tiny in-process registry (counters, gauges, fixed-bucket histograms)
+rendered in the Prometheus text format at GET /metrics.  Recording is a
+dict lookup plus an add under a lock, so it is cheap enough to leave on
+in production; rates (checks per camera per second, emits per second)
+are left to the scraper.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import Blueprint, Response, g, has_request_context, request
+
+metrics_bp = Blueprint("metrics", __name__)
+
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _fmt_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + (extra or [])
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+                    for k, v in pairs)
+    return "{" + body + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{_fmt_labels(self.labelnames, key)} {value:g}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=_LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            entry[0][idx] += 1
+            entry[1] += 1
+            entry[2] += value
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def _render_value(self, key, value):
+        counts, count, total = value
+        lines, cum = [], 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            cum += n
+            le = "+Inf" if bound == float("inf") else f"{bound:g}"
+            lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, [('le', le)])} {cum}")
+        lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {total:.6f}")
+        lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+REGISTRY = []
+
+# ── Backend metrics ────────────────────────────────────────────────
+CHECKS_INGESTED = Counter(
+    "industriguard_checks_ingested_total",
+    "Check results stored, by camera and status.", ("camera_id", "status", "source"))
+DB_COMMIT_SECONDS = Histogram(
+    "industriguard_db_commit_seconds",
+    "Time spent in db.session.commit().", ("endpoint",))
+DB_QUERY_SECONDS = Histogram(
+    "industriguard_db_query_seconds",
+    "Time spent executing SQL statements, by Flask endpoint.", ("endpoint",))
+HTTP_REQUEST_SECONDS = Histogram(
+    "industriguard_http_request_seconds",
+    "HTTP request latency, by route, method and status code.", ("route", "method", "status"))
+WS_CLIENTS = Gauge(
+    "industriguard_websocket_clients",
+    "Connected dashboard WebSocket clients.")
+WS_EMITS = Counter(
+    "industriguard_websocket_emits_total",
+    "Socket.IO events emitted, by event name.", ("event",))
+DETECT_IMAGE_IN_FLIGHT = Gauge(
+    "industriguard_detect_image_in_flight",
+    "/api/detect-image requests currently queued or running.")
+DETECT_IMAGE_INFERENCE_SECONDS = Histogram(
+    "industriguard_detect_image_inference_seconds",
+    "PPE model inference time for uploaded images.")
+CACHE_REQUESTS = Counter(
+    "industriguard_cache_requests_total",
+    "Cache lookups, by cache and result (hit/miss).", ("cache", "result"))
+
+# Gauges read 0 before the first event, not "absent"
+WS_CLIENTS.set(0)
+DETECT_IMAGE_IN_FLIGHT.set(0)
+
+
+def _endpoint_label():
+    if has_request_context() and request.endpoint:
+        return request.endpoint
+    return "none"
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+
+    # Convenience gauge: hit ratio per cache (also derivable from the counter)
+    caches = sorted({key[0] for key in CACHE_REQUESTS._values})
+    if caches:
+        lines.append("# HELP industriguard_cache_hit_ratio Share of cache lookups that were hits.")
+        lines.append("# TYPE industriguard_cache_hit_ratio gauge")
+        for cache in caches:
+            hits = CACHE_REQUESTS.get(cache=cache, result="hit")
+            total = hits + CACHE_REQUESTS.get(cache=cache, result="miss")
+            lines.append(f'industriguard_cache_hit_ratio{{cache="{cache}"}} {hits / total if total else 0:.4f}')
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def timed_commit():
+    """Wraps db.session.commit() so its latency is recorded per endpoint."""
+    with DB_COMMIT_SECONDS.time(endpoint=_endpoint_label()):
+        yield
+
+
+# ── Wiring ─────────────────────────────────────────────────────────
+def init_metrics(app, db):
+    """Request timing hooks, SQL statement timing and the /metrics route."""
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_t0 = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        t0 = g.pop("_metrics_t0", None)
+        if t0 is not None and request.endpoint != "metrics.metrics":
+            rule = request.url_rule.rule if request.url_rule else "unmatched"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - t0, route=rule,
+                                         method=request.method, status=response.status_code)
+        return response
+
+    from sqlalchemy import event
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_query_t0", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get("_metrics_query_t0")
+        if stack:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - stack.pop(), endpoint=_endpoint_label())
+
+    app.register_blueprint(metrics_bp)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
@@ -1,6 +1,10 @@
 from flask import Blueprint, request, jsonify
 from database import db
 from models import EmployeeCheckLog, EmployeeLatestStatus
+from metrics import (
+    CHECKS_INGESTED, WS_EMITS, DETECT_IMAGE_IN_FLIGHT,
+    DETECT_IMAGE_INFERENCE_SECONDS, record_cache, timed_commit,
+)
 from datetime import datetime
 import sys
 import os
@@ -30,14 +34,31 @@ _EMPLOYEES_FILE = os.path.join(
     os.path.dirname(__file__), "..", "..", "employee_data", "employees.json"
 )
 
+_employees_cache = {"mtime": None, "employees": []}
+
 def _load_employees():
-    """Load employee list from employees.json."""
+    """Load employee list from employees.json (cached until the file changes)."""
+    path = os.path.abspath(_EMPLOYEES_FILE)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        record_cache("employees", hit=False)
+        return []
+
+    if _employees_cache["mtime"] == mtime:
+        record_cache("employees", hit=True)
+        return _employees_cache["employees"]
+
+    record_cache("employees", hit=False)
     try:
-        with open(os.path.abspath(_EMPLOYEES_FILE), "r") as f:
+        with open(path, "r") as f:
             data = json.load(f)
-        return data.get("employees", [])
+        employees = data.get("employees", [])
     except Exception:
         return []
+    _employees_cache["mtime"] = mtime
+    _employees_cache["employees"] = employees
+    return employees
 
 checks_bp = Blueprint("checks", __name__)
 
@@ -130,7 +151,9 @@ def receive_report():
         )
         db.session.add(latest)
 
-    db.session.commit()
+    with timed_commit():
+        db.session.commit()
+    CHECKS_INGESTED.inc(camera_id=camera_id, status=status, source="report")
 
     # ── Emit real-time update to dashboard via WebSocket ──────────
     realtime_payload = {
@@ -152,6 +175,7 @@ def receive_report():
 
     if socketio:
         socketio.emit("check_update", realtime_payload)
+        WS_EMITS.inc(event="check_update")
         print(f"[WebSocket] Emitted update → {employee_id} | {status}")
 
     print(f"[Checks] Saved → {employee_id} : {employee_name} | {status}")
@@ -230,6 +254,12 @@ def list_employees():
 # ── Image Upload PPE Detection ────────────────────────────────────
 @checks_bp.route("/api/detect-image", methods=["POST"])
 def detect_image():
+    # In-flight uploads (waiting for or running inference) = queue depth
+    with DETECT_IMAGE_IN_FLIGHT.track_inprogress():
+        return _detect_image()
+
+
+def _detect_image():
     """
     Accepts a multipart image upload + optional employee_id.
     Runs the same PPE detection pipeline used for live camera frames:
@@ -273,8 +303,9 @@ def detect_image():
     camera_id = request.form.get("camera_id", "IMG-UPLOAD")
 
     # ── Run PPE detection (same call as live camera) ───────────────
-    detections = _detector.detect(frame)
-    compliance = _detector.check_ppe_compliance(detections)
+    with DETECT_IMAGE_INFERENCE_SECONDS.time():
+        detections = _detector.detect(frame)
+        compliance = _detector.check_ppe_compliance(detections)
 
     # ── Safety evaluation (unchanged algorithm) ───────────────────
     status_data = _safety.evaluate(compliance)
@@ -353,7 +384,9 @@ def detect_image():
         )
         db.session.add(latest)
 
-    db.session.commit()
+    with timed_commit():
+        db.session.commit()
+    CHECKS_INGESTED.inc(camera_id=camera_id, status=status_data["status"], source="upload")
 
     # ── Emit real-time WebSocket update → dashboard ───────────────
     realtime_payload = {
@@ -374,6 +407,7 @@ def detect_image():
     }
     if socketio:
         socketio.emit("check_update", realtime_payload)
+        WS_EMITS.inc(event="check_update")
         print(f"[WebSocket] Image upload result → {employee['id']} | {status_data['status']}")
 
     print(f"[Detect-Image] {employee['id']} : {employee['name']} | {status_data['status']} | {safety_pct}%")
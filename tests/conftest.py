@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The station modules import each other flat (`from config import ...`),
+# the same way they are run from inside ai/.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ai"))
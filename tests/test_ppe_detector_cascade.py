@@ -0,0 +1,102 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+try:
+    import ultralytics  # noqa: F401
+except ImportError:
+    # Only YOLO is needed from ultralytics, and the tests replace it
+    sys.modules["ultralytics"] = types.SimpleNamespace(YOLO=None)
+
+import ppe_detector
+from ppe_detector import PPEDetector
+
+NAMES = {0: "person", 1: "helmet", 2: "boots"}
+
+
+class _Box:
+    def __init__(self, cls, conf, xyxy, track_id=None):
+        self.cls = [cls]
+        self.conf = [conf]
+        self.xyxy = [np.array(xyxy, dtype=np.float32)]
+        self.id = None if track_id is None else [track_id]
+
+
+class _Result:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+class StubYOLO:
+    """
+    Records calls the way Ultralytics behaves: after track(persist=True)
+    the instance's predictor carries ByteTrack callbacks, so every later
+    call on the same instance also updates the tracker.
+    """
+
+    instances = []
+
+    def __init__(self, path):
+        self.path = path
+        self.names = NAMES
+        self.tracking = False
+        self.tracker_updates = []      # batch sizes seen by the tracker
+        self.calls = []
+        StubYOLO.instances.append(self)
+
+    def track(self, frame, persist=False, **kwargs):
+        self.tracking = True
+        self.calls.append(("track", 1))
+        self.tracker_updates.append(1)
+        return [_Result([_Box(0, 0.9, [100, 100, 200, 400], track_id=7),
+                         _Box(1, 0.8, [120, 60, 180, 110])])]
+
+    def __call__(self, source, **kwargs):
+        batch = source if isinstance(source, list) else [source]
+        self.calls.append(("predict", len(batch)))
+        if self.tracking:
+            self.tracker_updates.append(len(batch))
+        return [_Result([_Box(2, 0.7, [5, 5, 25, 25])]) for _ in batch]
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    StubYOLO.instances = []
+    monkeypatch.setattr(ppe_detector, "YOLO", StubYOLO)
+    return PPEDetector(model_path="stub.pt")
+
+
+def test_crop_pass_does_not_touch_track_state(detector):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    for _ in range(3):
+        detector.detect_cascaded(frame, imgsz=480, crop_imgsz=320, use_tracks=True)
+
+    main, crop = StubYOLO.instances
+    assert main is detector.model
+    # One tracker update per inference: the full-frame pass only
+    assert main.tracker_updates == [1, 1, 1]
+    assert all(kind == "track" for kind, _ in main.calls)
+    # Crops went through the second instance, which never tracks
+    assert crop.path == "stub.pt"
+    assert crop.tracker_updates == []
+    assert crop.calls and all(kind == "predict" and n > 1 for kind, n in crop.calls)
+
+
+def test_crop_detections_are_merged_in_frame_coordinates(detector):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    detections = detector.detect_cascaded(frame, imgsz=480, use_tracks=True)
+
+    persons = [d for d in detections if d["class_name"] == "person"]
+    assert [p["track_id"] for p in persons] == [7]
+    boots = [d for d in detections if d["class_name"] == "boots"]
+    assert boots, "feet crop detections should be kept"
+    # Shifted out of the crop: the feet crop starts inside the person's lower part
+    assert all(b["bbox"][1] >= 100 for b in boots)
+
+
+def test_no_persons_skips_crop_model(detector, monkeypatch):
+    monkeypatch.setattr(StubYOLO, "track", lambda self, frame, **kw: [_Result([])])
+    detector.detect_cascaded(np.zeros((480, 640, 3), dtype=np.uint8), use_tracks=True)
+    assert len(StubYOLO.instances) == 1
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+import qr_matcher
+from qr_matcher import QRPersonMatcher, qr_poly_to_rect, _GATED
+
+
+def test_qr_poly_to_rect():
+    poly = [[12.6, 40.0], [60.2, 38.0], [61.0, 90.4], [10.0, 88.0]]
+    assert qr_poly_to_rect(poly) == [10, 38, 61, 90]
+
+
+# ── Basic cases ────────────────────────────────────────────────────────
+@pytest.mark.parametrize("qrs, persons", [
+    ([], []),
+    ([], [[0, 0, 100, 300]]),
+    ([[10, 10, 50, 50]], []),
+    (np.zeros((0, 4)), np.zeros((0, 4))),
+])
+def test_empty_inputs_match_nothing(qrs, persons):
+    assert QRPersonMatcher().match(qrs, persons) == []
+
+
+def test_overlap_is_preferred_over_closer_center():
+    # The QR overlaps P0 (IoU ~0.07) but its center is closer to P1
+    qr = [160, 100, 240, 180]
+    p0 = [0, 0, 200, 200]
+    p1 = [245, 100, 325, 180]
+    matcher = QRPersonMatcher(min_iou=0.05, max_dist_ratio=1.0)
+    cost = matcher.cost_matrix([qr], [p0, p1])
+    assert cost[0, 0] < 1.0 <= cost[0, 1] < _GATED
+    assert matcher.match([qr], [p0, p1]) == [(0, 0)]
+
+
+def test_distance_fallback_within_gate():
+    # No overlap; center within one person diagonal
+    person = [100, 100, 200, 400]             # diagonal ~316
+    qr = [220, 200, 260, 240]
+    assert QRPersonMatcher(max_dist_ratio=1.0).match([qr], [person]) == [(0, 0)]
+
+
+def test_distance_fallback_picks_nearest_person():
+    persons = [[0, 0, 100, 300], [400, 0, 500, 300]]
+    qr = [330, 130, 370, 170]                 # 100 px from P1's edge, 300 from P0's
+    assert QRPersonMatcher(max_dist_ratio=1.0).match([qr], persons) == [(0, 1)]
+
+
+def test_rejects_beyond_distance_gate():
+    person = [100, 100, 200, 400]             # center (150, 250), diagonal ~316
+    qr = [600, 230, 640, 270]                 # ~470 px away → ratio ~1.5
+    matcher = QRPersonMatcher(max_dist_ratio=1.0)
+    assert matcher.cost_matrix([qr], [person])[0, 0] == _GATED
+    assert matcher.match([qr], [person]) == []
+
+
+def test_rejects_small_overlap_below_min_iou_when_far():
+    # Tiny corner overlap (IoU ~0.0003) with a large box: not an overlap match,
+    # and the centers are too far apart for the distance fallback
+    person = [0, 0, 400, 800]
+    qr = [390, 790, 430, 830]
+    matcher = QRPersonMatcher(min_iou=0.05, max_dist_ratio=0.3)
+    assert matcher.match([qr], [person]) == []
+    # The same pair is accepted once the IoU gate allows it
+    assert QRPersonMatcher(min_iou=0.0002, max_dist_ratio=0.3).match([qr], [person]) == [(0, 0)]
+
+
+# ── Assignment ─────────────────────────────────────────────────────────
+def test_more_qr_codes_than_persons():
+    person = [100, 0, 200, 300]
+    qrs = [
+        [600, 100, 640, 140],                 # gated: far away
+        [130, 100, 170, 140],                 # on the person's chest
+        [210, 100, 250, 140],                 # next to the person
+    ]
+    assert QRPersonMatcher().match(qrs, [person]) == [(1, 0)]
+
+
+def test_each_qr_and_person_used_once():
+    persons = [[i * 150, 0, i * 150 + 100, 300] for i in range(5)]
+    qrs = [[i * 150 + 30, 100, i * 150 + 70, 140] for i in range(5)] * 2
+    pairs = QRPersonMatcher().match(qrs, persons)
+    assert len(pairs) == 5
+    assert len({q for q, _ in pairs}) == 5
+    assert sorted(p for _, p in pairs) == list(range(5))
+
+
+def _queue_of_workers(n):
+    """
+    n workers side by side; each badge QR_k straddles worker k and k+1,
+    overlapping k+1 slightly more, except the last one, which sits only on
+    worker n-1. Greedy takes every QR_k → k+1 and strands the last badge;
+    the optimal assignment is QR_k → k for all k.
+    """
+    persons = [[100 * k, 0, 100 * k + 100, 300] for k in range(n)]
+    qrs = [[100 * k + 60, 100, 100 * k + 160, 200] for k in range(n - 1)]
+    qrs.append([100 * (n - 1) + 25, 100, 100 * (n - 1) + 75, 150])
+    return qrs, persons
+
+
+def test_optimal_assignment_beats_greedy_for_a_queue_of_workers():
+    n = 12
+    qrs, persons = _queue_of_workers(n)
+    matcher = QRPersonMatcher(min_iou=0.05, max_dist_ratio=0.5)
+    cost = matcher.cost_matrix(qrs, persons)
+
+    greedy = [(r, c) for r, c in QRPersonMatcher._greedy(cost) if cost[r, c] < _GATED]
+    assert len(greedy) == n - 1
+    assert (n - 1, n - 1) not in greedy
+
+    pairs = matcher.match(qrs, persons)
+    assert sorted(pairs) == [(k, k) for k in range(n)]
+
+
+def test_greedy_fallback_without_scipy(monkeypatch):
+    monkeypatch.setattr(qr_matcher, "linear_sum_assignment", None)
+    qrs, persons = _queue_of_workers(6)
+    pairs = QRPersonMatcher(min_iou=0.05, max_dist_ratio=0.5).match(qrs, persons)
+    assert len(pairs) == 5
+    assert len({q for q, _ in pairs}) == len({p for _, p in pairs}) == 5
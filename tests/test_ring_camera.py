@@ -0,0 +1,91 @@
+import threading
+
+import numpy as np
+import pytest
+
+import camera_feed
+import multiprocess_station
+from camera_health import CameraHealth
+from frame_bus import FrameRing
+from multiprocess_station import READER_MAIN, RingCamera
+
+SHAPE = (4, 6, 3)
+
+
+@pytest.fixture
+def ring(monkeypatch):
+    monkeypatch.setattr(multiprocess_station, "CAMERA_OFFLINE_FRAME_INTERVAL", 0.01)
+    ring = FrameRing.create(SHAPE)
+    ring.set_online(True)
+    yield ring
+    ring.close()
+
+
+def test_stall_while_online_returns_offline_frame(ring):
+    camera = RingCamera(ring, info={}, copy=True, timeout_seconds=0.05)
+    ring.write(np.full(SHAPE, 7, dtype=np.uint8))
+    assert camera.get_frame()[0, 0, 0] == 7
+    assert camera.online
+
+    # Capture process still says online but delivers nothing
+    frame = camera.get_frame()
+    assert frame is not None and frame.shape == SHAPE
+    assert not camera.online
+
+    # Polling continues and picks the stream back up
+    ring.write(np.full(SHAPE, 9, dtype=np.uint8))
+    assert camera.get_frame()[0, 0, 0] == 9
+    assert camera.online
+
+
+def test_none_only_after_ring_closed(ring):
+    camera = RingCamera(ring, info={}, copy=True, timeout_seconds=0.05)
+    ring.close_writer()
+    assert camera.get_frame() is None
+
+
+class _ResizingCamera:
+    """CameraFeed stand-in whose stream changes resolution after a 'reconnect'."""
+
+    def __init__(self, source=None, camera_id=None):
+        self.frames = [np.full(SHAPE, 1, dtype=np.uint8),
+                       np.full((8, 12, 3), 2, dtype=np.uint8)]
+        self.online = True
+        self.health = CameraHealth(camera_id)
+
+    def get_frame(self):
+        return self.frames.pop(0) if self.frames else None
+
+    def get_info(self):
+        return {}
+
+    def release(self):
+        pass
+
+
+class _Conn:
+    def __init__(self, spec):
+        self.spec = spec
+
+    def send(self, _msg):
+        pass
+
+    def recv(self):
+        return self.spec
+
+
+class _HealthQueue(list):
+    put = list.append
+
+    def cancel_join_thread(self):
+        pass
+
+
+def test_capture_resizes_frames_after_resolution_change(ring, monkeypatch):
+    monkeypatch.setattr(camera_feed, "CameraFeed", _ResizingCamera)
+    multiprocess_station._capture_main(None, "CAM", _Conn(ring.spec()), _HealthQueue(),
+                                       threading.Event())
+    seq, frame = ring.read_latest(READER_MAIN)
+    assert seq == 1
+    assert frame.shape == SHAPE and frame[0, 0, 0] == 2
+    assert ring.closed
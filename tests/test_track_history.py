@@ -0,0 +1,39 @@
+from track_history import TrackPPEHistory, PPE_ITEMS
+
+
+def _person(track_id, **flags):
+    pc = {"person_det": {"track_id": track_id, "bbox": [0, 0, 10, 10]}}
+    pc.update({key: flags.get(key, True) for key in PPE_ITEMS})
+    return pc
+
+
+def test_new_tracks_in_one_update_get_separate_slots_when_full():
+    history = TrackPPEHistory(window=4, max_tracks=2)
+    history.update([_person(1), _person(2)])
+
+    # Table full; two new tracks arrive together. Both must get their own
+    # slot (recycling 1 and 2), not evict each other.
+    out = history.update([_person(3, has_vest=False), _person(4)])
+    assert sorted(history._slots) == [3, 4]
+    assert len(set(history._slots.values())) == 2
+    assert out[0]["has_vest"] is False and out[0]["samples"] == 1
+    assert out[1]["has_vest"] is True and out[1]["samples"] == 1
+
+
+def test_existing_track_is_not_evicted_by_a_new_one_in_the_same_update():
+    history = TrackPPEHistory(window=4, max_tracks=2)
+    history.update([_person(1), _person(2)])
+    history.update([_person(2)])            # 1 is now least recently updated
+
+    out = history.update([_person(1), _person(3)])
+    assert sorted(history._slots) == [1, 3]
+    assert out[0]["samples"] == 2           # track 1 kept its history
+    assert out[1]["samples"] == 1
+
+
+def test_more_tracks_than_slots_pass_through():
+    history = TrackPPEHistory(window=4, max_tracks=2)
+    persons = [_person(1), _person(2), _person(3, has_helmet=False)]
+    out = history.update(persons)
+    assert len(history) == 2
+    assert out[2] is persons[2]